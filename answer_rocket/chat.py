@@ -1,17 +1,33 @@
+import contextlib
+import copy
+import glob
+import importlib.util
 import io
+import json
 import logging
+import os
+import time
 import pandas as pd
 import uuid
-from datetime import datetime
-from sgqlc.types import Variable, non_null, String, Arg, list_of
-from typing import Literal, Optional
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from sgqlc.operation import Operation
+from sgqlc.types import Type, Variable, non_null, String, Arg, list_of
+from types import SimpleNamespace
+from typing import Dict, Iterator, List, Literal, Optional
 
 from answer_rocket.client_config import ClientConfig
-from answer_rocket.graphql.client import GraphQlClient
+from answer_rocket.graphql.client import GraphQlClient, PreparedOperation, prepared_operation
 from answer_rocket.graphql.schema import (UUID, Int, DateTime, ChatDryRunType, MaxChatEntry, MaxChatThread,
                                           SharedThread, MaxChatUser, ChatArtifact, MaxMutationResponse,
-                                          ChatArtifactSearchInput, PagingInput, PagedChatArtifacts, PipelineType)
-from answer_rocket.graphql.sdk_operations import Operations
+                                          ChatArtifactSearchInput, PagingInput, PagedChatArtifacts, PipelineType,
+                                          MaxContentBlock, Query, JSON)
+from answer_rocket.graphql.sdk_operations import Operations, fragment_chat_result_fragment
+from answer_rocket.util.compact import compact_dataframe
+from answer_rocket.util.catalog import fingerprint
+from answer_rocket.util.paging import iter_paged_rows, DEFAULT_PAGE_SIZE, DEFAULT_PREFETCH_PAGES
+from answer_rocket.util.records import drop_partial_line, read_records, write_records
+from answer_rocket.util.thread_cache import ThreadCache
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +41,242 @@ ThreadType = Literal['CHAT', 'COPILOT_QUESTION_PREVIEW', 'RESEARCH', 'SHARED', '
 Based on _schema.ThreadType.
 """
 
+# Polling of queued entries starts at CHAT_POLL_INTERVAL seconds and backs off by CHAT_POLL_BACKOFF while
+# nothing changes, up to CHAT_MAX_POLL_INTERVAL. Each poll request covers at most CHAT_POLL_BATCH_SIZE entries.
+CHAT_POLL_INTERVAL = 0.5
+CHAT_MAX_POLL_INTERVAL = 5.0
+CHAT_POLL_BACKOFF = 1.5
+CHAT_POLL_BATCH_SIZE = 50
+
+CHAT_BATCH_CONCURRENCY = 8
+
+# export_chat_entries writes, and records its progress, every CHAT_EXPORT_CHUNK_SIZE entries.
+CHAT_EXPORT_CHUNK_SIZE = 10_000
+CHAT_EXPORT_FORMATS = ('jsonl', 'parquet')
+_CHAT_ENTRY_JSON_COLUMNS = ('question', 'answer', 'feedback', 'user', 'skillMemoryPayload')
+# every Parquet part has all of these as string columns, so the parts share one schema whatever they contain
+_CHAT_ENTRY_COLUMNS = ('id', 'threadId', *_CHAT_ENTRY_JSON_COLUMNS)
+_ASKED_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+ChatStreamUpdateType = Literal['queued', 'loading', 'content_block', 'final']
+
+ChatEntryProfile = Literal['full', 'light']
+"""
+The selection of chat entry queries: 'full' fetches every answer field, 'light' skips the pipeline profile,
+diagnostics, report parameters, custom payloads and content blocks.
+"""
+
+
+@dataclass
+class ChatStreamUpdate:
+    """
+    One incremental update yielded by Chat.ask_question_stream.
+
+    type is 'queued' once the question is accepted, 'loading' when the pipeline's status message changes,
+    'content_block' for each content block as it is added to a report result, and 'final' once the answer has
+    finished. The final update carries the complete entry and any error.
+    """
+    type: ChatStreamUpdateType
+    entry_id: str
+    thread_id: Optional[str] = None
+    message: Optional[str] = None
+    report_title: Optional[str] = None
+    content_block: Optional[MaxContentBlock] = None
+    entry: Optional[MaxChatEntry] = None
+    error: Optional[str] = None
+
+
+def _select_entry_completion(entry) -> None:
+    entry.id()
+    answer = entry.answer()
+    answer.has_finished()
+    answer.error()
+
+
+def _select_entry_status(entry) -> None:
+    entry.id()
+    entry.thread_id()
+    answer = entry.answer()
+    answer.answer_id()
+    answer.has_finished()
+    answer.error()
+    answer.message()
+    report_results = answer.report_results()
+    report_results.title()
+    report_results.report_name()
+    content_blocks = report_results.content_blocks()
+    content_blocks.id()
+    content_blocks.title()
+    content_blocks.type()
+    content_blocks.layout_json()
+
+
+def _select_entry_full(entry) -> None:
+    # Same selection as Operations.query.chat_entry.
+    entry.id()
+    entry.thread_id()
+    question = entry.question()
+    question.asked_at()
+    question.nl()
+    entry.answer().__fragment__(fragment_chat_result_fragment())
+    entry.feedback()
+    entry.user()
+    entry.skill_memory_payload()
+
+
+_ENTRY_SELECTIONS = {
+    'completion': ('ChatEntryCompletion', _select_entry_completion),
+    'status': ('ChatEntryStatus', _select_entry_status),
+    'full': ('ChatEntries', _select_entry_full),
+}
+
+
+def _chat_entries_operation(count: int, selection: str = 'status') -> PreparedOperation:
+    """
+    Return the prepared query that fetches `count` chat entries at once, one aliased chatEntry field per entry.
+
+    The 'completion' selection is only the finished and error flags, for waiting on many entries. The 'status'
+    selection adds the fields that change while an answer is running, for streaming one answer: the status
+    message, and report result titles and content block headers. Profiles, diagnostics, parameters and
+    dataframes are left to the 'full' selection, fetched once an answer has finished.
+    """
+    name, select = _ENTRY_SELECTIONS[selection]
+
+    def build():
+        operation = Operation(Query, name=name, variables={f'id{i}': Arg(non_null(UUID)) for i in range(count)})
+
+        for i in range(count):
+            select(operation.chat_entry(id=Variable(f'id{i}'), __alias__=f'entry{i}'))
+
+        return operation
+
+    return prepared_operation(('chat_entries', count, selection), build)
+
+
+def _select_fields(selection, fields: List[str]) -> None:
+    """
+    Select dotted field paths (e.g. 'answer.report_results.title') under a chat entry selection. Paths use the
+    snake_case attribute names of the returned objects; an object field without a sub-path selects only its own
+    scalar fields, not the objects nested in it (e.g. 'answer' leaves out answer.report_results).
+    """
+    tree = {}
+
+    for path in fields:
+        node = tree
+
+        for name in path.split('.'):
+            node = node.setdefault(name, {})
+
+    def select(parent, parent_type, children: dict, prefix: str):
+        for name, grandchildren in children.items():
+            if name not in getattr(parent_type, '__field_names__', ()):
+                raise ValueError(f"unknown chat entry field '{prefix}{name}'")
+
+            field_type = getattr(parent_type, name).type
+            child = getattr(parent, name)()
+
+            if grandchildren:
+                select(child, field_type, grandchildren, f'{prefix}{name}.')
+            elif issubclass(field_type, Type):
+                # left alone, sgqlc would select every nested object as well
+                for field_name in field_type.__field_names__:
+                    if not issubclass(getattr(field_type, field_name).type, Type):
+                        getattr(child, field_name)()
+
+    select(selection, MaxChatEntry, tree, '')
+
+
+def _projected_operation(query: str, fields: List[str]) -> PreparedOperation:
+    """
+    Return the prepared `query` operation that selects only the given chat entry fields, plus entry ids.
+
+    query is 'chat_entry', 'chat_thread' or 'all_chat_entries'; for threads the fields apply to each entry.
+    """
+    fields = tuple(sorted(set(fields)))
+
+    def build():
+        if query == 'chat_entry':
+            operation = Operation(Query, name='ChatEntryProjection', variables={'id': Arg(non_null(UUID))})
+            entries = operation.chat_entry(id=Variable('id'))
+        elif query == 'chat_thread':
+            operation = Operation(Query, name='ChatThreadProjection', variables={'id': Arg(non_null(UUID))})
+            thread = operation.chat_thread(id=Variable('id'))
+            thread.id()
+            thread.entry_count()
+            thread.title()
+            thread.copilot_id()
+            entries = thread.entries()
+        else:
+            operation = Operation(Query, name='AllChatEntriesProjection',
+                                  variables={'offset': Arg(Int), 'limit': Arg(Int), 'filters': Arg(JSON)})
+            entries = operation.all_chat_entries(offset=Variable('offset'), limit=Variable('limit'),
+                                                 filters=Variable('filters'))
+
+        entries.id()
+        _select_fields(entries, [field for field in fields if field != 'id'])
+
+        return operation
+
+    return prepared_operation((query, fields), build)
+
+
+def _entry_operation(query: str, profile: ChatEntryProfile, fields: Optional[List[str]]):
+    if fields:
+        return _projected_operation(query, fields)
+    if profile not in ('full', 'light'):
+        raise ValueError(f"profile must be 'full' or 'light', got {profile!r}")
+
+    return getattr(Operations.query, query if profile == 'full' else f'{query}_light')
+
+
+
+def _thread_header_operation() -> PreparedOperation:
+    """
+    Return the prepared query for a thread's own fields, without its entries.
+    """
+    def build():
+        operation = Operation(Query, name='ChatThreadHeader', variables={'id': Arg(non_null(UUID))})
+        thread = operation.chat_thread(id=Variable('id'))
+        thread.id()
+        thread.entry_count()
+        thread.title()
+        thread.copilot_id()
+
+        return operation
+
+    return prepared_operation(('chat_thread_header',), build)
+
+def _asked_second(asked_at: Optional[str]) -> Optional[str]:
+    # askedAt as the askedDate filters take it: UTC, to the second
+    if not asked_at:
+        return None
+
+    value = datetime.fromisoformat(asked_at)
+
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+
+    return value.strftime(_ASKED_DATE_FORMAT)
+
+
+def _asked_after(filters: Optional[dict], watermark: Optional[str]) -> Optional[dict]:
+    """
+    Narrow get_all_chat_entries filters to entries asked after the watermark, keeping any upper date bound.
+    """
+    if not watermark:
+        return filters
+
+    filters = copy.deepcopy(filters) if filters else {}
+    date_to = (filters.get('askedDate') or {}).get('dateTo')
+    filters['askedDate'] = {
+        'dateFrom': watermark,
+        'dateTo': date_to,
+        'filterType': 'date',
+        'type': 'askedBetween' if date_to else 'askedAfter',
+    }
+
+    return filters
+
 
 class Chat:
     def __init__(self, gql_client: GraphQlClient, config: ClientConfig):
@@ -156,6 +408,42 @@ class Chat:
 
         return result.user_chat_entries
     
+    def sync_thread(self, thread_id: str, cache: ThreadCache) -> list[dict]:
+        """
+        Brings a thread in the cache up to date and returns its entries, fetching only what changed.
+
+        The thread's entry count is read without its entries. Entries are then fetched with get_entries from the
+        first cached entry that had not finished, or after the last cached entry, to the end of the thread;
+        finished entries are never fetched again. When the thread has fewer entries than the cache (entries
+        were canceled or deleted) it is fetched whole.
+
+        Example:
+
+            cache = ThreadCache("threads.db")
+            entries = max.chat.sync_thread(thread_id, cache)
+
+        :param thread_id: the ID of the thread to sync
+        :param cache: the ThreadCache to update
+        :return: the thread's entries in order, as returned by get_entries; empty if the thread does not exist
+        """
+        result = self.gql_client.submit(_thread_header_operation(), {'id': UUID(thread_id)})
+        thread = result.chat_thread
+
+        if getattr(thread, 'id', None) is None:
+            cache.invalidate(thread_id)
+            return []
+
+        entry_count = thread.entry_count or 0
+        cached = cache.entries(thread_id)
+        start = cache.resume_position(thread_id) if len(cached) <= entry_count else 0
+        entries = self.get_entries(thread_id, offset=start, limit=entry_count - start) if start < entry_count else []
+
+        copilot_id = str(thread.copilot_id) if thread.copilot_id else None
+        cache.write({'id': str(thread.id), 'title': thread.title, 'copilot_id': copilot_id, 'entry_count': entry_count},
+                    entries or [], start)
+
+        return cache.entries(thread_id)
+
     def evaluate_entry(self, entry_id: str, evals: list[str]):
         """
         Runs and fetches the inputted evaluations for a given entry.
@@ -208,12 +496,16 @@ class Chat:
 
         return result.share_thread
 
-    def get_chat_entry(self, entry_id: str) -> MaxChatEntry:
+    def get_chat_entry(self, entry_id: str, profile: ChatEntryProfile = "full", fields: list[str] = None) -> MaxChatEntry:
         """
         Retrieve a chat entry by its ID.
 
         Args:
             entry_id: The ID of the chat entry to retrieve
+            profile: 'full' (default) selects every answer field; 'light' skips the pipeline profile,
+                diagnostics, report parameters, custom payloads and content blocks.
+            fields: (optional) dotted field paths to select instead of a profile, e.g.
+                ['question.nl', 'answer.message']. The entry id is always selected.
 
         Returns:
             MaxChatEntry: The chat entry object
@@ -222,16 +514,20 @@ class Chat:
             'id': UUID(entry_id),
         }
 
-        op = Operations.query.chat_entry
+        op = _entry_operation('chat_entry', profile, fields)
         result = self.gql_client.submit(op, get_chat_entry_args)
         return result.chat_entry
 
-    def get_chat_thread(self, thread_id: str) -> MaxChatThread:
+    def get_chat_thread(self, thread_id: str, profile: ChatEntryProfile = "full", fields: list[str] = None) -> MaxChatThread:
         """
         Retrieve a chat thread by its ID.
 
         Args:
             thread_id: The ID of the chat thread to retrieve
+            profile: 'full' (default) selects every answer field of each entry; 'light' skips the pipeline
+                profile, diagnostics, report parameters, custom payloads and content blocks.
+            fields: (optional) dotted field paths to select on each entry instead of a profile, e.g.
+                ['answer.message']. Entry ids and the thread's own fields are always selected.
 
         Returns:
             MaxChatThread: The chat thread object
@@ -240,7 +536,7 @@ class Chat:
             'id': UUID(thread_id),
         }
 
-        op = Operations.query.chat_thread
+        op = _entry_operation('chat_thread', profile, fields)
         result = self.gql_client.submit(op, get_chat_thread_args)
         return result.chat_thread
 
@@ -315,6 +611,390 @@ class Chat:
 
         return result.cancel_chat_question
 
+    def ask_question_stream(self, copilot_id: str, question: str, thread_id: str = None, skip_report_cache: bool = False, model_overrides: dict = None, indicated_skills: list[str] = None, history: list[dict] = None, thread_type: ThreadType = "CHAT", pipeline_type: PipelineType = None, poll_interval: float = CHAT_POLL_INTERVAL, max_poll_interval: float = CHAT_MAX_POLL_INTERVAL, timeout: float = None) -> Iterator[ChatStreamUpdate]:
+        """
+        Asks a question like ask_question, but yields updates while the pipeline runs instead of blocking until it
+        finishes. The question is queued, then its entry is polled with a query that selects only the fields that
+        change while it runs; the full entry is fetched once, when it has finished.
+
+        Updates, in order: one 'queued' update with the shell entry, a 'loading' update whenever the status
+        message changes, a 'content_block' update for each new content block, and a 'final' update with the
+        complete entry, its final message and any error.
+
+        Example:
+
+            for update in max.chat.ask_question_stream(copilot_id, "What were sales last quarter?"):
+                if update.type == 'content_block':
+                    render(update.content_block)
+                elif update.type == 'final':
+                    entry = update.entry
+
+        :param copilot_id: the ID of the copilot to run the question against. Used to create a thread when thread_id is not given.
+        :param question: The natural language question to ask the engine.
+        :param thread_id: (optional) ID of the thread to run the question on. A new thread is created if not given.
+        :param skip_report_cache: Should the report cache be skipped for this question?
+        :param model_overrides: If provided, a dictionary of model types to model names to override the LLM model used. Model type options are 'CHAT', 'EMBEDDINGS', 'NARRATIVE'
+        :param indicated_skills: If provided, a list of skill names that the copilot will be limited to choosing from.
+        :param history: If provided, a list of messages to be used as the conversation history for the question
+        :param thread_type: the type of thread to create when thread_id is not given. Defaults to CHAT.
+        :param pipeline_type: If provided, specifies which pipeline type to use for processing the question: 'MAX' or 'RESEARCH'.
+        :param poll_interval: seconds between polls while the answer is changing. Backs off while it is not.
+        :param max_poll_interval: the longest wait between polls.
+        :param timeout: (optional) seconds to wait for the answer before raising TimeoutError. The question keeps running; cancel it with cancel_chat_question if needed.
+        :return: an iterator of ChatStreamUpdate
+        """
+        if not thread_id:
+            thread_id = str(self.create_new_thread(copilot_id, thread_type).id)
+
+        entry = self.queue_chat_question(question, thread_id, skip_cache=skip_report_cache,
+                                         model_overrides=model_overrides, indicated_skills=indicated_skills,
+                                         history=history, pipeline_type=pipeline_type)
+        entry_id = str(entry.id)
+        yield ChatStreamUpdate('queued', entry_id, thread_id=thread_id, entry=entry)
+
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        interval = poll_interval
+        message = None
+        seen_blocks = set()
+
+        while True:
+            status = self._fetch_entries([entry_id]).get(entry_id)
+            answer = getattr(status, 'answer', None)
+            changed = False
+
+            if answer is not None:
+                if answer.message and answer.message != message and not answer.has_finished:
+                    message = answer.message
+                    changed = True
+                    yield ChatStreamUpdate('loading', entry_id, thread_id=thread_id, message=message)
+
+                for report in answer.report_results or []:
+                    for block in report.content_blocks or []:
+                        if str(block.id) not in seen_blocks:
+                            seen_blocks.add(str(block.id))
+                            changed = True
+                            yield ChatStreamUpdate('content_block', entry_id, thread_id=thread_id,
+                                                   report_title=report.title, content_block=block)
+
+                if answer.has_finished:
+                    final = self.get_chat_entry(entry_id)
+                    final_answer = final.answer
+                    yield ChatStreamUpdate('final', entry_id, thread_id=thread_id,
+                                           message=getattr(final_answer, 'message', None), entry=final,
+                                           error=getattr(final_answer, 'error', None))
+                    return
+
+            interval = poll_interval if changed else min(interval * CHAT_POLL_BACKOFF, max_poll_interval)
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+
+                if remaining <= 0:
+                    raise TimeoutError(f"chat entry {entry_id} did not finish within {timeout} seconds")
+
+                interval = min(interval, remaining)
+
+            time.sleep(interval)
+
+    def wait_for_entries(self, entry_ids: list[str], timeout: float = None, poll_interval: float = CHAT_POLL_INTERVAL, max_poll_interval: float = CHAT_MAX_POLL_INTERVAL, batch_size: int = CHAT_POLL_BATCH_SIZE, cancel_pending: bool = False) -> Iterator[MaxChatEntry]:
+        """
+        Waits for queued chat entries to finish and yields each complete entry as soon as it has, in completion
+        order, like concurrent.futures.as_completed.
+
+        All pending entries are polled together, up to batch_size per request, with a query for only the finished and
+        error flags. Entries
+        that finish in the same poll are then fetched in full with one request. The wait between polls starts at
+        poll_interval, resets whenever an entry finishes and backs off up to max_poll_interval while none do.
+        Entries that no longer exist (e.g. canceled elsewhere) are logged and skipped.
+
+        Example:
+
+            entry_ids = [max.chat.queue_chat_question(q, thread_id).id for q in questions]
+            for entry in max.chat.wait_for_entries(entry_ids, timeout=600):
+                print(entry.question.nl, entry.answer.message)
+
+        :param entry_ids: the ids of the chat entries to wait for, as returned by queue_chat_question
+        :param timeout: (optional) seconds to wait for all entries before raising TimeoutError
+        :param poll_interval: the shortest wait between polls, in seconds
+        :param max_poll_interval: the longest wait between polls, in seconds
+        :param batch_size: the most entries polled by one request
+        :param cancel_pending: cancel the entries still running, with cancel_chat_question, when the wait ends early because of the timeout or because the caller stops iterating
+        :return: an iterator of finished MaxChatEntry objects
+        """
+        pending = list(dict.fromkeys(str(entry_id) for entry_id in entry_ids))
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        interval = poll_interval
+
+        try:
+            while pending:
+                finished = self._poll_finished(pending, batch_size)
+                # taken out of pending before any is yielded, so a caller that stops early never cancels them
+                pending = [entry_id for entry_id in pending if entry_id not in finished]
+
+                for entry_id, entry in finished.items():
+                    if entry is None:
+                        logger.warning("chat entry %s no longer exists; not waiting for it", entry_id)
+                    else:
+                        yield entry
+
+                if not pending:
+                    return
+
+                interval = poll_interval if finished else min(interval * CHAT_POLL_BACKOFF, max_poll_interval)
+
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+
+                    if remaining <= 0:
+                        raise TimeoutError(f"{len(pending)} of {len(entry_ids)} chat entries did not finish within {timeout} seconds")
+
+                    interval = min(interval, remaining)
+
+                time.sleep(interval)
+        finally:
+            if cancel_pending:
+                for entry_id in pending:
+                    try:
+                        self.cancel_chat_question(entry_id)
+                    except Exception as e:
+                        logger.warning("failed to cancel chat entry %s: %s", entry_id, e)
+
+    def run_batch(self, copilot_id: str, questions: list[str], concurrency: int = CHAT_BATCH_CONCURRENCY, variants: Dict[str, dict] = None, path=None, timeout: float = None, max_questions_per_minute: float = None, skip_report_cache: bool = False, indicated_skills: list[str] = None, thread_type: ThreadType = "CHAT", poll_interval: float = CHAT_POLL_INTERVAL, max_poll_interval: float = CHAT_MAX_POLL_INTERVAL) -> pd.DataFrame:
+        """
+        Asks every question under every variant and collects the answers, for regression testing a copilot.
+
+        Each question is asked in its own new thread. Up to `concurrency` questions are queued at once; their
+        entries are polled together as in wait_for_entries, and a new question is queued as soon as one finishes.
+        max_questions_per_minute spaces out the queueing to stay under rate limits. If polling fails, the entries
+        that poll covered are recorded as failed and canceled while the others keep running.
+
+        With path, each run is appended to a JSON lines file as soon as it finishes. Calling again with the same
+        path skips the runs already recorded there as successful, so an interrupted batch picks up where it stopped
+        and failed runs are retried. Questions still running when the batch is interrupted are canceled.
+
+        latency_seconds runs from the entry's askedAt to its answer's answeredAt, as recorded by the server; for
+        questions that time out or cannot be polled it is the time measured on the client.
+
+        Example:
+
+            results = max.chat.run_batch(copilot_id, questions, concurrency=10, path="regression.jsonl", variants={
+                "baseline": {},
+                "gpt-4.1": {"model_overrides": {"CHAT": "gpt-4.1"}},
+                "research": {"pipeline_type": "RESEARCH"},
+            })
+            results.groupby("variant")[["success", "latency_seconds"]].mean()
+
+        :param copilot_id: the ID of the copilot to ask the questions against
+        :param questions: the natural language questions
+        :param concurrency: the most questions being answered at once
+        :param variants: (optional) settings to replay the batch under, by label. Each value may set 'model_overrides' and 'pipeline_type' as in queue_chat_question. Defaults to one 'default' variant with neither.
+        :param path: (optional) a JSON lines file the runs are appended to, and resumed from
+        :param timeout: (optional) seconds a question may run before it is canceled and recorded as timed out
+        :param max_questions_per_minute: (optional) the most questions queued per minute
+        :param skip_report_cache: Should the report cache be skipped for every question?
+        :param indicated_skills: If provided, the skill names every question is limited to
+        :param thread_type: the type of the threads created for the questions. Defaults to CHAT.
+        :param poll_interval: the shortest wait between polls, in seconds
+        :param max_poll_interval: the longest wait between polls, in seconds
+        :return: a DataFrame with one row per question and variant, in input order, with question, variant, model_overrides, pipeline_type, success, error, message, thread_id, entry_id, answer_id, copilot_skill_id, report_count, content_block_count, latency_seconds and chat_pipeline_profile
+        """
+        variants = variants or {'default': {}}
+        records: Dict[tuple, dict] = {}
+
+        if path is not None and os.path.exists(path):
+            # a batch killed mid-write leaves a partial last line
+            drop_partial_line(path)
+
+            for record in read_records(path):
+                if record.get('success'):
+                    records[(record['question'], record['variant'])] = record
+
+        pending = [(question, variant) for question in dict.fromkeys(questions) for variant in variants
+                   if (question, variant) not in records]
+        pending.reverse()
+        in_flight: Dict[str, dict] = {}
+        queue_interval = 60.0 / max_questions_per_minute if max_questions_per_minute else 0.0
+        next_queue_at = 0.0
+        interval = poll_interval
+
+        def new_record(question: str, variant: str) -> dict:
+            settings = variants[variant]
+            return {
+                'question': question,
+                'variant': variant,
+                'model_overrides': settings.get('model_overrides'),
+                'pipeline_type': settings.get('pipeline_type'),
+                'success': False,
+                'error': None,
+                'message': None,
+                'thread_id': None,
+                'entry_id': None,
+                'answer_id': None,
+                'copilot_skill_id': None,
+                'report_count': None,
+                'content_block_count': None,
+                'latency_seconds': None,
+                'chat_pipeline_profile': None,
+            }
+
+        with open(path, 'a', encoding='utf-8') if path is not None else contextlib.nullcontext() as f:
+            def finish(record: dict):
+                records[(record['question'], record['variant'])] = record
+
+                if f is not None:
+                    f.write(json.dumps(record, default=str))
+                    f.write('\n')
+                    f.flush()
+
+            def abandon(entry_id: str, error: str):
+                record = in_flight.pop(entry_id)
+                record['latency_seconds'] = time.monotonic() - record.pop('_started')
+                record['error'] = error
+
+                try:
+                    self.cancel_chat_question(entry_id)
+                except Exception as e:
+                    logger.warning("failed to cancel chat entry %s: %s", entry_id, e)
+
+                finish(record)
+
+            try:
+                while pending or in_flight:
+                    while pending and len(in_flight) < concurrency and time.monotonic() >= next_queue_at:
+                        question, variant = pending.pop()
+                        settings = variants[variant]
+                        record = new_record(question, variant)
+                        next_queue_at = time.monotonic() + queue_interval
+
+                        try:
+                            record['thread_id'] = str(self.create_new_thread(copilot_id, thread_type).id)
+                            entry = self.queue_chat_question(question, record['thread_id'], skip_cache=skip_report_cache,
+                                                             model_overrides=settings.get('model_overrides'),
+                                                             indicated_skills=indicated_skills,
+                                                             pipeline_type=settings.get('pipeline_type'))
+                            record['entry_id'] = str(entry.id)
+                            record['_started'] = time.monotonic()
+                            in_flight[record['entry_id']] = record
+                        except Exception as e:
+                            record['error'] = str(e)
+                            finish(record)
+
+                    finished = {}
+                    polled = list(in_flight)
+
+                    for start in range(0, len(polled), CHAT_POLL_BATCH_SIZE):
+                        batch = polled[start:start + CHAT_POLL_BATCH_SIZE]
+
+                        try:
+                            finished.update(self._poll_finished(batch, CHAT_POLL_BATCH_SIZE))
+                        except Exception as e:
+                            # a failed poll fails only the entries it covered; the others keep running
+                            for entry_id in batch:
+                                abandon(entry_id, f'polling failed: {e}')
+
+                    for entry_id, entry in finished.items():
+                        record = in_flight.pop(entry_id)
+                        record['latency_seconds'] = time.monotonic() - record.pop('_started')
+
+                        if entry is None:
+                            record['error'] = 'chat entry no longer exists'
+                        else:
+                            answer = entry.answer
+                            report_results = answer.report_results or []
+                            asked_at = getattr(entry.question, 'asked_at', None)
+
+                            # the server's own timestamps, not when a poll happened to notice the answer
+                            if asked_at and answer.answered_at:
+                                record['latency_seconds'] = (answer.answered_at - asked_at).total_seconds()
+
+                            record.update({
+                                'success': not answer.error,
+                                'error': answer.error,
+                                'message': answer.message,
+                                'answer_id': str(answer.answer_id) if answer.answer_id else None,
+                                'copilot_skill_id': str(answer.copilot_skill_id) if answer.copilot_skill_id else None,
+                                'report_count': len(report_results),
+                                'content_block_count': sum(len(report.content_blocks or []) for report in report_results),
+                                'chat_pipeline_profile': answer.chat_pipeline_profile,
+                            })
+
+                        finish(record)
+
+                    if timeout is not None:
+                        for entry_id, record in list(in_flight.items()):
+                            if time.monotonic() - record['_started'] > timeout:
+                                abandon(entry_id, f'timed out after {timeout} seconds')
+
+                    if not pending and not in_flight:
+                        break
+
+                    interval = poll_interval if finished else min(interval * CHAT_POLL_BACKOFF, max_poll_interval)
+
+                    if pending and len(in_flight) < concurrency:
+                        interval = min(interval, max(0.0, next_queue_at - time.monotonic()))
+
+                    time.sleep(interval)
+            finally:
+                for entry_id in in_flight:
+                    try:
+                        self.cancel_chat_question(entry_id)
+                    except Exception as e:
+                        logger.warning("failed to cancel chat entry %s: %s", entry_id, e)
+
+        rows = [records[(question, variant)] for question in dict.fromkeys(questions) for variant in variants]
+
+        return pd.DataFrame(rows, columns=list(new_record('', next(iter(variants)))))
+
+    def _poll_finished(self, entry_ids: List[str], batch_size: int) -> Dict[str, Optional[MaxChatEntry]]:
+        """
+        Poll the status of the given entries, batch_size per request, and fetch the finished ones in full.
+
+        Returns the full entries that have finished by id; entries that no longer exist map to None.
+        """
+        finished = []
+        missing = []
+
+        for start in range(0, len(entry_ids), batch_size):
+            for entry_id, status in self._fetch_entries(entry_ids[start:start + batch_size], 'completion').items():
+                if status is None:
+                    missing.append(entry_id)
+                elif status.answer is not None and status.answer.has_finished:
+                    finished.append(entry_id)
+
+        entries = {}
+
+        for start in range(0, len(finished), batch_size):
+            entries.update(self._fetch_entries(finished[start:start + batch_size], 'full'))
+
+        entries.update((entry_id, None) for entry_id in missing)
+
+        return entries
+
+    def _fetch_entries(self, entry_ids: List[str], selection: str = 'status') -> Dict[str, Optional[MaxChatEntry]]:
+        """
+        Fetch several chat entries in one request, keyed by entry id, with the 'completion', 'status' or 'full'
+        selection; see _chat_entries_operation.
+
+        Entries that do not exist or that fail to resolve map to None; a failure of the request itself raises.
+        """
+        if not entry_ids:
+            return {}
+
+        operation = _chat_entries_operation(len(entry_ids), selection)
+        variables = {f'id{i}': UUID(entry_id) for i, entry_id in enumerate(entry_ids)}
+        result, errors = self.gql_client.submit_partial(operation, variables)
+
+        for error in errors:
+            logger.debug("chat entry fetch failed at %s: %s", error.get('path'), error.get('message'))
+
+        entries = {}
+
+        for i, entry_id in enumerate(entry_ids):
+            entry = getattr(result, f'entry{i}', None) if result is not None else None
+            entries[entry_id] = entry if getattr(entry, 'id', None) is not None else None
+
+        return entries
+
     def get_user(self, user_id: str) -> MaxChatUser:
         """
         This fetches a user by their ID.
@@ -337,12 +1017,14 @@ class Chat:
 
         return result.user
 
-    def get_all_chat_entries(self, offset=0, limit=100, filters=None) -> list[MaxChatEntry]:
+    def get_all_chat_entries(self, offset=0, limit=100, filters=None, profile: ChatEntryProfile = "full", fields: list[str] = None) -> list[MaxChatEntry]:
         """
         Fetches all chat entries with optional filters.
         :param offset: the offset to start fetching entries from. Default is 0.
         :param limit: the maximum number of entries to fetch. Default is 100.
         :param filters: a dictionary of filters to apply to the query. Supports all filtering available in the query browser.
+        :param profile: 'full' (default) selects every answer field; 'light' skips the pipeline profile, diagnostics, report parameters, custom payloads and content blocks.
+        :param fields: (optional) dotted field paths to select on each entry instead of a profile, e.g. ['question.nl', 'answer.message', 'answer.report_results.title']. Entry ids are always selected.
 
         Example Filter after a date:
 
@@ -436,12 +1118,178 @@ class Chat:
             'filters': filters,
         }
 
-        operation = Operations.query.all_chat_entries
+        operation = _entry_operation('all_chat_entries', profile, fields)
 
         result = self.gql_client.submit(operation, get_all_chat_entries_query_args)
 
         return result.all_chat_entries
     
+    def iter_all_chat_entries(self, filters: dict = None, page_size: int = DEFAULT_PAGE_SIZE, prefetch_pages: int = DEFAULT_PREFETCH_PAGES, offset: int = 0, profile: ChatEntryProfile = "full", fields: list[str] = None) -> Iterator[MaxChatEntry]:
+        """
+        Iterates over every chat entry matching the filters, walking all pages of get_all_chat_entries.
+
+        The query does not report a total, so pages are read one ahead of the consumer until a short page is
+        returned. Every page is requested with the same filters.
+        :param filters: (optional) the filters of get_all_chat_entries
+        :param page_size: the number of entries requested per page
+        :param prefetch_pages: the maximum number of pages fetched ahead
+        :param offset: the number of matching entries to skip, e.g. to resume an earlier iteration
+        :param profile: 'full' or 'light'; see get_all_chat_entries
+        :param fields: (optional) field paths to select; see get_all_chat_entries
+        :return: an iterator of ChatEntry objects, in page order
+        """
+        def fetch_page(page_num, size):
+            # the filters are copied per request since pages are fetched on a background thread
+            rows = self.get_all_chat_entries(offset=offset + (page_num - 1) * size, limit=size,
+                                             filters=copy.deepcopy(filters), profile=profile, fields=fields)
+
+            return SimpleNamespace(rows=rows)
+
+        return iter_paged_rows(fetch_page, page_size, prefetch_pages)
+
+    def export_chat_entries(self, path, filters: dict = None, format: Literal['jsonl', 'parquet'] = "jsonl", chunk_size: int = CHAT_EXPORT_CHUNK_SIZE, page_size: int = DEFAULT_PAGE_SIZE, prefetch_pages: int = DEFAULT_PREFETCH_PAGES, resume: Optional[Literal['offset', 'watermark']] = "offset", profile: ChatEntryProfile = "full", fields: list[str] = None) -> int:
+        """
+        Exports every chat entry matching the filters to disk, streaming chunk_size entries at a time so memory
+        stays bounded however many entries there are.
+
+        JSON lines output is a single file. Parquet output is a directory of part files (part-00000.parquet, ...),
+        one per chunk, that pandas.read_parquet reads as one table; it needs pyarrow or fastparquet, which are not
+        dependencies of this package. Every part has the same string columns (id, threadId and the nested objects
+        question, answer, feedback, user and skillMemoryPayload as JSON), null where an entry has no value or the
+        field was not selected.
+
+        After every chunk the export records its progress next to the output (_progress.json in the Parquet
+        directory, <path>.progress.json for JSON lines): the offset reached and the latest askedAt exported so far.
+        That latest askedAt becomes the watermark only when the export runs to the end, so the watermark never
+        skips entries of an unfinished run whatever order they are returned in. Output written after the last
+        recorded chunk is discarded on resume, so a crash never leaves duplicate or partial rows.
+        :param path: the directory (parquet) or file (jsonl) to write
+        :param filters: (optional) the filters of get_all_chat_entries. A resumed export must use the same filters.
+        :param format: 'jsonl' (default) or 'parquet'
+        :param chunk_size: the number of entries written, and checkpointed, at a time
+        :param page_size: the number of entries requested per page
+        :param prefetch_pages: the maximum number of pages fetched ahead
+        :param resume: 'offset' (default) continues an interrupted export at the offset it reached; use it for a fixed set of entries, such as a closed date range. 'watermark' adds only the entries asked after the watermark of the last completed export, for rolling incremental exports; an interrupted run is first finished from its offset. None starts over, replacing existing output.
+        :param profile: 'full' or 'light'; see get_all_chat_entries
+        :param fields: (optional) field paths to select; see get_all_chat_entries. question.asked_at is always added so the watermark can be kept.
+        :return: the number of entries written by this call
+        """
+        if format not in CHAT_EXPORT_FORMATS:
+            raise ValueError(f"format must be one of {CHAT_EXPORT_FORMATS}, got {format!r}")
+        if format == 'parquet' and not any(importlib.util.find_spec(engine) for engine in ('pyarrow', 'fastparquet')):
+            raise ImportError("Parquet export needs pyarrow or fastparquet; install one or use format='jsonl'")
+        if resume not in (None, 'offset', 'watermark'):
+            raise ValueError(f"resume must be 'offset', 'watermark' or None, got {resume!r}")
+
+        path = os.fspath(path)
+        progress_path = os.path.join(path, '_progress.json') if format == 'parquet' else f'{path}.progress.json'
+        filters_fingerprint = fingerprint(filters)
+        progress = None
+
+        if fields:
+            fields = [*fields, 'question.asked_at']
+        if format == 'parquet':
+            os.makedirs(path, exist_ok=True)
+
+        if resume and os.path.exists(progress_path):
+            with open(progress_path, encoding='utf-8') as f:
+                progress = json.load(f)
+
+            if progress.get('filters') != filters_fingerprint or progress.get('format') != format:
+                raise ValueError(f"{path} was exported with different filters or format; pass resume=None to start over")
+
+        if progress is None:
+            if os.path.exists(progress_path):
+                os.remove(progress_path)
+
+            progress = {'format': format, 'filters': filters_fingerprint, 'query_watermark': None,
+                        'query_watermark_ids': [], 'offset': 0, 'rows': 0, 'bytes': 0, 'parts': 0, 'cursor': None,
+                        'cursor_ids': [], 'watermark': None, 'watermark_ids': [], 'complete': False}
+        elif resume == 'watermark' and progress['complete'] and progress['watermark']:
+            progress.update(query_watermark=progress['watermark'], query_watermark_ids=progress['watermark_ids'], offset=0)
+
+        progress['complete'] = False
+
+        # drop anything written after the last checkpoint
+        if format == 'parquet':
+            for part in glob.glob(os.path.join(path, 'part-*.parquet')) + glob.glob(os.path.join(path, '.part-*')):
+                name = os.path.basename(part)
+
+                if name.startswith('.') or int(name[len('part-'):-len('.parquet')]) >= progress['parts']:
+                    os.remove(part)
+        else:
+            with open(path, 'ab') as f:
+                f.truncate(progress['bytes'])
+
+        query_filters = _asked_after(filters, progress['query_watermark'])
+        # entries asked in the watermark's second may have been exported already; the filter is to the second
+        skip_ids = set(progress['query_watermark_ids'])
+        written = 0
+        consumed = 0
+        chunk = []
+
+        def flush(complete: bool = False):
+            if chunk and format == 'parquet':
+                part = os.path.join(path, f"part-{progress['parts']:05d}.parquet")
+                temp = os.path.join(path, f".part-{progress['parts']:05d}.tmp.parquet")
+                write_records(chunk, temp, json_columns=_CHAT_ENTRY_JSON_COLUMNS, columns=_CHAT_ENTRY_COLUMNS)
+                os.replace(temp, part)
+                progress['parts'] += 1
+            elif chunk:
+                with open(path, 'a', encoding='utf-8') as f:
+                    for record in chunk:
+                        f.write(json.dumps(record, default=str))
+                        f.write('\n')
+
+                    f.flush()
+                    os.fsync(f.fileno())
+                    progress['bytes'] = f.tell()
+
+            for record in chunk:
+                asked_at = _asked_second((record.get('question') or {}).get('askedAt'))
+
+                if asked_at is None:
+                    continue
+                if progress['cursor'] is None or asked_at > progress['cursor']:
+                    progress['cursor'] = asked_at
+                    progress['cursor_ids'] = []
+                if asked_at == progress['cursor']:
+                    progress['cursor_ids'].append(record['id'])
+
+            if complete:
+                # the run reached the end: everything up to the cursor is exported, so it becomes the watermark
+                progress.update(complete=True, watermark=progress['cursor'], watermark_ids=progress['cursor_ids'])
+
+            progress['offset'] += consumed
+            progress['rows'] += len(chunk)
+            temp = f'{progress_path}.tmp'
+
+            with open(temp, 'w', encoding='utf-8') as f:
+                json.dump(progress, f)
+
+            os.replace(temp, progress_path)
+
+        for entry in self.iter_all_chat_entries(query_filters, page_size, prefetch_pages, offset=progress['offset'],
+                                                profile=profile, fields=fields):
+            consumed += 1
+            record = entry.__to_json_value__()
+
+            if record.get('id') in skip_ids:
+                continue
+
+            chunk.append(record)
+
+            if len(chunk) >= chunk_size:
+                flush()
+                written += len(chunk)
+                consumed = 0
+                chunk = []
+
+        flush(complete=True)
+        written += len(chunk)
+
+        return written
+
     def get_skill_memory_payload(self, chat_entry_id: str) -> dict:
         """
         Fetches the skill memory payload for a given chat entry.
@@ -574,10 +1422,11 @@ class Chat:
         result = self.gql_client.submit(op, get_test_run_output_args)
         return result.get_test_run_output
 
-    def get_dataframes_for_entry(self, entry_id: str) -> [pd.DataFrame]:
+    def get_dataframes_for_entry(self, entry_id: str, compact: bool = False) -> [pd.DataFrame]:
         """
         This fetches the dataframes (with metadata) for a given chat entry.
         :param entry_id: The answer entry to fetch dataframes for
+        :param compact: shrink each dataframe with compact_dataframe (categories, downcast numbers, parsed dates)
         :return: a list of dataframes and metadata for the given chat entry
         """
         get_dataframes_for_entry_args = {
@@ -592,6 +1441,8 @@ class Chat:
 
         def transform_df(df_dict: dict):
             df = pd.read_csv(io.StringIO(df_dict.get("df")))
+            if compact:
+                df = compact_dataframe(df)
             df.max_metadata.hydrate(df_dict.get("metadata", {}))
             return {**df_dict, "df": df}
 
@@ -1,30 +1,185 @@
 from __future__ import annotations
 
+import contextlib
+import copy
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, field
-from typing import Any, Optional, List, Dict
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Optional, List, Dict, Iterator
 from uuid import UUID
 
 import pandas as pd
 from pandas import DataFrame
-from sgqlc.operation import Fragment
+from sgqlc.operation import Fragment, Operation
 from sgqlc.types import Variable, Arg, non_null, String, Int, list_of, Boolean
 
 from answer_rocket.client_config import ClientConfig
-from answer_rocket.graphql.client import GraphQlClient
+from answer_rocket.graphql.client import GraphQlClient, PreparedOperation, prepared_operation
 from answer_rocket.graphql.schema import UUID as GQL_UUID, GenerateVisualizationResponse, MaxMetricAttribute, \
     MaxDimensionEntity, MaxFactEntity, \
     MaxNormalAttribute, \
     MaxPrimaryAttribute, MaxReferenceAttribute, MaxCalculatedMetric, MaxDataset, MaxCalculatedAttribute, \
     MaxMutationResponse, JSON, RunSqlAiResponse, GroundedValueResponse, Dimension, \
     Metric, Dataset, DatasetDataInterval, Database, DatabaseSearchInput, PagingInput, PagedDatabases, \
-    DatabaseTableSearchInput, PagedDatabaseTables, CreateDatasetFromTableResponse, DatasetSearchInput, PagedDatasets, \
+    DatabaseTableSearchInput, PagedDatabaseTables, DatabaseTable, CreateDatasetFromTableResponse, DatasetSearchInput, PagedDatasets, \
     DatabaseKShotSearchInput, PagedDatabaseKShots, DatabaseKShot, CreateDatabaseKShotResponse, \
-    DatasetKShotSearchInput, PagedDatasetKShots, DatasetKShot, CreateDatasetKShotResponse, TrackedItem, TrackedDimensionValuesPage
+    DatasetKShotSearchInput, PagedDatasetKShots, DatasetKShot, CreateDatasetKShotResponse, TrackedItem, TrackedDimensionValuesPage, TrackedDimensionValueRow, \
+    Query, Mutation
 from answer_rocket.graphql.sdk_operations import Operations
 from answer_rocket.types import MaxResult, RESULT_EXCEPTION_CODE
+from answer_rocket.util.dataset_index import DatasetIndex
+from answer_rocket.util.grounding_index import GroundingIndex
+from answer_rocket.util.profiling import PROFILE_TOP_K, build_profile, profile_dialect, profile_stats_sql, \
+    profile_top_values_sql
+from answer_rocket.util.paging import iter_paged_rows, DEFAULT_PAGE_SIZE, DEFAULT_PREFETCH_PAGES
+from answer_rocket.util.records import read_records, write_records
+from answer_rocket.util.spill import SpilledResult
+from answer_rocket.util.catalog import CatalogSnapshot, fingerprint
+from answer_rocket.util.compact import compact_dataframe
+from answer_rocket.util.downsample import reduce_visualization_data
+from answer_rocket.util.dataset_snapshot import DatasetSnapshot
+
+# Dataset settings diffed by Data.apply_dataset: (change target, mutation, {dataset json key: mutation argument}).
+# Each mutation sets all of its arguments, so a change to any key sends the whole group.
+_DATASET_SETTING_MUTATIONS = [
+    ('name', 'update_dataset_name', {'name': 'name'}),
+    ('description', 'update_dataset_description', {'description': 'description'}),
+    ('date_range', 'update_dataset_date_range', {'datasetMinDate': 'dataset_min_date', 'datasetMaxDate': 'dataset_max_date'}),
+    ('data_interval', 'update_dataset_data_interval', {'dataInterval': 'data_interval'}),
+    ('misc_info', 'update_dataset_misc_info', {'miscInfo': 'misc_info'}),
+    ('source', 'update_dataset_source', {'sourceTable': 'source_table', 'sourceSql': 'source_sql', 'derivedTableAlias': 'derived_table_alias'}),
+    ('query_row_limit', 'update_dataset_query_row_limit', {'queryRowLimit': 'query_row_limit'}),
+    ('use_database_casing', 'update_dataset_use_database_casing', {'useDatabaseCasing': 'use_database_casing'}),
+    ('kshot_limit', 'update_dataset_kshot_limit', {'kShotLimit': 'k_shot_limit'}),
+]
+
+# K-shot json keys that have an update_*_kshot_<argument> mutation, mapped to that argument; see Data.import_dataset_kshots.
+_KSHOT_UPDATE_ARGS = {
+    'question': 'question',
+    'renderedPrompt': 'rendered_prompt',
+    'explanation': 'explanation',
+    'sql': 'sql',
+    'title': 'title',
+    'visualization': 'visualization',
+}
+
+# Enum-valued keys the API accepts in lowercase and returns in uppercase.
+_LOWERCASE_ENUM_KEYS = ('dataInterval', 'dataType', 'metricType', 'growthType')
+
+# Values grounded per aliased request, and how many of those requests run at once; see Data.get_grounded_values.
+GROUNDING_BATCH_SIZE = 25
+GROUNDING_MAX_WORKERS = 4
+
+# Requests Data.crawl_catalog runs at once.
+CRAWL_MAX_WORKERS = 8
+
+# Generated SQL kept by run_max_sql_gen(use_cache=True), and how often a dataset's stamp is rechecked.
+SQL_GEN_CACHE_SIZE = 256
+SQL_GEN_CACHE_REVALIDATE_SECONDS = 60.0
+
+# run_sql_ai calls Data.run_sql_ai_batch runs at once.
+SQL_AI_MAX_WORKERS = 8
+
+# Mutations sent per aliased request, and how many of those requests run at once; see Data.create_dimensions.
+MUTATION_BATCH_SIZE = 50
+MUTATION_MAX_WORKERS = 4
+
+
+def _parse_dataset_date(value) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+
+    value = str(value).replace('Z', '+00:00')
+    parsed = datetime.fromisoformat(value)
+
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _same_dataset_value(key: str, current, desired) -> bool:
+    """
+    Compare a current and desired dataset, dimension or metric value, ignoring differences the API introduces.
+    """
+    if key in _LOWERCASE_ENUM_KEYS and isinstance(current, str) and isinstance(desired, str):
+        return current.lower() == desired.lower()
+
+    if key in ('datasetMinDate', 'datasetMaxDate'):
+        try:
+            return _parse_dataset_date(current) == _parse_dataset_date(desired)
+        except ValueError:
+            return current == desired
+
+    return current == desired
+
+
+def _dataset_setting_arg(key: str, value):
+    """
+    Convert a dataset json value to the form its update_dataset_* mutation argument expects.
+    """
+    if key in ('datasetMinDate', 'datasetMaxDate') and isinstance(value, str) and "Z" not in value:
+        return value + "T00:00:00Z"
+
+    if key == 'dataInterval' and isinstance(value, str):
+        return value.upper()
+
+    return value
+
+
+def _artifact_json(artifact, enum_keys) -> Dict:
+    """
+    Return a dimension or metric as a json dictionary with the enum values the API expects in lowercase.
+    """
+    artifact_json = dict(artifact.__to_json_value__() if hasattr(artifact, '__to_json_value__') else artifact)
+
+    for key in enum_keys:
+        if isinstance(artifact_json.get(key), str):
+            artifact_json[key] = artifact_json[key].lower()
+
+    return artifact_json
+
+
+def _kshot_record(kshot) -> Dict:
+    """
+    Return a dataset or database k-shot as an importable json dictionary, without its sample data.
+    """
+    record = kshot.__to_json_value__()
+    record.pop('sampleData', None)
+
+    return record
+
+
+def _catalog_domain_objects(dataset: MaxDataset) -> List[Dict]:
+    """
+    Flatten a dataset's domain objects, with attributes linked to their entity, for `CatalogSnapshot`.
+    """
+    rows = []
+
+    def add(domain_object, entity_id=None):
+        rows.append({
+            'id': domain_object.id,
+            'type': type(domain_object).__name__,
+            'name': getattr(domain_object, 'name', None),
+            'output_label': getattr(domain_object, 'output_label', None),
+            'description': getattr(domain_object, 'description', None),
+            'entity_id': entity_id,
+        })
+
+    for domain_object in getattr(dataset, 'domain_objects', None) or []:
+        add(domain_object)
+
+        for attribute in getattr(domain_object, 'attributes', None) or []:
+            add(attribute, domain_object.id)
+
+    return rows
 
 
-def create_df_from_data(data: Dict[str, any]):
+def create_df_from_data(data: Dict[str, any], compact: bool = False):
     """
     Create a pandas DataFrame from structured data dictionary.
 
@@ -34,6 +189,9 @@ def create_df_from_data(data: Dict[str, any]):
         A dictionary containing 'columns' and optionally 'rows' keys.
         The 'columns' key should contain a list of column dictionaries with 'name' keys.
         The 'rows' key should contain a list of row dictionaries with 'data' keys.
+    compact : bool, optional
+        Whether to shrink the DataFrame with `compact_dataframe`: low-cardinality strings become categories,
+        numbers are downcast where lossless and date strings are parsed. Defaults to False.
 
     Returns
     -------
@@ -48,9 +206,32 @@ def create_df_from_data(data: Dict[str, any]):
 
     if len(df) == 1 and df.isna().all().all():
         return df.iloc[0:0]  # Returns an empty DataFrame with the same columns
+    elif compact:
+        return compact_dataframe(df)
     else:
         return df
 
+
+class _ResultRows(Sequence):
+    """
+    The values of each row of a query result's 'rows', read in place instead of copied into a new list.
+    """
+
+    def __init__(self, rows: List[Dict]):
+        self._rows = rows
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [row["data"] for row in self._rows[index]]
+
+        return self._rows[index]["data"]
+
+    def __iter__(self):
+        return (row["data"] for row in self._rows)
+
 @dataclass
 class ExecuteSqlQueryResult(MaxResult):
     """
@@ -60,12 +241,30 @@ class ExecuteSqlQueryResult(MaxResult):
     ----------
     df : DataFrame | None
         The result of the SQL query as a pandas DataFrame.
+    spilled : SpilledResult | None
+        The result written to disk, when the query was run with `spill_path`. `df` and `data` are None then.
     data : deprecated
         Deprecated field. Use df instead for DataFrame results.
     """
     df: DataFrame | None = None
+    spilled: SpilledResult | None = None
     data = None     # deprecated -- use df instead
     
+@dataclass
+class ProfileTableResult(MaxResult):
+    """
+    Result object for `Data.profile_table`.
+
+    Attributes
+    ----------
+    df : DataFrame | None
+        One row per column with rows, nulls, null_fraction, distinct, min, max and top_values.
+    sql : List[str]
+        The profiling queries that were run.
+    """
+    df: DataFrame | None = None
+    sql: List[str] = field(default_factory=list)
+
 class DomainObjectResult(MaxResult):
     """
     Result object for domain object retrieval operations.
@@ -134,6 +333,98 @@ class RunSqlAiResult(MaxResult):
     timing_info: Dict[str, any] | None = None
     prior_runs: List[RunSqlAiResult] = field(default_factory=list)
 
+@dataclass
+class DatasetChangeResult(MaxResult):
+    """
+    Outcome of a single change sent by `Data.apply_dataset`.
+
+    Attributes
+    ----------
+    target : str | None
+        What changed: a dataset setting such as 'name', 'date_range' or 'source', or 'dimension' / 'metric'.
+    action : str | None
+        'update', 'create' or 'delete'.
+    object_id : str | None
+        The dimension or metric id for dimension and metric changes.
+    """
+    target: str | None = None
+    action: str | None = None
+    object_id: str | None = None
+
+@dataclass
+class BulkMutationResult(MaxResult):
+    """
+    Result object for bulk dimension and metric mutations such as `Data.create_dimensions`.
+
+    Attributes
+    ----------
+    changes : List[DatasetChangeResult]
+        One entry per requested item, in input order.
+    """
+    changes: List[DatasetChangeResult] = field(default_factory=list)
+
+@dataclass
+class KShotImportResult(MaxResult):
+    """
+    Result object for `Data.import_dataset_kshots` and `Data.import_database_kshots`.
+
+    Attributes
+    ----------
+    changes : List[DatasetChangeResult]
+        One entry per mutation: target 'kshot' for creates, or the updated field ('question', 'sql', ...)
+        for updates, with the k-shot id as object_id.
+    unchanged : int
+        The number of imported k-shots that already matched and were skipped.
+    """
+    changes: List[DatasetChangeResult] = field(default_factory=list)
+    unchanged: int = 0
+
+@dataclass
+class CatalogCrawlResult(MaxResult):
+    """
+    Result object for `Data.crawl_catalog`.
+
+    Attributes
+    ----------
+    path : str | None
+        The SQLite snapshot that was written.
+    databases : int
+        The number of databases listed.
+    tables : int
+        The number of tables listed.
+    datasets : int
+        The number of datasets listed.
+    datasets_fetched : int
+        The number of datasets whose details were fetched in this crawl.
+    datasets_changed : int
+        The number of fetched datasets whose details differed from the snapshot.
+    removed : int
+        The number of databases and datasets removed because they are no longer listed.
+    errors : List[str]
+        Databases or datasets that could not be read. Their earlier snapshot entries are kept.
+    """
+    path: str | None = None
+    databases: int = 0
+    tables: int = 0
+    datasets: int = 0
+    datasets_fetched: int = 0
+    datasets_changed: int = 0
+    removed: int = 0
+    errors: List[str] = field(default_factory=list)
+
+@dataclass
+class ApplyDatasetResult(MaxResult):
+    """
+    Result object for `Data.apply_dataset`.
+
+    Attributes
+    ----------
+    changes : List[DatasetChangeResult]
+        One entry per change in the computed diff, in the order they were applied. Empty when the dataset
+        already matched.
+    """
+    changes: List[DatasetChangeResult] = field(default_factory=list)
+
 
 class Data:
     """
@@ -146,7 +437,13 @@ class Data:
         self.copilot_id = self._config.copilot_id
         self.copilot_skill_id = self._config.copilot_skill_id
 
-    def execute_sql_query(self, database_id: UUID, sql_query: str, row_limit: Optional[int] = None, copilot_id: Optional[UUID] = None, copilot_skill_id: Optional[UUID] = None) -> ExecuteSqlQueryResult:
+        # run_max_sql_gen(use_cache=True): (dataset id, copilot id, pre-query hash) -> (sql, row limit), in LRU order,
+        # and per dataset the stamp the entries were generated under.
+        self._sql_gen_cache: OrderedDict[tuple, tuple] = OrderedDict()
+        self._sql_gen_datasets: Dict[str, Dict[str, Any]] = {}
+        self._sql_gen_lock = threading.Lock()
+
+    def execute_sql_query(self, database_id: UUID, sql_query: str, row_limit: Optional[int] = None, copilot_id: Optional[UUID] = None, copilot_skill_id: Optional[UUID] = None, compact: bool = False, spill_path=None) -> ExecuteSqlQueryResult:
         """
         Execute a SQL query against the provided database and return a dataframe.
 
@@ -162,6 +459,12 @@ class Data:
             The UUID of the copilot. Defaults to the configured copilot_id.
         copilot_skill_id : UUID, optional
             The UUID of the copilot skill. Defaults to the configured copilot_skill_id.
+        compact : bool, optional
+            Whether to shrink the result DataFrame; see `create_df_from_data`. Defaults to False.
+        spill_path : str | os.PathLike, optional
+            A local directory to write the result to instead of building a DataFrame. The result is
+            returned as `spilled`, a `SpilledResult` whose columns are memory-mapped, for results too large to
+            hold in memory as a DataFrame. Defaults to None.
 
         Returns
         -------
@@ -214,8 +517,20 @@ class Data:
             if execute_sql_query_response.success:
                 data = execute_sql_query_response.data
 
-                result.df = create_df_from_data(data)
-                result.data = data
+                if spill_path is not None:
+                    columns = [column["name"] for column in data["columns"]]
+                    # taken out of the response so the rows are freed once written
+                    rows = _ResultRows(data.pop("rows", None) or [])
+                    del data
+
+                    # as in create_df_from_data, a single row of nulls is an empty result
+                    if len(rows) == 1 and pd.isna(pd.Series(rows[0], dtype=object)).all():
+                        rows = _ResultRows([])
+
+                    result.spilled = SpilledResult.write(columns, rows, spill_path)
+                else:
+                    result.df = create_df_from_data(data, compact)
+                    result.data = data
 
             return result
         except Exception as e:
@@ -225,6 +540,99 @@ class Data:
 
             return result
 
+    def profile_table(self, database_id: UUID, table_name: str, columns: Optional[List[str]] = None, top_k: int = PROFILE_TOP_K, dbms: Optional[str] = None, copilot_id: Optional[UUID] = None) -> ProfileTableResult:
+        """
+        Profile a table's columns with aggregate queries run in the database.
+
+        One aggregate query computes the row count and each column's non-null count, distinct count and min/max
+        in a single scan; if the database rejects min/max for a column's type (e.g. boolean or json on Postgres),
+        it is run again with min/max compared as strings. A second query returns each column's most frequent
+        values; it groups the table once per column, so it scans the table once per column. Only the aggregates
+        are downloaded, whatever the size of the table. Distinct counts are approximate on databases that have
+        an approximate count.
+
+        Parameters
+        ----------
+        database_id : UUID
+            The UUID of the database.
+        table_name : str
+            The table to profile, as it would be written in a query.
+        columns : List[str], optional
+            The columns to profile. Defaults to every column, read with a query that returns no rows.
+        top_k : int, optional
+            The number of most frequent values returned per column; 0 skips the query, and its scan per column.
+            Defaults to PROFILE_TOP_K.
+        dbms : str, optional
+            The database's dbms, which picks the SQL dialect. Defaults to the dbms of `get_database`.
+        copilot_id : UUID, optional
+            The UUID of the copilot. Defaults to the configured copilot_id.
+
+        Returns
+        -------
+        ProfileTableResult
+            The profile DataFrame and the queries that produced it.
+
+        Examples
+        --------
+        >>> max.data.profile_table(database_id, "sales.orders").df
+           column     rows  nulls  null_fraction  distinct  min  max                      top_values
+        0  region  1000000      0            0.0         4  ...  ...  [('west', 400000), ...]
+        """
+        result = ProfileTableResult()
+
+        def run(sql: str) -> Optional[DataFrame]:
+            result.sql.append(sql)
+            executed = self.execute_sql_query(database_id, sql, copilot_id=copilot_id)
+
+            if not executed.success:
+                result.error = executed.error
+                result.code = executed.code
+                return None
+
+            return executed.df
+
+        try:
+            if columns is None:
+                empty = run(f"select * from {table_name} where 1 = 0")
+
+                if empty is None:
+                    return result
+
+                columns = list(empty.columns)
+
+            if dbms is None:
+                database = self.get_database(database_id)
+                dbms = database.dbms if database else None
+
+            dialect = profile_dialect(dbms)
+            stats = run(profile_stats_sql(table_name, columns, dialect))
+
+            if stats is None:
+                stats = run(profile_stats_sql(table_name, columns, dialect, min_max_as_string=True))
+
+                if stats is None:
+                    return result
+
+                result.error = None
+                result.code = None
+
+            top_values = None
+
+            if top_k > 0 and columns:
+                top_values = run(profile_top_values_sql(table_name, columns, top_k, dialect))
+
+                if top_values is None:
+                    return result
+
+            result.df = build_profile(columns, stats, top_values)
+            result.success = True
+        except Exception as e:
+            result.success = False
+            result.code = RESULT_EXCEPTION_CODE
+            result.error = str(e)
+
+        return result
+
     def get_database(self, database_id: UUID) -> Optional[Database]:
         """
         Retrieve a database by its ID.
@@ -305,6 +713,42 @@ class Data:
         except Exception as e:
             return PagedDatabases()
 
+    def iter_databases(self, search_input: Optional[DatabaseSearchInput]=None, page_size: int = DEFAULT_PAGE_SIZE, prefetch_pages: int = DEFAULT_PREFETCH_PAGES) -> Iterator[Database]:
+        """
+        Iterate over all databases matching the search criteria, walking every page.
+
+        The next pages are fetched in the background while the current one is consumed; when the total row
+        count is known, up to `prefetch_pages` pages are fetched in parallel.
+
+        Parameters
+        ----------
+        search_input : DatabaseSearchInput, optional
+            An object specifying the search criteria.
+            If None, no filters are applied
+        page_size : int, optional
+            The number of rows requested per page. Defaults to DEFAULT_PAGE_SIZE.
+        prefetch_pages : int, optional
+            The maximum number of pages fetched ahead of the consumer. Defaults to DEFAULT_PREFETCH_PAGES.
+
+        Returns
+        -------
+        Iterator[Database]
+            The databases, in page order.
+
+        Raises
+        ------
+        Exception
+            If a page cannot be fetched. Unlike `get_databases`, errors are not turned into an empty page,
+            which would silently end the iteration early.
+        """
+        if not search_input:
+            search_input = DatabaseSearchInput(
+                name_contains=None,
+            )
+
+        return self._iter_rows(Operations.query.get_databases, 'get_databases',
+                               {'searchInput': search_input.__to_json_value__()}, page_size, prefetch_pages)
+
     def get_database_tables(self, database_id: UUID, search_input: Optional[DatabaseTableSearchInput]=None, paging: Optional[PagingInput]=None) -> PagedDatabaseTables:
         """
         Retrieve database tables based on optional search and paging criteria.
@@ -354,6 +798,36 @@ class Data:
 
         return result.get_database_tables
 
+    def iter_database_tables(self, database_id: UUID, search_input: Optional[DatabaseTableSearchInput]=None, page_size: int = DEFAULT_PAGE_SIZE, prefetch_pages: int = DEFAULT_PREFETCH_PAGES) -> Iterator[DatabaseTable]:
+        """
+        Iterate over all database tables matching the search criteria, walking every page.
+
+        The next pages are fetched in the background while the current one is consumed; when the total row
+        count is known, up to `prefetch_pages` pages are fetched in parallel.
+
+        Parameters
+        ----------
+        database_id : UUID
+            The database_id that contains the tables
+        search_input : DatabaseTableSearchInput, optional
+            An object specifying the search criteria.
+            If None, no filters are applied
+        page_size : int, optional
+            The number of rows requested per page. Defaults to DEFAULT_PAGE_SIZE.
+        prefetch_pages : int, optional
+            The maximum number of pages fetched ahead of the consumer. Defaults to DEFAULT_PREFETCH_PAGES.
+
+        Returns
+        -------
+        Iterator[DatabaseTable]
+            The database tables, in page order.
+        """
+        return iter_paged_rows(
+            lambda page_num, size: self.get_database_tables(database_id, search_input, PagingInput(page_num=page_num, page_size=size)),
+            page_size,
+            prefetch_pages,
+        )
+
     def get_database_kshots(self, database_id: UUID, search_input: Optional[DatabaseKShotSearchInput]=None, paging: Optional[PagingInput]=None) -> PagedDatabaseKShots:
         """
         Retrieve database k-shots based on optional search and paging criteria.
@@ -404,6 +878,168 @@ class Data:
 
         return result.get_database_kshots
 
+    def iter_database_kshots(self, database_id: UUID, search_input: Optional[DatabaseKShotSearchInput]=None, page_size: int = DEFAULT_PAGE_SIZE, prefetch_pages: int = DEFAULT_PREFETCH_PAGES) -> Iterator[DatabaseKShot]:
+        """
+        Iterate over all database k-shots matching the search criteria, walking every page.
+
+        The next pages are fetched in the background while the current one is consumed; when the total row
+        count is known, up to `prefetch_pages` pages are fetched in parallel.
+
+        Parameters
+        ----------
+        database_id : UUID
+            The database_id that contains the k-shots
+        search_input : DatabaseKShotSearchInput, optional
+            An object specifying the search criteria.
+            If None, no filters are applied
+        page_size : int, optional
+            The number of rows requested per page. Defaults to DEFAULT_PAGE_SIZE.
+        prefetch_pages : int, optional
+            The maximum number of pages fetched ahead of the consumer. Defaults to DEFAULT_PREFETCH_PAGES.
+
+        Returns
+        -------
+        Iterator[DatabaseKShot]
+            The database k-shots, in page order.
+        """
+        return iter_paged_rows(
+            lambda page_num, size: self.get_database_kshots(database_id, search_input, PagingInput(page_num=page_num, page_size=size)),
+            page_size,
+            prefetch_pages,
+        )
+
+    def crawl_catalog(self, path, max_workers: int = CRAWL_MAX_WORKERS, include_domain_objects: bool = True, max_age: Optional[float] = None, full: bool = False, page_size: int = DEFAULT_PAGE_SIZE) -> CatalogCrawlResult:
+        """
+        Walk databases, their tables and datasets, and each dataset's domain objects into a local SQLite snapshot.
+
+        Each database's tables and datasets are listed concurrently, then dataset details are fetched
+        concurrently with `get_dataset`, with at most `max_workers` requests in flight. Re-crawling into an
+        existing snapshot is incremental: listings are always refreshed, but a dataset's details are only
+        fetched again when it is new, its listing changed, its last fetch failed, or it is older than
+        `max_age`. Databases and datasets no longer listed are removed. The snapshot is read with
+        `CatalogSnapshot`.
+
+        Parameters
+        ----------
+        path : str | os.PathLike
+            The SQLite file to create or update.
+        max_workers : int, optional
+            The number of requests in flight at once. Defaults to CRAWL_MAX_WORKERS.
+        include_domain_objects : bool, optional
+            Whether dataset details and domain objects are fetched. Defaults to True.
+        max_age : float, optional
+            Seconds after which a dataset's details are fetched again even if its listing is unchanged.
+            Defaults to None (never).
+        full : bool, optional
+            If True, fetch every dataset's details regardless of the snapshot. Defaults to False.
+        page_size : int, optional
+            The page size used for listings. Defaults to DEFAULT_PAGE_SIZE.
+
+        Returns
+        -------
+        CatalogCrawlResult
+            Counts of what was crawled and any errors. `success` is True when nothing failed.
+
+        Examples
+        --------
+        >>> result = max.data.crawl_catalog("catalog.db")
+        >>> CatalogSnapshot("catalog.db").find_domain_objects("revenue")
+        """
+        result = CatalogCrawlResult(path=str(path))
+
+        try:
+            with CatalogSnapshot(path) as catalog, ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+                databases = [database.__to_json_value__() for database in self._iter_rows(
+                    Operations.query.get_databases, 'get_databases', {'searchInput': {'nameContains': None}}, page_size,
+                    prefetch_pages=max(1, max_workers))]
+
+                # one page in flight per task, so the pool bounds the number of requests
+                def list_database(database_id):
+                    tables = self._iter_rows(
+                        Operations.query.get_database_tables, 'get_database_tables',
+                        {'databaseId': database_id, 'searchInput': {'nameContains': None}}, page_size, prefetch_pages=1)
+                    datasets = self._iter_rows(
+                        Operations.query.get_datasets, 'get_datasets',
+                        {'searchInput': {'databaseId': database_id, 'nameContains': None}}, page_size, prefetch_pages=1)
+
+                    return [table.table_name for table in tables], [dataset.__to_json_value__() for dataset in datasets]
+
+                listings = [(database, executor.submit(list_database, database['databaseId'])) for database in databases]
+                listed_database_ids = []
+                datasets = []
+
+                for database, listing in listings:
+                    try:
+                        table_names, database_datasets = listing.result()
+                    except Exception as e:
+                        result.errors.append(f"database {database['databaseId']}: {e}")
+                        continue
+
+                    catalog.write_database(database, table_names)
+                    listed_database_ids.append(database['databaseId'])
+                    datasets.extend(database_datasets)
+                    result.tables += len(table_names)
+
+                states = catalog.dataset_states()
+                stale_before = time.time() - max_age if max_age is not None else None
+                to_fetch = []
+
+                for dataset in datasets:
+                    state = states.get(dataset['datasetId'])
+
+                    if include_domain_objects and (
+                            full or state is None or state['detail_hash'] is None
+                            or state['listing_hash'] != fingerprint(dataset)
+                            or (stale_before is not None and (state['crawled_at'] or 0) < stale_before)):
+                        to_fetch.append(dataset['datasetId'])
+
+                    catalog.write_dataset_listing(dataset)
+
+                details = [(dataset_id, executor.submit(self.get_dataset, dataset_id)) for dataset_id in to_fetch]
+
+                for dataset_id, detail in details:
+                    dataset = detail.result()
+
+                    if dataset is None:
+                        catalog.invalidate_dataset(dataset_id)
+                        result.errors.append(f"dataset {dataset_id}: could not be retrieved")
+                        continue
+
+                    detail_hash = fingerprint(dataset.__to_json_value__())
+                    result.datasets_fetched += 1
+
+                    if states.get(dataset_id, {}).get('detail_hash') != detail_hash:
+                        result.datasets_changed += 1
+
+                    catalog.write_dataset_details(dataset_id, _catalog_domain_objects(dataset), detail_hash)
+
+                result.removed = catalog.remove_missing(
+                    [database['databaseId'] for database in databases],
+                    [dataset['datasetId'] for dataset in datasets],
+                    listed_database_ids,
+                )
+                result.databases = len(databases)
+                result.datasets = len(datasets)
+
+            result.success = not result.errors
+        except Exception as e:
+            result.success = False
+            result.error = str(e)
+            result.code = RESULT_EXCEPTION_CODE
+
+        return result
+
+    def _iter_rows(self, op, field_name: str, query_args: Dict[str, Any], page_size: int = DEFAULT_PAGE_SIZE, prefetch_pages: int = DEFAULT_PREFETCH_PAGES) -> Iterator[Any]:
+        """
+        Iterate over every row of a paged query, letting errors propagate instead of returning an empty page.
+        """
+        def fetch_page(page_num, size):
+            result = self._gql_client.submit(op, {**query_args, 'paging': {'pageNum': page_num, 'pageSize': size}})
+
+            return getattr(result, field_name)
+
+        return iter_paged_rows(fetch_page, page_size, prefetch_pages)
+
     def get_database_kshot_by_id(self, database_kshot_id: UUID) -> Optional[DatabaseKShot]:
         """
         Retrieve a database k-shot by its ID.
@@ -484,6 +1120,45 @@ class Data:
         except Exception as e:
             return PagedDatasets(0, [])
 
+    def iter_datasets(self, search_input: Optional[DatasetSearchInput]=None, page_size: int = DEFAULT_PAGE_SIZE, prefetch_pages: int = DEFAULT_PREFETCH_PAGES) -> Iterator[Dataset]:
+        """
+        Iterate over all datasets matching the search criteria, walking every page.
+
+        The next pages are fetched in the background while the current one is consumed; when the total row
+        count is known, up to `prefetch_pages` pages are fetched in parallel.
+
+        Parameters
+        ----------
+        search_input : DatasetSearchInput, optional
+            An object specifying the search criteria.
+            If None, no filters are applied
+        page_size : int, optional
+            The number of rows requested per page. Defaults to DEFAULT_PAGE_SIZE.
+        prefetch_pages : int, optional
+            The maximum number of pages fetched ahead of the consumer. Defaults to DEFAULT_PREFETCH_PAGES.
+
+        Returns
+        -------
+        Iterator[Dataset]
+            The datasets, in page order.
+
+        Raises
+        ------
+        Exception
+            If a page cannot be fetched. Unlike `get_datasets`, errors are not turned into an empty page,
+            which would silently end the iteration early.
+        """
+        if not search_input:
+            search_input = DatasetSearchInput(
+                name_contains=None,
+            )
+
+        if hasattr(search_input, "database_id") and search_input.database_id:
+            search_input.database_id = str(search_input.database_id)
+
+        return self._iter_rows(Operations.query.get_datasets, 'get_datasets',
+                               {'searchInput': search_input.__to_json_value__()}, page_size, prefetch_pages)
+
     def get_dataset_id(self, dataset_name: str) -> Optional[UUID]:
         """
         Retrieve the UUID of a dataset by its name.
@@ -551,53 +1226,7 @@ class Data:
                 'copilotId': str(copilot_id) if copilot_id else str(self.copilot_id) if self.copilot_id else None
             }
 
-            query_vars = {
-                'dataset_id': Arg(non_null(GQL_UUID)),
-                'copilot_id': Arg(GQL_UUID),
-            }
-
-            operation = self._gql_client.query(variables=query_vars)
-
-            gql_query = operation.get_dataset(
-                dataset_id=Variable('dataset_id'),
-                copilot_id=Variable('copilot_id'),
-            )
-
-            gql_query.dataset_id()
-            gql_query.name()
-            gql_query.description()
-            gql_query.misc_info()
-            gql_query.dimension_value_distribution_map()
-            gql_query.date_range_boundary_attribute_id()
-            gql_query.dimension_hierarchies()
-            gql_query.metric_hierarchies()
-            gql_query.domain_attribute_statistics()
-            gql_query.default_performance_metric_id()
-            gql_query.dataset_min_date()
-            gql_query.dataset_max_date()
-            gql_query.query_row_limit()
-            gql_query.use_database_casing()
-
-            gql_query.dimensions()
-            gql_query.metrics()
-
-            database = gql_query.database()
-            database.database_id()
-            database.name()
-            database.dbms()
-            database.schema()
-
-            tables = gql_query.tables()
-            tables.name()
-            columns = tables.columns()
-
-            columns.name()
-            columns.jdbc_type()
-            columns.length()
-            columns.precision()
-            columns.scale()
-
-            self._create_domain_object_query(gql_query.domain_objects(), include_dim_values)
+            operation = self._domain_object_operation('get_dataset', include_dim_values)
 
             result = self._gql_client.submit(operation, query_args)
 
@@ -625,18 +1254,184 @@ class Data:
         Dataset or None
             The dataset object if found, or `None` if not found or if an error occurs.
         """
-        try:
-            query_args = {
-                'datasetId': str(dataset_id),
-            }
+        try:
+            query_args = {
+                'datasetId': str(dataset_id),
+            }
+
+            op = Operations.query.get_dataset2
+
+            result = self._gql_client.submit(op, query_args)
+
+            return result.get_dataset2
+        except Exception as e:
+            return None
+
+    def get_dataset_index(self, dataset_id: UUID, copilot_id: Optional[UUID] = None, include_dim_values: bool = False) -> Optional[DatasetIndex]:
+        """
+        Fetch a dataset and build a local index over its domain objects.
+
+        The index resolves metrics, dimensions and entities by id, rql name, name, output label or synonym
+        without further round trips, so skills can resolve many references per question from one fetch.
+
+        Parameters
+        ----------
+        dataset_id : UUID
+            The UUID of the dataset to index.
+        copilot_id : Optional[UUID], optional
+            The UUID of the copilot. Defaults to the configured copilot_id.
+        include_dim_values : bool, optional
+            Whether to include dimension values in the fetched dataset. Defaults to False.
+
+        Returns
+        -------
+        Optional[DatasetIndex]
+            The index over the dataset, or None if the dataset could not be retrieved.
+        """
+        dataset = self.get_dataset(dataset_id, copilot_id=copilot_id, include_dim_values=include_dim_values)
+
+        if dataset is None:
+            return None
+
+        return DatasetIndex(dataset)
+
+    def get_grounding_index(self, dataset_id: UUID, copilot_id: Optional[UUID] = None) -> Optional[GroundingIndex]:
+        """
+        Fetch a dataset with its dimension values and build an offline grounding index over them.
+
+        The index answers `GroundingIndex.ground` lookups locally, returning `GroundedValueResponse` objects like
+        `get_grounded_value` does, and can be saved to disk with `GroundingIndex.save` and reloaded later.
+
+        Parameters
+        ----------
+        dataset_id : UUID
+            The UUID of the dataset to index.
+        copilot_id : Optional[UUID], optional
+            The UUID of the copilot. Defaults to the configured copilot_id.
+
+        Returns
+        -------
+        Optional[GroundingIndex]
+            The grounding index, or None if the dataset could not be retrieved.
+        """
+        dataset = self.get_dataset(dataset_id, copilot_id=copilot_id, include_dim_values=True)
+
+        if dataset is None:
+            return None
+
+        return GroundingIndex.from_dataset(dataset)
+
+    def get_dataset_stamp(self, dataset_id: UUID) -> Optional[str]:
+        """
+        Return a revision stamp for a dataset's definition, used to revalidate dataset snapshots.
+
+        The stamp is a hash of the lightweight `get_dataset2` definition (settings, dimensions and metrics), so
+        it changes whenever the dataset is edited. Statistics refreshed by `reload_dataset` do not change it.
+
+        Parameters
+        ----------
+        dataset_id : UUID
+            The UUID of the dataset.
+
+        Returns
+        -------
+        Optional[str]
+            The stamp, or None if the dataset could not be retrieved.
+        """
+        dataset = self.get_dataset2(dataset_id)
+
+        if dataset is None:
+            return None
+
+        return fingerprint(dataset.__to_json_value__())
+
+    def export_dataset_snapshot(self, dataset_id: UUID, path, copilot_id: Optional[UUID] = None, include_dim_values: bool = False) -> Optional[DatasetSnapshot]:
+        """
+        Fetch a dataset and save it, with its revision stamp, to a compressed snapshot file.
+
+        Processes that share the file can start from `load_dataset_snapshot` instead of fetching the dataset
+        themselves.
+
+        Parameters
+        ----------
+        dataset_id : UUID
+            The UUID of the dataset to export.
+        path : str | os.PathLike
+            The file to write. It is replaced atomically.
+        copilot_id : Optional[UUID], optional
+            The UUID of the copilot. Defaults to the configured copilot_id.
+        include_dim_values : bool, optional
+            Whether to include dimension values in the snapshot. Defaults to False.
+
+        Returns
+        -------
+        Optional[DatasetSnapshot]
+            The snapshot that was written, or None if the dataset could not be retrieved.
+        """
+        stamp = self.get_dataset_stamp(dataset_id)
+        dataset = self.get_dataset(dataset_id, copilot_id=copilot_id, include_dim_values=include_dim_values)
+
+        if dataset is None:
+            return None
+
+        snapshot = DatasetSnapshot(dataset, stamp=stamp, include_dim_values=include_dim_values)
+        snapshot.save(path)
+
+        return snapshot
+
+    def load_dataset_snapshot(self, path, dataset_id: Optional[UUID] = None, revalidate: bool = False, copilot_id: Optional[UUID] = None) -> Optional[MaxDataset]:
+        """
+        Load a dataset from a snapshot written by `export_dataset_snapshot`.
+
+        With `revalidate`, only the dataset's stamp is fetched; the full dataset is fetched and the snapshot
+        rewritten only when the stamp changed. If the stamp cannot be fetched, the snapshot is used as is.
+
+        Parameters
+        ----------
+        path : str | os.PathLike
+            The snapshot file.
+        dataset_id : Optional[UUID], optional
+            The dataset to export if the snapshot is missing or unreadable. Defaults to None, in which case a
+            missing snapshot returns None.
+        revalidate : bool, optional
+            Whether to check the snapshot's stamp against the server. Defaults to False.
+        copilot_id : Optional[UUID], optional
+            The UUID of the copilot used when the dataset is fetched again. Defaults to the configured copilot_id.
+
+        Returns
+        -------
+        Optional[MaxDataset]
+            The dataset, or None if there is no usable snapshot and it could not be fetched.
+
+        Examples
+        --------
+        >>> dataset = max.data.load_dataset_snapshot("/shared/sales.snapshot", dataset_id, revalidate=True)
+        >>> index = DatasetIndex(dataset)
+        """
+        snapshot = DatasetSnapshot.load(path)
 
-            op = Operations.query.get_dataset2
+        if snapshot is not None and dataset_id is not None and str(snapshot.dataset_id) != str(dataset_id):
+            snapshot = None
 
-            result = self._gql_client.submit(op, query_args)
+        if snapshot is None:
+            if dataset_id is None:
+                return None
 
-            return result.get_dataset2
-        except Exception as e:
-            return None
+            snapshot = self.export_dataset_snapshot(dataset_id, path, copilot_id=copilot_id)
+
+            return snapshot.dataset if snapshot else None
+
+        if revalidate:
+            stamp = self.get_dataset_stamp(snapshot.dataset_id)
+
+            if stamp is not None and stamp != snapshot.stamp:
+                refreshed = self.export_dataset_snapshot(
+                    snapshot.dataset_id, path, copilot_id=copilot_id, include_dim_values=snapshot.include_dim_values)
+
+                if refreshed is not None:
+                    return refreshed.dataset
+
+        return snapshot.dataset
 
     def get_domain_object_by_name(self, dataset_id: UUID, rql_name: str) -> DomainObjectResult:
         """
@@ -661,23 +1456,7 @@ class Data:
                 'rqlName': rql_name
             }
 
-            query_vars = {
-                'dataset_id': Arg(non_null(GQL_UUID)),
-                'rql_name': Arg(non_null(String)),
-            }
-
-            operation = self._gql_client.query(variables=query_vars)
-
-            gql_query = operation.get_domain_object_by_name(
-                dataset_id=Variable('dataset_id'),
-                rql_name=Variable('rql_name'),
-            )
-
-            gql_query.success()
-            gql_query.code()
-            gql_query.error()
-
-            self._create_domain_object_query(gql_query.domain_object())
+            operation = self._domain_object_operation('get_domain_object_by_name')
 
             result = self._gql_client.submit(operation, query_args)
 
@@ -722,23 +1501,7 @@ class Data:
                 'domainObjectId': domain_object_id
             }
 
-            query_vars = {
-                'dataset_id': Arg(non_null(GQL_UUID)),
-                'domain_object_id': Arg(non_null(String)),
-            }
-
-            operation = self._gql_client.query(variables=query_vars)
-
-            gql_query = operation.get_domain_object(
-                dataset_id=Variable('dataset_id'),
-                domain_object_id=Variable('domain_object_id'),
-            )
-
-            gql_query.success()
-            gql_query.code()
-            gql_query.error()
-
-            self._create_domain_object_query(gql_query.domain_object())
+            operation = self._domain_object_operation('get_domain_object')
 
             result = self._gql_client.submit(operation, query_args)
 
@@ -798,7 +1561,119 @@ class Data:
         except Exception as e:
             return None
 
-    def run_max_sql_gen(self, dataset_id: UUID, pre_query_object: Dict[str, any], copilot_id: UUID | None = None, execute_sql: bool | None = True) -> RunMaxSqlGenResult:
+    def get_grounded_values(self, dataset_id: UUID, values: List[str], dimension_name: Optional[str] = None, copilot_id: Optional[UUID] = None, batch_size: int = GROUNDING_BATCH_SIZE, max_workers: int = GROUNDING_MAX_WORKERS) -> List[Optional[GroundedValueResponse]]:
+        """
+        Ground many values against domain values in as few round trips as possible.
+
+        Duplicate values are grounded once. The distinct values are split into batches of `batch_size`, each
+        batch is sent as a single request with one aliased getGroundedValue field per value, and up to
+        `max_workers` batches run concurrently. If a batch request fails, its values are retried one at a
+        time so a single bad value does not lose the rest of the batch.
+
+        Parameters
+        ----------
+        dataset_id : UUID
+            The UUID of the dataset.
+        values : List[str]
+            The values to ground.
+        dimension_name : str, optional
+            The dimension name to search within. Can be
+            a specific dimension attribute name, or None to search all. Defaults to None.
+        copilot_id : UUID, optional
+            The UUID of the copilot. Defaults to the configured copilot_id.
+        batch_size : int, optional
+            The number of values grounded per request. Defaults to GROUNDING_BATCH_SIZE.
+        max_workers : int, optional
+            The number of batch requests in flight at once. Defaults to GROUNDING_MAX_WORKERS.
+
+        Returns
+        -------
+        List[GroundedValueResponse | None]
+            One response per input value, in input order. An entry is None when that value could not be
+            grounded.
+        """
+        unique_values = list(dict.fromkeys(values))
+
+        if not unique_values:
+            return []
+
+        batch_size = max(1, batch_size)
+        batches = [unique_values[i:i + batch_size] for i in range(0, len(unique_values), batch_size)]
+
+        def ground_batch(batch: List[str]) -> List[Optional[GroundedValueResponse]]:
+            return self._get_grounded_value_batch(dataset_id, batch, dimension_name, copilot_id)
+
+        if len(batches) == 1 or max_workers <= 1:
+            batch_results = [ground_batch(batch) for batch in batches]
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
+                batch_results = list(executor.map(ground_batch, batches))
+
+        grounded = {}
+
+        for batch, responses in zip(batches, batch_results):
+            grounded.update(zip(batch, responses))
+
+        return [grounded[value] for value in values]
+
+    def _get_grounded_value_batch(self, dataset_id: UUID, values: List[str], dimension_name: Optional[str], copilot_id: Optional[UUID]) -> List[Optional[GroundedValueResponse]]:
+        try:
+            query_args = {
+                'datasetId': str(dataset_id),
+                'dimensionName': dimension_name,
+                'copilotId': copilot_id or self.copilot_id,
+            }
+
+            for i, value in enumerate(values):
+                query_args[f'value{i}'] = value
+
+            operation = prepared_operation(
+                ('get_grounded_values', len(values)),
+                lambda: self._build_get_grounded_values_operation(len(values)),
+            )
+            result = self._gql_client.submit(operation, query_args)
+
+            return [getattr(result, f'grounded_{i}') for i in range(len(values))]
+        except Exception as e:
+            if len(values) == 1:
+                return [None]
+
+            return [self.get_grounded_value(dataset_id, value, dimension_name, copilot_id) for value in values]
+
+    @staticmethod
+    def _build_get_grounded_values_operation(count: int) -> Operation:
+        query_vars = {
+            'dataset_id': Arg(non_null(GQL_UUID)),
+            'dimension_name': Arg(String),
+            'copilot_id': Arg(GQL_UUID),
+        }
+
+        for i in range(count):
+            query_vars[f'value{i}'] = Arg(non_null(String))
+
+        operation = Operation(Query, name='GetGroundedValues', variables=query_vars)
+
+        for i in range(count):
+            gql_query = operation.get_grounded_value(
+                __alias__=f'grounded_{i}',
+                dataset_id=Variable('dataset_id'),
+                value=Variable(f'value{i}'),
+                dimension_name=Variable('dimension_name'),
+                copilot_id=Variable('copilot_id'),
+            )
+
+            gql_query.matched_value()
+            gql_query.match_quality()
+            gql_query.match_type()
+            gql_query.mapped_indicator()
+            gql_query.mapped_value()
+            gql_query.preferred()
+            gql_query.dimension_name()
+            gql_query.other_matches()
+
+        return operation
+
+    def run_max_sql_gen(self, dataset_id: UUID, pre_query_object: Dict[str, any], copilot_id: UUID | None = None, execute_sql: bool | None = True, use_cache: bool = False) -> RunMaxSqlGenResult:
         """
         Run the SQL generation logic using the provided dataset and query object.
 
@@ -812,12 +1687,23 @@ class Data:
             The UUID of the copilot. Defaults to the configured copilot_id.
         execute_sql : bool, optional
             Whether the generated SQL should be executed. Defaults to True.
+        use_cache : bool, optional
+            Whether to reuse SQL generated earlier by this client for the same dataset, copilot and pre-query
+            object. On a hit, generation is skipped and the SQL is run with `execute_sql_query`. Cached SQL
+            is dropped when the dataset's stamp (see `get_dataset_stamp`) changes, which is checked at most
+            every SQL_GEN_CACHE_REVALIDATE_SECONDS. Defaults to False.
 
         Returns
         -------
         RunMaxSqlGenResult
             The result of the SQL generation process.
         """
+        if use_cache:
+            cache_key = (str(dataset_id), str(copilot_id or self.copilot_id), fingerprint(pre_query_object))
+            cached = self._run_cached_sql_gen(cache_key, copilot_id, execute_sql)
+
+            if cached is not None:
+                return cached
 
         result = RunMaxSqlGenResult()
 
@@ -866,6 +1752,9 @@ class Data:
                 result.row_limit = run_max_sql_gen_response.row_limit
                 result.data = run_max_sql_gen_response.data
 
+                if use_cache and result.sql:
+                    self._store_sql_gen(cache_key, result.sql, result.row_limit)
+
             return result
         except Exception as e:
             result.success = False
@@ -874,6 +1763,91 @@ class Data:
 
             return result
 
+    def clear_sql_gen_cache(self, dataset_id: Optional[UUID] = None):
+        """
+        Drop SQL cached by `run_max_sql_gen(use_cache=True)`.
+
+        Parameters
+        ----------
+        dataset_id : UUID, optional
+            The dataset whose SQL is dropped. Defaults to None, which clears the whole cache.
+        """
+        with self._sql_gen_lock:
+            if dataset_id is None:
+                self._sql_gen_cache.clear()
+                self._sql_gen_datasets.clear()
+                return
+
+            self._sql_gen_datasets.pop(str(dataset_id), None)
+
+            for key in [key for key in self._sql_gen_cache if key[0] == str(dataset_id)]:
+                del self._sql_gen_cache[key]
+
+    def _run_cached_sql_gen(self, cache_key: tuple, copilot_id: UUID | None, execute_sql: bool | None) -> Optional[RunMaxSqlGenResult]:
+        dataset = self._sql_gen_dataset(cache_key[0])
+
+        with self._sql_gen_lock:
+            entry = self._sql_gen_cache.get(cache_key)
+
+            if entry is None:
+                return None
+
+            self._sql_gen_cache.move_to_end(cache_key)
+
+        sql, row_limit = entry
+        result = RunMaxSqlGenResult(success=True, sql=sql, row_limit=row_limit)
+
+        if execute_sql:
+            executed = self.execute_sql_query(dataset['database_id'], sql, row_limit, copilot_id=copilot_id)
+
+            result.success = executed.success
+            result.error = executed.error
+            result.code = executed.code
+            result.df = executed.df
+            result.data = executed.data
+
+        return result
+
+    def _sql_gen_dataset(self, dataset_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the dataset's stamp and database id, rechecking the stamp when it is older than
+        SQL_GEN_CACHE_REVALIDATE_SECONDS and dropping the dataset's cached SQL if it changed.
+        """
+        with self._sql_gen_lock:
+            dataset = self._sql_gen_datasets.get(dataset_id)
+
+        if dataset is not None and time.monotonic() - dataset['checked_at'] < SQL_GEN_CACHE_REVALIDATE_SECONDS:
+            return dataset
+
+        current = self.get_dataset2(dataset_id)
+
+        if current is None:
+            self.clear_sql_gen_cache(dataset_id)
+            return None
+
+        stamp = fingerprint(current.__to_json_value__())
+
+        if dataset is not None and dataset['stamp'] != stamp:
+            self.clear_sql_gen_cache(dataset_id)
+
+        dataset = {'stamp': stamp, 'database_id': current.database_id, 'checked_at': time.monotonic()}
+
+        with self._sql_gen_lock:
+            self._sql_gen_datasets[dataset_id] = dataset
+
+        return dataset
+
+    def _store_sql_gen(self, cache_key: tuple, sql: str, row_limit: Optional[int]):
+        with self._sql_gen_lock:
+            if cache_key[0] not in self._sql_gen_datasets:
+                return
+
+            self._sql_gen_cache[cache_key] = (sql, row_limit)
+            self._sql_gen_cache.move_to_end(cache_key)
+
+            while len(self._sql_gen_cache) > SQL_GEN_CACHE_SIZE:
+                self._sql_gen_cache.popitem(last=False)
+
     def run_sql_ai(
             self,
             dataset_id: Optional[str | UUID] = None,
@@ -986,7 +1960,124 @@ class Data:
 
         return result
 
-    def generate_visualization(self, data: Dict, column_metadata_map: Dict) -> Optional[GenerateVisualizationResponse]:
+    def run_sql_ai_batch(
+            self,
+            questions: List[str],
+            model_overrides: Optional[List[Optional[str]]] = None,
+            dataset_id: Optional[str | UUID] = None,
+            copilot_id: Optional[UUID] = None,
+            dataset_ids: Optional[list[str | UUID]] = None,
+            database_id: Optional[str | UUID] = None,
+            max_workers: int = SQL_AI_MAX_WORKERS,
+            path=None,
+            include_data: bool = True,
+    ) -> DataFrame:
+        """
+        Run every question with every model override through `run_sql_ai` concurrently and collect the results.
+
+        With `path`, each run is appended to a JSON lines file as soon as it finishes. Calling again with the
+        same path skips the runs already recorded there as successful, so an interrupted sweep picks up where it
+        stopped and failed runs are retried.
+
+        Parameters
+        ----------
+        questions : List[str]
+            The natural language questions.
+        model_overrides : List[str | None], optional
+            The models to compare; None runs the configured default. Defaults to [None].
+        dataset_id, copilot_id, dataset_ids, database_id : optional
+            Passed to every `run_sql_ai` call.
+        max_workers : int, optional
+            The number of runs in flight at once. Defaults to SQL_AI_MAX_WORKERS.
+        path : str | os.PathLike, optional
+            A JSON lines file the runs are appended to. Defaults to None.
+        include_data : bool, optional
+            Whether each run's result data is kept in the `data` column. Defaults to True.
+
+        Returns
+        -------
+        DataFrame
+            One row per distinct question and model, in input order, with question, model_override, success, code, error,
+            sql, title, explanation, row_count, elapsed_seconds, timing_info, a `timing_<key>` column for each
+            numeric timing entry, and, with `include_data`, `data` and the result DataFrame in `df`.
+
+        Examples
+        --------
+        >>> results = max.data.run_sql_ai_batch(questions, ["gpt-4o", "gpt-4.1"], dataset_id, path="sweep.jsonl")
+        >>> results.groupby("model_override")[["success", "elapsed_seconds"]].mean()
+        """
+        questions = list(dict.fromkeys(questions))
+        model_overrides = list(dict.fromkeys(model_overrides)) if model_overrides else [None]
+        records: Dict[tuple, Dict] = {}
+
+        if path is not None and os.path.exists(path):
+            for record in read_records(path):
+                if record.get('success'):
+                    records[(record['question'], record['model_override'])] = record
+
+        def run(question: str, model_override: Optional[str]) -> Dict:
+            started = time.perf_counter()
+            result = self.run_sql_ai(dataset_id=dataset_id, question=question, model_override=model_override,
+                                     copilot_id=copilot_id, dataset_ids=dataset_ids, database_id=database_id)
+            record = {
+                'question': question,
+                'model_override': model_override,
+                'success': result.success,
+                'code': result.code,
+                'error': result.error,
+                'sql': result.sql,
+                'title': result.title,
+                'explanation': result.explanation,
+                'row_count': len(result.df) if result.df is not None else None,
+                'elapsed_seconds': time.perf_counter() - started,
+                'timing_info': result.timing_info,
+            }
+
+            if include_data:
+                record['data'] = result.data
+
+            return record
+
+        pending = [(question, model_override) for question in questions for model_override in model_overrides
+                   if (question, model_override) not in records]
+
+        executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+
+        try:
+            futures = [executor.submit(run, question, model_override) for question, model_override in pending]
+
+            with open(path, 'a', encoding='utf-8') if path is not None else contextlib.nullcontext() as f:
+                for future in as_completed(futures):
+                    record = future.result()
+                    records[(record['question'], record['model_override'])] = record
+
+                    if f is not None:
+                        f.write(json.dumps(record, default=str))
+                        f.write('\n')
+                        f.flush()
+        finally:
+            # on an error or KeyboardInterrupt, drop the queued runs instead of waiting for the whole sweep
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        rows = []
+
+        for question in questions:
+            for model_override in model_overrides:
+                record = dict(records[(question, model_override)])
+
+                for key, value in (record.get('timing_info') or {}).items():
+                    if isinstance(value, (int, float)) and not isinstance(value, bool):
+                        record[f'timing_{key}'] = value
+
+                if include_data:
+                    data = record.get('data')
+                    record['df'] = create_df_from_data(data) if record.get('success') and data else None
+
+                rows.append(record)
+
+        return pd.DataFrame(rows)
+
+    def generate_visualization(self, data: Dict, column_metadata_map: Dict, max_rows: Optional[int] = None, reduction: str = "auto") -> Optional[GenerateVisualizationResponse]:
         """
         Generate a HighchartsChart dynamic vis layout component based on provided data and metadata.
 
@@ -997,6 +2088,13 @@ class Data:
             The service expects a 'rows' key and a 'columns' key.
         column_metadata_map : Dict
             The column metadata map from the run_sql_ai response.
+        max_rows : int, optional
+            If given, data with more rows is reduced on the client before it is uploaded, with
+            `reduce_visualization_data`: time series are downsampled and categories beyond the top N are
+            bucketed into "Other". Defaults to None, which uploads the data as is.
+        reduction : str, optional
+            The reduction used when `max_rows` is given: "auto", "lttb", "minmax", "top_n" or "sample".
+            Defaults to "auto".
 
         Returns
         -------
@@ -1005,6 +2103,9 @@ class Data:
             Returns None if an error occurs.
         """
         try:
+            if max_rows is not None:
+                data = reduce_visualization_data(data, max_rows, reduction)
+
             query_args = {
                 'data': data,
                 'columnMetadataMap': column_metadata_map,
@@ -1034,6 +2135,126 @@ class Data:
         except Exception as e:
             return None
 
+    def _domain_object_operation(self, name: str, include_dim_values: bool = False) -> PreparedOperation:
+        """
+        Return the prepared operation for a domain-object query, building it on first use.
+
+        The domain-object selection expands to eight nested fragments, so the operations that carry it are
+        built and rendered once per `include_dim_values` variant and shared by every Data instance.
+
+        Parameters
+        ----------
+        name : str
+            The query field: 'get_dataset', 'get_domain_object' or 'get_domain_object_by_name'.
+        include_dim_values : bool, optional
+            Whether the selection includes dimension values. Defaults to False.
+
+        Returns
+        -------
+        PreparedOperation
+            The cached operation for the requested variant.
+        """
+        builders = {
+            'get_dataset': self._build_get_dataset_operation,
+            'get_domain_object': self._build_get_domain_object_operation,
+            'get_domain_object_by_name': self._build_get_domain_object_by_name_operation,
+        }
+
+        return prepared_operation((name, include_dim_values), lambda: builders[name](include_dim_values))
+
+    def _build_get_dataset_operation(self, include_dim_values: bool) -> Operation:
+        query_vars = {
+            'dataset_id': Arg(non_null(GQL_UUID)),
+            'copilot_id': Arg(GQL_UUID),
+        }
+
+        operation = Operation(Query, variables=query_vars)
+
+        gql_query = operation.get_dataset(
+            dataset_id=Variable('dataset_id'),
+            copilot_id=Variable('copilot_id'),
+        )
+
+        gql_query.dataset_id()
+        gql_query.name()
+        gql_query.description()
+        gql_query.misc_info()
+        gql_query.dimension_value_distribution_map()
+        gql_query.date_range_boundary_attribute_id()
+        gql_query.dimension_hierarchies()
+        gql_query.metric_hierarchies()
+        gql_query.domain_attribute_statistics()
+        gql_query.default_performance_metric_id()
+        gql_query.dataset_min_date()
+        gql_query.dataset_max_date()
+        gql_query.query_row_limit()
+        gql_query.use_database_casing()
+
+        gql_query.dimensions()
+        gql_query.metrics()
+
+        database = gql_query.database()
+        database.database_id()
+        database.name()
+        database.dbms()
+        database.schema()
+
+        tables = gql_query.tables()
+        tables.name()
+        columns = tables.columns()
+
+        columns.name()
+        columns.jdbc_type()
+        columns.length()
+        columns.precision()
+        columns.scale()
+
+        self._create_domain_object_query(gql_query.domain_objects(), include_dim_values)
+
+        return operation
+
+    def _build_get_domain_object_by_name_operation(self, include_dim_values: bool) -> Operation:
+        query_vars = {
+            'dataset_id': Arg(non_null(GQL_UUID)),
+            'rql_name': Arg(non_null(String)),
+        }
+
+        operation = Operation(Query, variables=query_vars)
+
+        gql_query = operation.get_domain_object_by_name(
+            dataset_id=Variable('dataset_id'),
+            rql_name=Variable('rql_name'),
+        )
+
+        gql_query.success()
+        gql_query.code()
+        gql_query.error()
+
+        self._create_domain_object_query(gql_query.domain_object(), include_dim_values)
+
+        return operation
+
+    def _build_get_domain_object_operation(self, include_dim_values: bool) -> Operation:
+        query_vars = {
+            'dataset_id': Arg(non_null(GQL_UUID)),
+            'domain_object_id': Arg(non_null(String)),
+        }
+
+        operation = Operation(Query, variables=query_vars)
+
+        gql_query = operation.get_domain_object(
+            dataset_id=Variable('dataset_id'),
+            domain_object_id=Variable('domain_object_id'),
+        )
+
+        gql_query.success()
+        gql_query.code()
+        gql_query.error()
+
+        self._create_domain_object_query(gql_query.domain_object(), include_dim_values)
+
+        return operation
+
     def _create_domain_object_query(self, domain_object, include_dim_values: bool = False):
         """
         Create a GraphQL query for domain objects with appropriate fragments.
@@ -1583,37 +2804,232 @@ class Data:
             'useDatabaseCasing': use_database_casing,
         }
 
-        op = Operations.mutation.update_dataset_use_database_casing
-        result = self._gql_client.submit(op, mutation_args)
+        op = Operations.mutation.update_dataset_use_database_casing
+        result = self._gql_client.submit(op, mutation_args)
+
+        return result.update_dataset_use_database_casing
+
+    def update_dataset_kshot_limit(self, dataset_id: UUID, kshot_limit: int) -> MaxMutationResponse:
+        """
+        Update the k-shot limit for the dataset, which controls the number of example rows used for processing or training.
+
+        Parameters
+        ----------
+        dataset_id : UUID
+            The unique identifier of the dataset to be updated.
+        kshot_limit : int
+            The maximum number of examples (k-shot limit) to use when sampling or displaying example data.
+            Must be a non-negative integer.
+
+        Returns
+        -------
+        MaxMutationResponse
+            The result of the GraphQL mutation containing the updated k-shot limit.
+        """
+        mutation_args = {
+            'datasetId': str(dataset_id),
+            'kShotLimit': kshot_limit,
+        }
+
+        op = Operations.mutation.update_dataset_kshot_limit
+        result = self._gql_client.submit(op, mutation_args)
+
+        return result.update_dataset_kshot_limit
+
+    def apply_dataset(self, desired: Dataset | Dict, delete_missing: bool = False, dry_run: bool = False) -> ApplyDatasetResult:
+        """
+        Bring a dataset in line with a desired definition using as few requests as possible.
+
+        The current dataset is fetched with `get_dataset2` and compared with `desired`. Only settings present
+        in `desired` are compared, and only those that differ are changed. The same goes for dimensions and
+        metrics, which are matched by id and compared on the keys `desired` gives. All changes are then sent
+        together as one request of aliased mutations instead of one round trip per `update_dataset_*`,
+        dimension or metric call.
+
+        Parameters
+        ----------
+        desired : Dataset | Dict
+            The desired dataset, as a `Dataset` or a dictionary shaped like the one passed to `create_dataset`.
+            It must include `datasetId`.
+        delete_missing : bool, optional
+            Whether dimensions and metrics that exist on the dataset but not in `desired` are deleted.
+            Only applies when `desired` lists dimensions or metrics. Defaults to False.
+        dry_run : bool, optional
+            If True, compute and return the changes without sending them. Defaults to False.
+
+        Returns
+        -------
+        ApplyDatasetResult
+            One `DatasetChangeResult` per change. `success` is True when every change succeeded.
+
+        Examples
+        --------
+        >>> result = max.data.apply_dataset({
+        ...     "datasetId": dataset_id,
+        ...     "description": "Distributor sales, net of returns",
+        ...     "queryRowLimit": 500,
+        ... })
+        >>> [(change.target, change.success) for change in result.changes]
+        [('description', True), ('query_row_limit', True)]
+        """
+        result = ApplyDatasetResult()
+
+        try:
+            desired_json = dict(desired.__to_json_value__() if hasattr(desired, '__to_json_value__') else desired)
+            dataset_id = desired_json['datasetId']
+            current = self.get_dataset2(dataset_id)
+
+            if current is None:
+                raise Exception(f"Dataset {dataset_id} could not be retrieved")
+
+            current_json = current.__to_json_value__()
+            planned = self._diff_dataset(dataset_id, current_json, desired_json, delete_missing)
+
+            result.changes = [change for change, _ in planned]
+
+            if not dry_run and planned:
+                self._submit_aliased_mutation_batches('ApplyDataset', planned, MUTATION_BATCH_SIZE, max_workers=1)
+
+            result.success = dry_run or all(change.success for change in result.changes)
+        except Exception as e:
+            result.success = False
+            result.error = str(e)
+            result.code = RESULT_EXCEPTION_CODE
+
+        return result
+
+    def _diff_dataset(self, dataset_id, current: Dict, desired: Dict, delete_missing: bool) -> List[tuple]:
+        planned = []
+
+        for target, mutation, keys in _DATASET_SETTING_MUTATIONS:
+            if not any(key in desired and not _same_dataset_value(key, current.get(key), desired[key]) for key in keys):
+                continue
+
+            args = {'dataset_id': str(dataset_id)}
+
+            for key, arg in keys.items():
+                args[arg] = _dataset_setting_arg(key, desired[key] if key in desired else current.get(key))
+
+            planned.append((DatasetChangeResult(target=target, action='update'), (mutation, args)))
+
+        for target, key, enum_keys in (('dimension', 'dimensions', ('dataType',)), ('metric', 'metrics', ('dataType', 'metricType', 'growthType'))):
+            if key not in desired:
+                continue
 
-        return result.update_dataset_use_database_casing
+            current_artifacts = {artifact['id']: artifact for artifact in current.get(key) or []}
+            desired_artifacts = [_artifact_json(artifact, enum_keys) for artifact in desired[key] or []]
+            desired_ids = {artifact['id'] for artifact in desired_artifacts}
 
-    def update_dataset_kshot_limit(self, dataset_id: UUID, kshot_limit: int) -> MaxMutationResponse:
+            for artifact in desired_artifacts:
+                existing = current_artifacts.get(artifact['id'])
+
+                if existing is None:
+                    action = 'create'
+                elif any(not _same_dataset_value(k, existing.get(k), v) for k, v in artifact.items()):
+                    action = 'update'
+                else:
+                    continue
+
+                planned.append((
+                    DatasetChangeResult(target=target, action=action, object_id=artifact['id']),
+                    (f'{action}_{target}', {'dataset_id': str(dataset_id), target: artifact}),
+                ))
+
+            if delete_missing:
+                for artifact_id in current_artifacts:
+                    if artifact_id not in desired_ids:
+                        planned.append((
+                            DatasetChangeResult(target=target, action='delete', object_id=artifact_id),
+                            (f'delete_{target}', {'dataset_id': str(dataset_id), f'{target}_id': artifact_id}),
+                        ))
+
+        return planned
+
+    def _submit_aliased_mutation_batches(self, name: str, planned: List[tuple], batch_size: int, max_workers: int) -> None:
+        batch_size = max(1, batch_size)
+        batches = [planned[i:i + batch_size] for i in range(0, len(planned), batch_size)]
+
+        if len(batches) <= 1 or max_workers <= 1:
+            for batch in batches:
+                self._submit_aliased_mutations(name, batch)
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
+                list(executor.map(lambda batch: self._submit_aliased_mutations(name, batch), batches))
+
+    def _submit_aliased_mutations(self, name: str, planned: List[tuple]) -> None:
         """
-        Update the k-shot limit for the dataset, which controls the number of example rows used for processing or training.
+        Send several mutations as one request, one aliased field each, and record each outcome on its result.
 
         Parameters
         ----------
-        dataset_id : UUID
-            The unique identifier of the dataset to be updated.
-        kshot_limit : int
-            The maximum number of examples (k-shot limit) to use when sampling or displaying example data.
-            Must be a non-negative integer.
-
-        Returns
-        -------
-        MaxMutationResponse
-            The result of the GraphQL mutation containing the updated k-shot limit.
+        name : str
+            The operation name.
+        planned : List[tuple]
+            (result, (mutation field, {argument: value})) pairs. Each result's success, code and error are set
+            from its field's response, or from the GraphQL error reported for its field. Results without an
+            object_id take the id a create mutation returns.
         """
-        mutation_args = {
-            'datasetId': str(dataset_id),
-            'kShotLimit': kshot_limit,
-        }
+        query_vars = {}
+        query_args = {}
 
-        op = Operations.mutation.update_dataset_kshot_limit
-        result = self._gql_client.submit(op, mutation_args)
+        variable_names = []
 
-        return result.update_dataset_kshot_limit
+        for i, (_, (mutation, args)) in enumerate(planned):
+            mutation_args = getattr(Mutation, mutation).args
+            # camelCase variable names ($change0DatasetId), which sgqlc renders unchanged
+            names = {arg: f'change{i}{mutation_args[arg].graphql_name[0].upper()}{mutation_args[arg].graphql_name[1:]}'
+                     for arg in args}
+            variable_names.append(names)
+
+            for arg, value in args.items():
+                query_vars[names[arg]] = Arg(mutation_args[arg].type)
+                query_args[names[arg]] = value
+
+        operation = Operation(Mutation, name=name, variables=query_vars)
+
+        for i, (_, (mutation, args)) in enumerate(planned):
+            gql_mutation = getattr(operation, mutation)(
+                __alias__=f'change_{i}',
+                **{arg: Variable(variable_names[i][arg]) for arg in args},
+            )
+
+            for response_field in getattr(Mutation, mutation).type.__field_names__:
+                getattr(gql_mutation, response_field)()
+
+        try:
+            response, errors = self._gql_client.submit_partial(operation, query_args)
+        except Exception as e:
+            for change, _ in planned:
+                change.success = False
+                change.error = str(e)
+                change.code = RESULT_EXCEPTION_CODE
+            return
+
+        errors_by_alias = {}
+
+        for error in errors:
+            errors_by_alias.setdefault(error['path'][0], error.get('message'))
+
+        for i, (change, _) in enumerate(planned):
+            mutation_response = getattr(response, f'change_{i}', None)
+            success = getattr(mutation_response, 'success', None)
+
+            if f'change_{i}' in errors_by_alias:
+                change.success = False
+                change.error = errors_by_alias[f'change_{i}']
+                change.code = RESULT_EXCEPTION_CODE
+            elif success is None:
+                change.success = False
+                change.error = "Outcome unknown: the response was discarded because another change in the request failed"
+                change.code = RESULT_EXCEPTION_CODE
+            else:
+                change.success = success
+                change.code = mutation_response.code
+                change.error = mutation_response.error
+
+                if change.object_id is None:
+                    created_ids = [getattr(mutation_response, name, None) for name in mutation_response.__field_names__ if name.endswith('_id')]
+                    change.object_id = str(created_ids[0]) if created_ids and created_ids[0] is not None else None
 
     def create_dataset(self, dataset: Dataset) -> MaxMutationResponse:
         """
@@ -1947,6 +3363,234 @@ class Data:
 
         return result.delete_metric
 
+    def create_dimensions(self, dataset_id: UUID, dimensions: List[Dimension | Dict], batch_size: int = MUTATION_BATCH_SIZE, max_workers: int = MUTATION_MAX_WORKERS) -> BulkMutationResult:
+        """
+        Create many dimensions in a dataset, packing `batch_size` create_dimension mutations into each request.
+
+        Up to `max_workers` requests run concurrently. Each dimension succeeds or fails on its own; failures are
+        reported per item rather than stopping the batch.
+
+        Parameters
+        ----------
+        dataset_id : UUID
+            The UUID of the dataset.
+        dimensions : List[Dimension | Dict]
+            The dimensions to create, as `Dimension` objects or dictionaries like those passed to `create_dimension`.
+        batch_size : int, optional
+            The number of mutations sent per request. Defaults to MUTATION_BATCH_SIZE.
+        max_workers : int, optional
+            The number of requests in flight at once. Defaults to MUTATION_MAX_WORKERS.
+
+        Returns
+        -------
+        BulkMutationResult
+            One `DatasetChangeResult` per dimension, in input order. `success` is True when all of them succeeded.
+        """
+        planned = []
+
+        for dimension in dimensions:
+            dimension_json = _artifact_json(dimension, ('dataType',))
+            planned.append((
+                DatasetChangeResult(target='dimension', action='create', object_id=dimension_json.get('id')),
+                ('create_dimension', {'dataset_id': str(dataset_id), 'dimension': dimension_json}),
+            ))
+
+        self._submit_aliased_mutation_batches('CreateDimensions', planned, batch_size, max_workers)
+
+        return BulkMutationResult(
+            success=all(change.success for change, _ in planned),
+            changes=[change for change, _ in planned],
+        )
+
+    def update_dimensions(self, dataset_id: UUID, dimensions: List[Dimension | Dict], batch_size: int = MUTATION_BATCH_SIZE, max_workers: int = MUTATION_MAX_WORKERS) -> BulkMutationResult:
+        """
+        Update many dimensions in a dataset, packing `batch_size` update_dimension mutations into each request.
+
+        Up to `max_workers` requests run concurrently. Each dimension succeeds or fails on its own; failures are
+        reported per item rather than stopping the batch.
+
+        Parameters
+        ----------
+        dataset_id : UUID
+            The UUID of the dataset.
+        dimensions : List[Dimension | Dict]
+            The updated dimensions, as `Dimension` objects or dictionaries like those passed to `update_dimension`.
+        batch_size : int, optional
+            The number of mutations sent per request. Defaults to MUTATION_BATCH_SIZE.
+        max_workers : int, optional
+            The number of requests in flight at once. Defaults to MUTATION_MAX_WORKERS.
+
+        Returns
+        -------
+        BulkMutationResult
+            One `DatasetChangeResult` per dimension, in input order. `success` is True when all of them succeeded.
+        """
+        planned = []
+
+        for dimension in dimensions:
+            dimension_json = _artifact_json(dimension, ('dataType',))
+            planned.append((
+                DatasetChangeResult(target='dimension', action='update', object_id=dimension_json.get('id')),
+                ('update_dimension', {'dataset_id': str(dataset_id), 'dimension': dimension_json}),
+            ))
+
+        self._submit_aliased_mutation_batches('UpdateDimensions', planned, batch_size, max_workers)
+
+        return BulkMutationResult(
+            success=all(change.success for change, _ in planned),
+            changes=[change for change, _ in planned],
+        )
+
+    def delete_dimensions(self, dataset_id: UUID, dimension_ids: List[str], batch_size: int = MUTATION_BATCH_SIZE, max_workers: int = MUTATION_MAX_WORKERS) -> BulkMutationResult:
+        """
+        Delete many dimensions in a dataset, packing `batch_size` delete_dimension mutations into each request.
+
+        Up to `max_workers` requests run concurrently. Each dimension succeeds or fails on its own; failures are
+        reported per item rather than stopping the batch.
+
+        Parameters
+        ----------
+        dataset_id : UUID
+            The UUID of the dataset.
+        dimension_ids : List[str]
+            The ids of the dimensions to delete.
+        batch_size : int, optional
+            The number of mutations sent per request. Defaults to MUTATION_BATCH_SIZE.
+        max_workers : int, optional
+            The number of requests in flight at once. Defaults to MUTATION_MAX_WORKERS.
+
+        Returns
+        -------
+        BulkMutationResult
+            One `DatasetChangeResult` per dimension, in input order. `success` is True when all of them succeeded.
+        """
+        planned = [
+            (DatasetChangeResult(target='dimension', action='delete', object_id=dimension_id),
+             ('delete_dimension', {'dataset_id': str(dataset_id), 'dimension_id': dimension_id}))
+            for dimension_id in dimension_ids
+        ]
+
+        self._submit_aliased_mutation_batches('DeleteDimensions', planned, batch_size, max_workers)
+
+        return BulkMutationResult(
+            success=all(change.success for change, _ in planned),
+            changes=[change for change, _ in planned],
+        )
+
+    def create_metrics(self, dataset_id: UUID, metrics: List[Metric | Dict], batch_size: int = MUTATION_BATCH_SIZE, max_workers: int = MUTATION_MAX_WORKERS) -> BulkMutationResult:
+        """
+        Create many metrics in a dataset, packing `batch_size` create_metric mutations into each request.
+
+        Up to `max_workers` requests run concurrently. Each metric succeeds or fails on its own; failures are
+        reported per item rather than stopping the batch.
+
+        Parameters
+        ----------
+        dataset_id : UUID
+            The UUID of the dataset.
+        metrics : List[Metric | Dict]
+            The metrics to create, as `Metric` objects or dictionaries like those passed to `create_metric`.
+        batch_size : int, optional
+            The number of mutations sent per request. Defaults to MUTATION_BATCH_SIZE.
+        max_workers : int, optional
+            The number of requests in flight at once. Defaults to MUTATION_MAX_WORKERS.
+
+        Returns
+        -------
+        BulkMutationResult
+            One `DatasetChangeResult` per metric, in input order. `success` is True when all of them succeeded.
+        """
+        planned = []
+
+        for metric in metrics:
+            metric_json = _artifact_json(metric, ('dataType', 'metricType', 'growthType'))
+            planned.append((
+                DatasetChangeResult(target='metric', action='create', object_id=metric_json.get('id')),
+                ('create_metric', {'dataset_id': str(dataset_id), 'metric': metric_json}),
+            ))
+
+        self._submit_aliased_mutation_batches('CreateMetrics', planned, batch_size, max_workers)
+
+        return BulkMutationResult(
+            success=all(change.success for change, _ in planned),
+            changes=[change for change, _ in planned],
+        )
+
+    def update_metrics(self, dataset_id: UUID, metrics: List[Metric | Dict], batch_size: int = MUTATION_BATCH_SIZE, max_workers: int = MUTATION_MAX_WORKERS) -> BulkMutationResult:
+        """
+        Update many metrics in a dataset, packing `batch_size` update_metric mutations into each request.
+
+        Up to `max_workers` requests run concurrently. Each metric succeeds or fails on its own; failures are
+        reported per item rather than stopping the batch.
+
+        Parameters
+        ----------
+        dataset_id : UUID
+            The UUID of the dataset.
+        metrics : List[Metric | Dict]
+            The updated metrics, as `Metric` objects or dictionaries like those passed to `update_metric`.
+        batch_size : int, optional
+            The number of mutations sent per request. Defaults to MUTATION_BATCH_SIZE.
+        max_workers : int, optional
+            The number of requests in flight at once. Defaults to MUTATION_MAX_WORKERS.
+
+        Returns
+        -------
+        BulkMutationResult
+            One `DatasetChangeResult` per metric, in input order. `success` is True when all of them succeeded.
+        """
+        planned = []
+
+        for metric in metrics:
+            metric_json = _artifact_json(metric, ('dataType', 'metricType', 'growthType'))
+            planned.append((
+                DatasetChangeResult(target='metric', action='update', object_id=metric_json.get('id')),
+                ('update_metric', {'dataset_id': str(dataset_id), 'metric': metric_json}),
+            ))
+
+        self._submit_aliased_mutation_batches('UpdateMetrics', planned, batch_size, max_workers)
+
+        return BulkMutationResult(
+            success=all(change.success for change, _ in planned),
+            changes=[change for change, _ in planned],
+        )
+
+    def delete_metrics(self, dataset_id: UUID, metric_ids: List[str], batch_size: int = MUTATION_BATCH_SIZE, max_workers: int = MUTATION_MAX_WORKERS) -> BulkMutationResult:
+        """
+        Delete many metrics in a dataset, packing `batch_size` delete_metric mutations into each request.
+
+        Up to `max_workers` requests run concurrently. Each metric succeeds or fails on its own; failures are
+        reported per item rather than stopping the batch.
+
+        Parameters
+        ----------
+        dataset_id : UUID
+            The UUID of the dataset.
+        metric_ids : List[str]
+            The ids of the metrics to delete.
+        batch_size : int, optional
+            The number of mutations sent per request. Defaults to MUTATION_BATCH_SIZE.
+        max_workers : int, optional
+            The number of requests in flight at once. Defaults to MUTATION_MAX_WORKERS.
+
+        Returns
+        -------
+        BulkMutationResult
+            One `DatasetChangeResult` per metric, in input order. `success` is True when all of them succeeded.
+        """
+        planned = [
+            (DatasetChangeResult(target='metric', action='delete', object_id=metric_id),
+             ('delete_metric', {'dataset_id': str(dataset_id), 'metric_id': metric_id}))
+            for metric_id in metric_ids
+        ]
+
+        self._submit_aliased_mutation_batches('DeleteMetrics', planned, batch_size, max_workers)
+
+        return BulkMutationResult(
+            success=all(change.success for change, _ in planned),
+            changes=[change for change, _ in planned],
+        )
+
     def create_database_kshot(self, database_kshot: dict[str, Any]) -> CreateDatabaseKShotResponse:
         """
         Create a new database k-shot.
@@ -2209,6 +3853,36 @@ class Data:
 
         return result.get_dataset_kshots
 
+    def iter_dataset_kshots(self, dataset_id: UUID, search_input: Optional[DatasetKShotSearchInput]=None, page_size: int = DEFAULT_PAGE_SIZE, prefetch_pages: int = DEFAULT_PREFETCH_PAGES) -> Iterator[DatasetKShot]:
+        """
+        Iterate over all dataset k-shots matching the search criteria, walking every page.
+
+        The next pages are fetched in the background while the current one is consumed; when the total row
+        count is known, up to `prefetch_pages` pages are fetched in parallel.
+
+        Parameters
+        ----------
+        dataset_id : UUID
+            The dataset_id that contains the k-shots
+        search_input : DatasetKShotSearchInput, optional
+            An object specifying the search criteria.
+            If None, no filters are applied
+        page_size : int, optional
+            The number of rows requested per page. Defaults to DEFAULT_PAGE_SIZE.
+        prefetch_pages : int, optional
+            The maximum number of pages fetched ahead of the consumer. Defaults to DEFAULT_PREFETCH_PAGES.
+
+        Returns
+        -------
+        Iterator[DatasetKShot]
+            The dataset k-shots, in page order.
+        """
+        return iter_paged_rows(
+            lambda page_num, size: self.get_dataset_kshots(dataset_id, search_input, PagingInput(page_num=page_num, page_size=size)),
+            page_size,
+            prefetch_pages,
+        )
+
     def get_dataset_kshot_by_id(self, dataset_kshot_id: UUID) -> Optional[DatasetKShot]:
         """
         Retrieve a dataset k-shot by its ID.
@@ -2447,6 +4121,184 @@ class Data:
         result = self._gql_client.submit(op, mutation_args)
 
         return result.update_dataset_kshot_visualization
+
+    def import_dataset_kshots(self, dataset_id: UUID, source, batch_size: int = MUTATION_BATCH_SIZE, max_workers: int = MUTATION_MAX_WORKERS, dry_run: bool = False) -> KShotImportResult:
+        """
+        Import dataset k-shots from a file or records, sending only what differs from the k-shots already there.
+
+        Records are matched to existing k-shots (active or not) by `datasetKShotId`, or by an exact `question`
+        when they have no id and exactly one k-shot has that question. Unmatched records are created; matched
+        ones get one update mutation per changed field. All mutations are packed `batch_size` per request with
+        up to `max_workers` requests in flight.
+
+        Parameters
+        ----------
+        dataset_id : UUID
+            The UUID of the dataset to import into.
+        source : str | os.PathLike | DataFrame | Iterable[Dict]
+            A JSONL or Parquet file, such as one written by `export_dataset_kshots`, a DataFrame, or records
+            with the keys accepted by `create_dataset_kshot`.
+        batch_size : int, optional
+            The number of mutations sent per request. Defaults to MUTATION_BATCH_SIZE.
+        max_workers : int, optional
+            The number of requests in flight at once. Defaults to MUTATION_MAX_WORKERS.
+        dry_run : bool, optional
+            If True, compute and return the changes without sending them. Defaults to False.
+
+        Returns
+        -------
+        KShotImportResult
+            The changes made and the number of unchanged k-shots. `success` is True when every change succeeded.
+
+        Notes
+        -----
+        `isActive` is only applied when a k-shot is created, as there is no mutation to change it afterwards.
+        """
+        return self._import_kshots('dataset', dataset_id, source, batch_size, max_workers, dry_run)
+
+    def export_dataset_kshots(self, dataset_id: UUID, path, include_inactive: bool = True, page_size: int = DEFAULT_PAGE_SIZE) -> int:
+        """
+        Export a dataset's k-shots to a JSONL or Parquet file that `import_dataset_kshots` can read back.
+
+        Pages are read with `iter_dataset_kshots`, so JSONL output streams to disk while later pages load.
+        Sample data is not exported.
+
+        Parameters
+        ----------
+        dataset_id : UUID
+            The UUID of the dataset.
+        path : str | os.PathLike
+            The file to write; a .parquet suffix selects Parquet, anything else JSON lines.
+        include_inactive : bool, optional
+            Whether inactive k-shots are exported. Defaults to True.
+        page_size : int, optional
+            The number of k-shots read per page. Defaults to DEFAULT_PAGE_SIZE.
+
+        Returns
+        -------
+        int
+            The number of k-shots written.
+        """
+        search_input = DatasetKShotSearchInput(question_contains=None, include_inactive=include_inactive)
+        kshots = self.iter_dataset_kshots(dataset_id, search_input, page_size=page_size)
+
+        return write_records((_kshot_record(kshot) for kshot in kshots), path, json_columns=('visualization',))
+
+    def import_database_kshots(self, database_id: UUID, source, batch_size: int = MUTATION_BATCH_SIZE, max_workers: int = MUTATION_MAX_WORKERS, dry_run: bool = False) -> KShotImportResult:
+        """
+        Import database k-shots from a file or records, sending only what differs from the k-shots already there.
+
+        Works like `import_dataset_kshots`, matching records by `databaseKShotId` or by an unambiguous `question`.
+
+        Parameters
+        ----------
+        database_id : UUID
+            The UUID of the database to import into.
+        source : str | os.PathLike | DataFrame | Iterable[Dict]
+            A JSONL or Parquet file, such as one written by `export_database_kshots`, a DataFrame, or records
+            with the keys accepted by `create_database_kshot`.
+        batch_size : int, optional
+            The number of mutations sent per request. Defaults to MUTATION_BATCH_SIZE.
+        max_workers : int, optional
+            The number of requests in flight at once. Defaults to MUTATION_MAX_WORKERS.
+        dry_run : bool, optional
+            If True, compute and return the changes without sending them. Defaults to False.
+
+        Returns
+        -------
+        KShotImportResult
+            The changes made and the number of unchanged k-shots. `success` is True when every change succeeded.
+        """
+        return self._import_kshots('database', database_id, source, batch_size, max_workers, dry_run)
+
+    def export_database_kshots(self, database_id: UUID, path, include_inactive: bool = True, page_size: int = DEFAULT_PAGE_SIZE) -> int:
+        """
+        Export a database's k-shots to a JSONL or Parquet file that `import_database_kshots` can read back.
+
+        Parameters
+        ----------
+        database_id : UUID
+            The UUID of the database.
+        path : str | os.PathLike
+            The file to write; a .parquet suffix selects Parquet, anything else JSON lines.
+        include_inactive : bool, optional
+            Whether inactive k-shots are exported. Defaults to True.
+        page_size : int, optional
+            The number of k-shots read per page. Defaults to DEFAULT_PAGE_SIZE.
+
+        Returns
+        -------
+        int
+            The number of k-shots written.
+        """
+        search_input = DatabaseKShotSearchInput(question_contains=None, include_inactive=include_inactive)
+        kshots = self.iter_database_kshots(database_id, search_input, page_size=page_size)
+
+        return write_records((_kshot_record(kshot) for kshot in kshots), path, json_columns=('visualization',))
+
+    def _import_kshots(self, owner: str, owner_id: UUID, source, batch_size: int, max_workers: int, dry_run: bool) -> KShotImportResult:
+        result = KShotImportResult()
+        id_key = f'{owner}KShotId'
+
+        try:
+            records = read_records(source, json_columns=('visualization',))
+
+            if owner == 'dataset':
+                existing = self.iter_dataset_kshots(owner_id, DatasetKShotSearchInput(question_contains=None, include_inactive=True))
+            else:
+                existing = self.iter_database_kshots(owner_id, DatabaseKShotSearchInput(question_contains=None, include_inactive=True))
+
+            existing_by_id = {}
+            existing_by_question = {}
+
+            for kshot in existing:
+                kshot_json = _kshot_record(kshot)
+                existing_by_id[str(kshot_json[id_key])] = kshot_json
+                existing_by_question.setdefault(kshot_json.get('question'), []).append(kshot_json)
+
+            planned = []
+
+            for record in records:
+                current = existing_by_id.get(str(record[id_key])) if record.get(id_key) else None
+
+                if current is None and not record.get(id_key):
+                    matches = existing_by_question.get(record.get('question'), [])
+                    current = matches[0] if len(matches) == 1 else None
+
+                if current is None:
+                    kshot = {key: value for key, value in record.items() if key != id_key}
+                    kshot[f'{owner}Id'] = str(owner_id)
+                    planned.append((
+                        DatasetChangeResult(target='kshot', action='create'),
+                        (f'create_{owner}_kshot', {f'{owner}_kshot': kshot}),
+                    ))
+                    continue
+
+                kshot_id = str(current[id_key])
+                updates = [
+                    (DatasetChangeResult(target=arg, action='update', object_id=kshot_id),
+                     (f'update_{owner}_kshot_{arg}', {f'{owner}_kshot_id': kshot_id, arg: record[key]}))
+                    for key, arg in _KSHOT_UPDATE_ARGS.items()
+                    if key in record and record[key] != current.get(key)
+                ]
+
+                if updates:
+                    planned.extend(updates)
+                else:
+                    result.unchanged += 1
+
+            result.changes = [change for change, _ in planned]
+
+            if not dry_run and planned:
+                self._submit_aliased_mutation_batches(f'Import{owner.title()}KShots', planned, batch_size, max_workers)
+
+            result.success = dry_run or all(change.success for change in result.changes)
+        except Exception as e:
+            result.success = False
+            result.error = str(e)
+            result.code = RESULT_EXCEPTION_CODE
+
+        return result
     
     def get_tracked_dimension_values(
         self, dataset_id: UUID
@@ -2511,3 +4363,122 @@ class Data:
         result = self._gql_client.submit(op, query_args)
 
         return result.get_all_tracked_dimension_values
+
+    def iter_all_tracked_dimension_values(
+        self,
+        dataset_id: Optional[UUID] = None,
+        filters: Optional[dict] = None,
+        sort: Optional[list] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        prefetch_pages: int = DEFAULT_PREFETCH_PAGES,
+    ) -> Iterator[TrackedDimensionValueRow]:
+        """
+        Iterate over every tracked dimension value matching the filters, walking all pages.
+
+        The first page's `totalCount` fixes the number of pages, and up to `prefetch_pages` of the rest are
+        fetched in parallel while the current one is consumed. Every page is requested with the same filter and
+        sort models; pass a sort model so rows keep a stable order across pages.
+
+        Parameters
+        ----------
+        dataset_id : UUID, optional
+            Scope the results to a single dataset. If None, spans all datasets.
+        filters : dict, optional
+            AG-Grid filter model; see `get_all_tracked_dimension_values`.
+        sort : list, optional
+            AG-Grid sort model; see `get_all_tracked_dimension_values`.
+        page_size : int, optional
+            The number of rows requested per page. Defaults to DEFAULT_PAGE_SIZE.
+        prefetch_pages : int, optional
+            The maximum number of pages fetched ahead. Defaults to DEFAULT_PREFETCH_PAGES.
+
+        Yields
+        ------
+        TrackedDimensionValueRow
+            Each matching row, in page order.
+        """
+        def fetch_page(page_num, size):
+            # the models are copied per request since pages are fetched on several threads
+            page = self.get_all_tracked_dimension_values(
+                offset=(page_num - 1) * size,
+                limit=size,
+                dataset_id=dataset_id,
+                filters=copy.deepcopy(filters),
+                sort=copy.deepcopy(sort),
+            )
+
+            return SimpleNamespace(rows=page.rows, total_rows=page.total_count)
+
+        return iter_paged_rows(fetch_page, page_size, prefetch_pages)
+
+    def get_all_tracked_dimension_values_df(
+        self,
+        dataset_id: Optional[UUID] = None,
+        filters: Optional[dict] = None,
+        sort: Optional[list] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> DataFrame:
+        """
+        Read every tracked dimension value matching the filters into a DataFrame.
+
+        Pages are read with `iter_all_tracked_dimension_values`. The `tuples` column holds each row's list of
+        dimension tuples as dictionaries.
+
+        Parameters
+        ----------
+        dataset_id : UUID, optional
+            Scope the results to a single dataset. If None, spans all datasets.
+        filters : dict, optional
+            AG-Grid filter model; see `get_all_tracked_dimension_values`.
+        sort : list, optional
+            AG-Grid sort model; see `get_all_tracked_dimension_values`.
+        page_size : int, optional
+            The number of rows requested per page. Defaults to DEFAULT_PAGE_SIZE.
+
+        Returns
+        -------
+        DataFrame
+            One row per tracked dimension value, with the API's camelCase column names.
+        """
+        rows = self.iter_all_tracked_dimension_values(dataset_id, filters, sort, page_size=page_size)
+
+        return pd.DataFrame(
+            [row.__to_json_value__() for row in rows],
+            columns=[field.graphql_name for field in TrackedDimensionValueRow],
+        )
+
+    def export_tracked_dimension_values(
+        self,
+        path,
+        dataset_id: Optional[UUID] = None,
+        filters: Optional[dict] = None,
+        sort: Optional[list] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> int:
+        """
+        Export every tracked dimension value matching the filters to a JSONL or Parquet file.
+
+        Pages are read with `iter_all_tracked_dimension_values`, so JSONL output streams to disk while later
+        pages load. In Parquet output the `tuples` column is stored as JSON strings.
+
+        Parameters
+        ----------
+        path : str | os.PathLike
+            The file to write; a .parquet suffix selects Parquet, anything else JSON lines.
+        dataset_id : UUID, optional
+            Scope the results to a single dataset. If None, spans all datasets.
+        filters : dict, optional
+            AG-Grid filter model; see `get_all_tracked_dimension_values`.
+        sort : list, optional
+            AG-Grid sort model; see `get_all_tracked_dimension_values`.
+        page_size : int, optional
+            The number of rows requested per page. Defaults to DEFAULT_PAGE_SIZE.
+
+        Returns
+        -------
+        int
+            The number of rows written.
+        """
+        rows = self.iter_all_tracked_dimension_values(dataset_id, filters, sort, page_size=page_size)
+
+        return write_records((row.__to_json_value__() for row in rows), path, json_columns=('tuples',))
@@ -1,3 +1,5 @@
+import threading
+
 from sgqlc.operation import Operation
 from sgqlc.endpoint.http import HTTPEndpoint
 
@@ -7,6 +9,44 @@ from answer_rocket.client_config import ClientConfig
 from answer_rocket.graphql.schema import Query, Mutation
 
 
+class PreparedOperation:
+    """
+    An operation whose GraphQL document is rendered once up front.
+
+    Submitting a plain sgqlc operation re-serializes its whole selection on every call; wrapping an operation
+    that is built once and reused lets the client send the cached text instead.
+    """
+
+    def __init__(self, operation: Operation):
+        self.operation = operation
+        self.document = bytes(operation)
+
+
+# Operations built at runtime by the Data and Chat clients, keyed by (query field, variant...).
+_prepared_operations: dict[tuple, PreparedOperation] = {}
+_prepared_operations_lock = threading.Lock()
+
+
+def prepared_operation(key: tuple, build) -> PreparedOperation:
+    """
+    Return the cached operation for `key`, calling `build` and rendering its document only on first use.
+
+    The cache is shared by every client in the process; keys start with the name of the query field so
+    variants of different queries do not collide.
+    """
+    prepared = _prepared_operations.get(key)
+
+    if prepared is None:
+        with _prepared_operations_lock:
+            prepared = _prepared_operations.get(key)
+
+            if prepared is None:
+                prepared = PreparedOperation(build())
+                _prepared_operations[key] = prepared
+
+    return prepared
+
+
 class GraphQlClient:
 
     def __init__(self, config: ClientConfig):
@@ -16,7 +56,11 @@ class GraphQlClient:
             base_headers=self._auth_helper.headers())
         
     def submit(self, operation, variables=None):
-        raw_response = self._endpoint(operation, variables)
+        if isinstance(operation, PreparedOperation):
+            raw_response = self._endpoint(operation.document, variables)
+            operation = operation.operation
+        else:
+            raw_response = self._endpoint(operation, variables)
 
         if 'errors' in raw_response:
             raise Exception(raw_response['errors'][0]['message'])
@@ -24,7 +68,36 @@ class GraphQlClient:
             raise Exception(raw_response['errorMessage'])
 
         return operation + raw_response
-    
+
+    def submit_partial(self, operation, variables=None):
+        """
+        Submit an operation whose top-level fields may fail independently, such as a batch of aliased mutations.
+
+        Unlike `submit`, field errors do not raise; they are handed back alongside the result so callers can
+        attribute each one to its field through the error's `path`. A failing non-null field nulls the whole
+        response, in which case the result is None and only the errors say what went wrong. Errors
+        without a path mean the request itself failed and raise as in `submit`.
+
+        Returns a (result, errors) tuple.
+        """
+        if isinstance(operation, PreparedOperation):
+            raw_response = self._endpoint(operation.document, variables)
+            operation = operation.operation
+        else:
+            raw_response = self._endpoint(operation, variables)
+
+        errors = raw_response.get('errors') or []
+
+        for error in errors:
+            if not error.get('path'):
+                raise Exception(error['message'])
+        if 'errorMessage' in raw_response:
+            raise Exception(raw_response['errorMessage'])
+
+        data = raw_response.get('data')
+
+        return (operation + {'data': data} if data else None), errors
+
     def query(self, variables: dict | None = None):
         if variables:
             return Operation(Query, variables=variables)
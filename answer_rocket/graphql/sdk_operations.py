@@ -39,8 +39,26 @@ def fragment_chat_result_fragment():
     return _frag
 
 
+def fragment_chat_result_light_fragment():
+    _frag = sgqlc.operation.Fragment(_schema.MaxChatResult, 'ChatResultLightFragment')
+    _frag.answer_id()
+    _frag.thread_id()
+    _frag.answered_at()
+    _frag.copilot_skill_id()
+    _frag.has_finished()
+    _frag.error()
+    _frag.message()
+    _frag_report_results = _frag.report_results()
+    _frag_report_results.title()
+    _frag_report_results.report_name()
+    _frag_report_results.final_message()
+    _frag.user_id()
+    return _frag
+
+
 class Fragment:
     chat_result_fragment = fragment_chat_result_fragment()
+    chat_result_light_fragment = fragment_chat_result_light_fragment()
 
 
 def mutation_ask_chat_question():
@@ -646,6 +664,21 @@ def query_chat_entry():
     return _op
 
 
+def query_chat_entry_light():
+    _op = sgqlc.operation.Operation(_schema_root.query_type, name='ChatEntryLight', variables=dict(id=sgqlc.types.Arg(sgqlc.types.non_null(_schema.UUID))))
+    _op_chat_entry = _op.chat_entry(id=sgqlc.types.Variable('id'))
+    _op_chat_entry.id()
+    _op_chat_entry.thread_id()
+    _op_chat_entry_question = _op_chat_entry.question()
+    _op_chat_entry_question.asked_at()
+    _op_chat_entry_question.nl()
+    _op_chat_entry_answer = _op_chat_entry.answer()
+    _op_chat_entry_answer.__fragment__(fragment_chat_result_light_fragment())
+    _op_chat_entry.feedback()
+    _op_chat_entry.user()
+    return _op
+
+
 def query_dataframes_for_entry():
     _op = sgqlc.operation.Operation(_schema_root.query_type, name='DataframesForEntry', variables=dict(entryId=sgqlc.types.Arg(sgqlc.types.non_null(_schema.UUID))))
     _op_chat_entry = _op.chat_entry(id=sgqlc.types.Variable('entryId'))
@@ -672,6 +705,21 @@ def query_chat_thread():
     return _op
 
 
+def query_chat_thread_light():
+    _op = sgqlc.operation.Operation(_schema_root.query_type, name='ChatThreadLight', variables=dict(id=sgqlc.types.Arg(sgqlc.types.non_null(_schema.UUID))))
+    _op_chat_thread = _op.chat_thread(id=sgqlc.types.Variable('id'))
+    _op_chat_thread.id()
+    _op_chat_thread.entry_count()
+    _op_chat_thread.title()
+    _op_chat_thread.copilot_id()
+    _op_chat_thread_entries = _op_chat_thread.entries()
+    _op_chat_thread_entries.id()
+    _op_chat_thread_entries.thread_id()
+    _op_chat_thread_entries_answer = _op_chat_thread_entries.answer()
+    _op_chat_thread_entries_answer.__fragment__(fragment_chat_result_light_fragment())
+    return _op
+
+
 def query_all_chat_entries():
     _op = sgqlc.operation.Operation(_schema_root.query_type, name='AllChatEntries', variables=dict(offset=sgqlc.types.Arg(_schema.Int), limit=sgqlc.types.Arg(_schema.Int), filters=sgqlc.types.Arg(_schema.JSON)))
     _op_all_chat_entries = _op.all_chat_entries(offset=sgqlc.types.Variable('offset'), limit=sgqlc.types.Variable('limit'), filters=sgqlc.types.Variable('filters'))
@@ -687,6 +735,21 @@ def query_all_chat_entries():
     return _op
 
 
+def query_all_chat_entries_light():
+    _op = sgqlc.operation.Operation(_schema_root.query_type, name='AllChatEntriesLight', variables=dict(offset=sgqlc.types.Arg(_schema.Int), limit=sgqlc.types.Arg(_schema.Int), filters=sgqlc.types.Arg(_schema.JSON)))
+    _op_all_chat_entries = _op.all_chat_entries(offset=sgqlc.types.Variable('offset'), limit=sgqlc.types.Variable('limit'), filters=sgqlc.types.Variable('filters'))
+    _op_all_chat_entries.id()
+    _op_all_chat_entries.thread_id()
+    _op_all_chat_entries_question = _op_all_chat_entries.question()
+    _op_all_chat_entries_question.asked_at()
+    _op_all_chat_entries_question.nl()
+    _op_all_chat_entries_answer = _op_all_chat_entries.answer()
+    _op_all_chat_entries_answer.__fragment__(fragment_chat_result_light_fragment())
+    _op_all_chat_entries.feedback()
+    _op_all_chat_entries.user()
+    return _op
+
+
 def query_skill_memory():
     _op = sgqlc.operation.Operation(_schema_root.query_type, name='SkillMemory', variables=dict(entryId=sgqlc.types.Arg(sgqlc.types.non_null(_schema.UUID))))
     _op.skill_memory(entry_id=sgqlc.types.Variable('entryId'))
@@ -1062,6 +1125,7 @@ def query_get_dataset2():
     _op_get_dataset2.misc_info()
     _op_get_dataset2.source_table()
     _op_get_dataset2.source_sql()
+    _op_get_dataset2.derived_table_alias()
     _op_get_dataset2.data_interval()
     _op_get_dataset2.dataset_min_date()
     _op_get_dataset2.dataset_max_date()
@@ -1284,10 +1348,13 @@ def query_get_all_tracked_dimension_values():
 
 class Query:
     all_chat_entries = query_all_chat_entries()
+    all_chat_entries_light = query_all_chat_entries_light()
     chat_completion = query_chat_completion()
     chat_completion_with_prompt = query_chat_completion_with_prompt()
     chat_entry = query_chat_entry()
+    chat_entry_light = query_chat_entry_light()
     chat_thread = query_chat_thread()
+    chat_thread_light = query_chat_thread_light()
     current_user = query_current_user()
     dataframes_for_entry = query_dataframes_for_entry()
     generate_embeddings = query_generate_embeddings()
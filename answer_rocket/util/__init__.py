@@ -1,6 +1,22 @@
 
 __all__ = {
-    'MetaDataFrame'
+    'MetaDataFrame',
+    'DatasetIndex',
+    'GroundingIndex',
+    'KShotIndex',
+    'CatalogSnapshot',
+    'DatasetSnapshot',
+    'SpilledResult',
+    'LatencyReport',
+    'ThreadCache'
 }
 
-from answer_rocket.util.meta_data_frame import MetaDataFrame
\ No newline at end of file
+from answer_rocket.util.meta_data_frame import MetaDataFrame
+from answer_rocket.util.dataset_index import DatasetIndex
+from answer_rocket.util.grounding_index import GroundingIndex
+from answer_rocket.util.kshot_index import KShotIndex
+from answer_rocket.util.catalog import CatalogSnapshot
+from answer_rocket.util.dataset_snapshot import DatasetSnapshot
+from answer_rocket.util.spill import SpilledResult
+from answer_rocket.util.latency import LatencyReport
+from answer_rocket.util.thread_cache import ThreadCache
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+_SCHEMA = """
+create table if not exists databases (
+    database_id text primary key,
+    name text,
+    dbms text,
+    description text,
+    crawled_at real
+);
+create table if not exists tables (
+    database_id text,
+    table_name text,
+    primary key (database_id, table_name)
+);
+create table if not exists datasets (
+    dataset_id text primary key,
+    database_id text,
+    name text,
+    description text,
+    listing_hash text,
+    detail_hash text,
+    crawled_at real
+);
+create table if not exists domain_objects (
+    dataset_id text,
+    id text,
+    type text,
+    name text,
+    output_label text,
+    description text,
+    entity_id text,
+    primary key (dataset_id, id)
+);
+create index if not exists domain_objects_name on domain_objects (name);
+"""
+
+
+def fingerprint(value: Any) -> str:
+    """
+    Return a stable hash of a json-serializable value, used to tell whether a catalog entry changed.
+    """
+    return hashlib.sha1(json.dumps(value, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class CatalogSnapshot:
+    """
+    A local SQLite snapshot of the database catalog written by `Data.crawl_catalog`.
+
+    Tables: `databases`, `tables` (database_id, table_name), `datasets` and `domain_objects` (one row per
+    entity, attribute and metric, with `entity_id` linking attributes to their entity). Query it with `query`
+    or any SQLite client.
+
+    Examples
+    --------
+    >>> catalog = CatalogSnapshot("catalog.db")
+    >>> catalog.query("select name, output_label from domain_objects where type = 'MaxMetricAttribute'")
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript(_SCHEMA)
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self) -> CatalogSnapshot:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def query(self, sql: str, params: Iterable = ()) -> pd.DataFrame:
+        """
+        Run a SQL query against the snapshot.
+
+        Parameters
+        ----------
+        sql : str
+            The SQLite query.
+        params : Iterable, optional
+            Query parameters for `?` placeholders.
+
+        Returns
+        -------
+        pd.DataFrame
+            The query result.
+        """
+        return pd.read_sql_query(sql, self._connection, params=tuple(params))
+
+    def find_domain_objects(self, name_contains: str) -> pd.DataFrame:
+        """
+        Find domain objects across all datasets whose name or output label contains a string (case-insensitive).
+        """
+        pattern = f"%{name_contains}%"
+
+        return self.query(
+            "select d.name as dataset_name, o.* from domain_objects o join datasets d using (dataset_id) "
+            "where o.name like ? or o.output_label like ? order by d.name, o.name",
+            (pattern, pattern),
+        )
+
+    def dataset_states(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return the listing hash, detail hash and crawl time of every dataset in the snapshot, keyed by id.
+        """
+        rows = self._connection.execute("select dataset_id, listing_hash, detail_hash, crawled_at from datasets")
+
+        return {row[0]: {"listing_hash": row[1], "detail_hash": row[2], "crawled_at": row[3]} for row in rows}
+
+    def write_database(self, database: Dict[str, Any], table_names: List[str]):
+        with self._connection:
+            self._connection.execute(
+                "insert or replace into databases values (?, ?, ?, ?, ?)",
+                (database["databaseId"], database.get("name"), database.get("dbms"), database.get("description"), time.time()),
+            )
+            self._connection.execute("delete from tables where database_id = ?", (database["databaseId"],))
+            self._connection.executemany(
+                "insert into tables values (?, ?)", [(database["databaseId"], name) for name in table_names],
+            )
+
+    def write_dataset_listing(self, dataset: Dict[str, Any]):
+        """
+        Record a dataset's listing row, keeping any details fetched earlier.
+        """
+        with self._connection:
+            self._connection.execute(
+                "insert into datasets (dataset_id, database_id, name, description, listing_hash) values (?, ?, ?, ?, ?) "
+                "on conflict (dataset_id) do update set database_id = excluded.database_id, name = excluded.name, "
+                "description = excluded.description, listing_hash = excluded.listing_hash",
+                (dataset["datasetId"], dataset.get("databaseId"), dataset.get("name"), dataset.get("description"),
+                 fingerprint(dataset)),
+            )
+
+    def write_dataset_details(self, dataset_id: str, domain_objects: List[Dict[str, Any]], detail_hash: str):
+        with self._connection:
+            self._connection.execute(
+                "update datasets set detail_hash = ?, crawled_at = ? where dataset_id = ?",
+                (detail_hash, time.time(), dataset_id),
+            )
+            self._connection.execute("delete from domain_objects where dataset_id = ?", (dataset_id,))
+            self._connection.executemany(
+                "insert or replace into domain_objects values (?, ?, ?, ?, ?, ?, ?)",
+                [(dataset_id, o.get("id"), o.get("type"), o.get("name"), o.get("output_label"), o.get("description"),
+                  o.get("entity_id")) for o in domain_objects],
+            )
+
+    def invalidate_dataset(self, dataset_id: str):
+        """
+        Mark a dataset's details as stale so the next crawl fetches them again.
+        """
+        with self._connection:
+            self._connection.execute("update datasets set detail_hash = null where dataset_id = ?", (dataset_id,))
+
+    def remove_missing(self, database_ids: Iterable[str], dataset_ids: Iterable[str],
+                       listed_database_ids: Optional[Iterable[str]] = None) -> int:
+        """
+        Delete databases and datasets that are no longer listed, with their tables and domain objects.
+
+        Parameters
+        ----------
+        database_ids : Iterable[str]
+            Every database id currently listed.
+        dataset_ids : Iterable[str]
+            Every dataset id currently listed under `listed_database_ids`.
+        listed_database_ids : Iterable[str], optional
+            The databases whose datasets were listed successfully; datasets of other databases are kept.
+            Defaults to `database_ids`.
+
+        Returns
+        -------
+        int
+            The number of databases and datasets removed.
+        """
+        database_ids = set(database_ids)
+        dataset_ids = set(dataset_ids)
+        listed = set(listed_database_ids) if listed_database_ids is not None else database_ids
+
+        stale_databases = [row[0] for row in self._connection.execute("select database_id from databases")
+                           if row[0] not in database_ids]
+        stale_datasets = [row[0] for row in self._connection.execute("select dataset_id, database_id from datasets")
+                          if row[0] not in dataset_ids and (row[1] in listed or row[1] not in database_ids)]
+
+        with self._connection:
+            for database_id in stale_databases:
+                self._connection.execute("delete from databases where database_id = ?", (database_id,))
+                self._connection.execute("delete from tables where database_id = ?", (database_id,))
+
+            for dataset_id in stale_datasets:
+                self._connection.execute("delete from datasets where dataset_id = ?", (dataset_id,))
+                self._connection.execute("delete from domain_objects where dataset_id = ?", (dataset_id,))
+
+        return len(stale_databases) + len(stale_datasets)
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, Iterator, List, Optional
+
+from answer_rocket.graphql.schema import MaxDataset
+
+
+def normalize_reference(reference: str) -> str:
+    """
+    Normalize a domain object reference for lookup.
+
+    Parameters
+    ----------
+    reference : str
+        An id, rql name, name, output label or synonym.
+
+    Returns
+    -------
+    str
+        The reference case-folded, trimmed, and with runs of whitespace collapsed to one space.
+    """
+    return re.sub(r"\s+", " ", str(reference).strip()).casefold()
+
+
+class DatasetIndex:
+    """
+    Local lookup index over the domain objects of a fetched `MaxDataset`.
+
+    Built once from the result of `Data.get_dataset`, it resolves metric, dimension and entity references by
+    id, rql name, name, output label or synonym with dictionary lookups instead of server round trips.
+    Lookups are case-insensitive. Entities are linked to the attributes nested under them.
+
+    Rql names follow `get_domain_object_by_name`: an entity is referenced by its name, an attribute by
+    '<entity name>.<attribute name>', and a top-level object such as a calculated metric by its name.
+
+    Examples
+    --------
+    >>> dataset = max.data.get_dataset(dataset_id)
+    >>> index = DatasetIndex(dataset)
+    >>> sales = index.get('Transactions.Sales')
+    >>> index.entity_of(sales).name
+    'transactions'
+    """
+
+    def __init__(self, dataset: MaxDataset):
+        self.dataset = dataset
+        self.dataset_id = getattr(dataset, "dataset_id", None)
+
+        self._objects: Dict[str, Any] = {}
+        self._rql_names: Dict[str, str] = {}
+        self._attribute_ids_by_entity: Dict[str, List[str]] = {}
+        self._entity_id_by_attribute: Dict[str, str] = {}
+
+        self._by_id: Dict[str, str] = {}
+        self._by_rql_name: Dict[str, str] = {}
+        self._by_name: Dict[str, List[str]] = {}
+        self._by_output_label: Dict[str, List[str]] = {}
+        self._by_synonym: Dict[str, List[str]] = {}
+
+        for domain_object in getattr(dataset, "domain_objects", None) or []:
+            attributes = getattr(domain_object, "attributes", None)
+
+            if attributes is None:
+                self._add(domain_object, domain_object.name)
+                continue
+
+            self._add(domain_object, domain_object.name)
+            attribute_ids = self._attribute_ids_by_entity.setdefault(domain_object.id, [])
+
+            for attribute in attributes:
+                if attribute.id not in self._objects:
+                    self._add(attribute, f"{domain_object.name}.{attribute.name}")
+
+                if attribute.id not in attribute_ids:
+                    attribute_ids.append(attribute.id)
+
+                self._entity_id_by_attribute.setdefault(attribute.id, domain_object.id)
+
+    def _add(self, domain_object, rql_name: str):
+        object_id = domain_object.id
+
+        self._objects[object_id] = domain_object
+        self._rql_names[object_id] = rql_name
+
+        self._by_id.setdefault(normalize_reference(object_id), object_id)
+        self._by_rql_name.setdefault(normalize_reference(rql_name), object_id)
+        self._append(self._by_name, getattr(domain_object, "name", None), object_id)
+        self._append(self._by_output_label, getattr(domain_object, "output_label", None), object_id)
+        self._append(self._by_output_label, getattr(domain_object, "output_label_plural", None), object_id)
+
+        for synonym in getattr(domain_object, "synonyms", None) or []:
+            self._append(self._by_synonym, synonym, object_id)
+
+    @staticmethod
+    def _append(lookup: Dict[str, List[str]], key: Optional[str], object_id: str):
+        if not key:
+            return
+
+        ids = lookup.setdefault(normalize_reference(key), [])
+
+        if object_id not in ids:
+            ids.append(object_id)
+
+    def get(self, reference: str) -> Optional[Any]:
+        """
+        Resolve a reference to a single domain object.
+
+        The reference is tried as an id, then an rql name, then a name, output label and synonym. When a
+        name, label or synonym matches several objects the first one in dataset order is returned; use
+        `find_all` to see every candidate.
+
+        Parameters
+        ----------
+        reference : str
+            An id, rql name, name, output label or synonym.
+
+        Returns
+        -------
+        Any | None
+            The matching domain object, or None if nothing matches.
+        """
+        matches = self.find_all(reference)
+
+        return matches[0] if matches else None
+
+    def find_all(self, reference: str) -> List[Any]:
+        """
+        Resolve a reference to every domain object it could name, most specific match first.
+
+        Parameters
+        ----------
+        reference : str
+            An id, rql name, name, output label or synonym.
+
+        Returns
+        -------
+        List[Any]
+            Matching domain objects ordered by id, rql name, name, output label and synonym matches.
+        """
+        key = normalize_reference(reference)
+        ids: List[str] = []
+
+        for lookup in (self._by_id, self._by_rql_name):
+            object_id = lookup.get(key)
+
+            if object_id is not None and object_id not in ids:
+                ids.append(object_id)
+
+        for lookup in (self._by_name, self._by_output_label, self._by_synonym):
+            for object_id in lookup.get(key, ()):
+                if object_id not in ids:
+                    ids.append(object_id)
+
+        return [self._objects[object_id] for object_id in ids]
+
+    def get_by_id(self, domain_object_id: str) -> Optional[Any]:
+        """
+        Return the domain object with the given id (e.g. 'transactions__sales'), or None.
+        """
+        object_id = self._by_id.get(normalize_reference(domain_object_id))
+
+        return self._objects.get(object_id) if object_id is not None else None
+
+    def get_by_rql_name(self, rql_name: str) -> Optional[Any]:
+        """
+        Return the domain object with the given rql name (e.g. 'transactions.sales'), or None.
+        """
+        object_id = self._by_rql_name.get(normalize_reference(rql_name))
+
+        return self._objects.get(object_id) if object_id is not None else None
+
+    def rql_name_of(self, domain_object) -> Optional[str]:
+        """
+        Return the rql name of an indexed domain object or domain object id.
+        """
+        return self._rql_names.get(self._object_id(domain_object))
+
+    def attributes_of(self, entity) -> List[Any]:
+        """
+        Return the attributes of an entity.
+
+        Parameters
+        ----------
+        entity : Any
+            The entity, or any reference that resolves to it.
+
+        Returns
+        -------
+        List[Any]
+            The entity's attributes, or an empty list if the reference is not an entity.
+        """
+        return [self._objects[attribute_id] for attribute_id in self._attribute_ids_by_entity.get(self._object_id(entity), [])]
+
+    def entity_of(self, attribute) -> Optional[Any]:
+        """
+        Return the entity an attribute belongs to.
+
+        Parameters
+        ----------
+        attribute : Any
+            The attribute, or any reference that resolves to it.
+
+        Returns
+        -------
+        Any | None
+            The owning entity, or None for top-level objects.
+        """
+        entity_id = self._entity_id_by_attribute.get(self._object_id(attribute))
+
+        return self._objects.get(entity_id) if entity_id is not None else None
+
+    def _object_id(self, domain_object) -> Optional[str]:
+        if isinstance(domain_object, str):
+            resolved = self.get(domain_object)
+            return resolved.id if resolved is not None else None
+
+        return getattr(domain_object, "id", None)
+
+    def __contains__(self, reference: str) -> bool:
+        return bool(self.find_all(reference))
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._objects.values())
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, Optional
+
+from answer_rocket.graphql.schema import MaxDataset
+
+SNAPSHOT_FORMAT = "answer-rocket-dataset-snapshot"
+SNAPSHOT_VERSION = 1
+
+
+def _dataset_json(dataset: MaxDataset) -> Dict[str, Any]:
+    # __to_json_value__ drops __typename, which MaxDataset needs to rebuild the concrete domain object classes
+    value = dataset.__to_json_value__()
+
+    for domain_object, json_object in zip(getattr(dataset, "domain_objects", None) or [], value.get("domainObjects") or []):
+        json_object["__typename"] = type(domain_object).__name__
+
+        for attribute, json_attribute in zip(getattr(domain_object, "attributes", None) or [], json_object.get("attributes") or []):
+            json_attribute["__typename"] = type(attribute).__name__
+
+    return value
+
+
+class DatasetSnapshot:
+    """
+    A `MaxDataset` saved to a gzip-compressed file with a format version and a revision stamp.
+
+    The stamp is whatever the writer uses to tell revisions apart (`Data.export_dataset_snapshot` uses
+    `Data.get_dataset_stamp`), so a reader can compare it with the server's current stamp and only fetch the
+    full dataset again when they differ. Files with another format version are treated as missing.
+
+    Examples
+    --------
+    >>> snapshot = DatasetSnapshot.load("/shared/sales.snapshot")
+    >>> snapshot.dataset.name
+    'Distributor Sales'
+    """
+
+    def __init__(self, dataset: MaxDataset, stamp: Optional[str] = None, include_dim_values: bool = False,
+                 created_at: Optional[float] = None):
+        self.dataset = dataset
+        self.stamp = stamp
+        self.include_dim_values = include_dim_values
+        self.created_at = created_at if created_at is not None else time.time()
+
+    @property
+    def dataset_id(self) -> Optional[str]:
+        return getattr(self.dataset, "dataset_id", None)
+
+    def save(self, path):
+        """
+        Write the snapshot. The file is replaced atomically, so readers on a shared volume never see a partial file.
+
+        Parameters
+        ----------
+        path : str | os.PathLike
+            The file to write.
+        """
+        payload = {
+            "format": SNAPSHOT_FORMAT,
+            "version": SNAPSHOT_VERSION,
+            "stamp": self.stamp,
+            "include_dim_values": self.include_dim_values,
+            "created_at": self.created_at,
+            "dataset": _dataset_json(self.dataset),
+        }
+
+        directory = os.path.dirname(os.path.abspath(path))
+        handle, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+
+        try:
+            with os.fdopen(handle, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as f:
+                f.write(json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8"))
+
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    @classmethod
+    def load(cls, path) -> Optional[DatasetSnapshot]:
+        """
+        Read a snapshot written by `save`.
+
+        Parameters
+        ----------
+        path : str | os.PathLike
+            The file to read.
+
+        Returns
+        -------
+        Optional[DatasetSnapshot]
+            The snapshot, or None if the file is missing, unreadable, or written in another format version.
+        """
+        try:
+            with gzip.open(path, "rb") as f:
+                payload = json.loads(f.read().decode("utf-8"))
+        except (OSError, ValueError):
+            return None
+
+        if payload.get("format") != SNAPSHOT_FORMAT or payload.get("version") != SNAPSHOT_VERSION:
+            return None
+
+        return cls(
+            MaxDataset(payload["dataset"]),
+            stamp=payload.get("stamp"),
+            include_dim_values=payload.get("include_dim_values", False),
+            created_at=payload.get("created_at"),
+        )
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import json
+import math
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from answer_rocket.util.compact import is_date_column
+
+VISUALIZATION_MAX_ROWS = 2000
+VISUALIZATION_TOP_N = 10
+OTHER_LABEL = "Other"
+
+REDUCTIONS = ("auto", "lttb", "minmax", "top_n", "sample")
+
+
+def payload_bytes(data: Dict) -> int:
+    """
+    Return the size of a data payload as it is sent in a request variable.
+    """
+    return len(json.dumps(data, separators=(",", ":"), default=str).encode("utf-8"))
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Pick `threshold` points of a series with Largest-Triangle-Three-Buckets, keeping its visual shape.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        The x values, sorted ascending.
+    y : np.ndarray
+        The y values.
+    threshold : int
+        The number of points to keep.
+
+    Returns
+    -------
+    np.ndarray
+        The indices of the kept points, ascending. The first and last points are always kept.
+    """
+    count = len(x)
+
+    if threshold >= count or count <= 2:
+        return np.arange(count)
+    if threshold <= 2:
+        return np.array([0, count - 1][:max(threshold, 1)])
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.nan_to_num(np.asarray(y, dtype=np.float64))
+    every = (count - 2) / (threshold - 2)
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0] = selected = 0
+
+    for bucket in range(threshold - 2):
+        start = int(bucket * every) + 1
+        end = int((bucket + 1) * every) + 1
+        next_end = min(int((bucket + 2) * every) + 1, count)
+
+        if end >= next_end:
+            next_x, next_y = x[count - 1], y[count - 1]
+        else:
+            next_x, next_y = x[end:next_end].mean(), y[end:next_end].mean()
+
+        areas = np.abs((x[selected] - next_x) * (y[start:end] - y[selected])
+                       - (x[selected] - x[start:end]) * (next_y - y[selected]))
+        selected = start + int(np.argmax(areas))
+        indices[bucket + 1] = selected
+
+    indices[-1] = count - 1
+
+    return indices
+
+
+def minmax_indices(y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Keep the minimum and maximum point of each of `threshold / 2` equal buckets, preserving peaks and troughs.
+    """
+    count = len(y)
+
+    if threshold >= count:
+        return np.arange(count)
+
+    y = np.asarray(y, dtype=np.float64)
+    kept = set()
+
+    for bucket in np.array_split(np.arange(count), max(1, threshold // 2)):
+        values = y[bucket]
+
+        if np.isnan(values).all():
+            kept.add(int(bucket[0]))
+            continue
+
+        kept.add(int(bucket[np.nanargmin(values)]))
+        kept.add(int(bucket[np.nanargmax(values)]))
+
+    return np.array(sorted(kept), dtype=np.int64)
+
+
+def sample_indices(count: int, threshold: int) -> np.ndarray:
+    """
+    Evenly spaced row indices, including the first and last row.
+    """
+    if threshold >= count:
+        return np.arange(count)
+
+    return np.unique(np.linspace(0, count - 1, max(1, threshold)).round().astype(np.int64))
+
+
+def _json_value(value):
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+
+    return value
+
+
+def _column_roles(df: pd.DataFrame) -> Dict[str, List[str]]:
+    roles = {"time": [], "measures": [], "categories": []}
+
+    for name in df.columns:
+        values = df[name].dropna()
+
+        if values.empty:
+            continue
+        if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in values):
+            roles["measures"].append(name)
+        elif is_date_column(values):
+            roles["time"].append(name)
+        elif all(isinstance(value, str) for value in values):
+            roles["categories"].append(name)
+
+    return roles
+
+
+def _top_n(df: pd.DataFrame, category: str, measures: List[str], top_n: int) -> pd.DataFrame:
+    totals = df.groupby(category, dropna=False, sort=False)[measures[0]].sum().abs()
+
+    if len(totals) <= top_n:
+        return df
+
+    keep = set(totals.nlargest(top_n).index)
+    df = df.copy()
+    df[category] = df[category].where(df[category].isin(keep), OTHER_LABEL)
+    keys = [name for name in df.columns if name not in measures]
+
+    bucketed = df.groupby(keys, dropna=False, sort=False, as_index=False)[measures].sum(min_count=1)[list(df.columns)]
+
+    return bucketed.sort_values(category, key=lambda values: values.eq(OTHER_LABEL), kind="stable")
+
+
+def _downsample_series(df: pd.DataFrame, time: str, measure: str, series: List[str], max_rows: int, method: str) -> pd.DataFrame:
+    groups = [group for _, group in df.groupby(series, dropna=False, sort=False)] if series else [df]
+    budget = max(3, max_rows // len(groups))
+    kept = []
+
+    for group in groups:
+        group = group.assign(_x=pd.to_datetime(group[time], utc=True)).sort_values("_x")
+        x = group["_x"].to_numpy(dtype="datetime64[ns]").astype(np.int64).astype(np.float64)
+        y = group[measure].to_numpy(dtype=np.float64)
+        indices = lttb_indices(x, y, budget) if method == "lttb" else minmax_indices(y, budget)
+        kept.append(group.iloc[indices].drop(columns="_x"))
+
+    return pd.concat(kept)
+
+
+def reduce_visualization_data(data: Dict, max_rows: int = VISUALIZATION_MAX_ROWS, reduction: str = "auto",
+                              top_n: int = VISUALIZATION_TOP_N) -> Dict:
+    """
+    Shrink a `run_sql_ai` data payload to at most about `max_rows` rows before it is sent to be charted.
+
+    Reductions:
+
+    - "lttb": downsample each time series (one per combination of category values) with
+      Largest-Triangle-Three-Buckets on the first measure.
+    - "minmax": keep each time series' minimum and maximum per bucket.
+    - "top_n": keep the `top_n` values of the first category column by the first measure's total and sum the
+      rest into an "Other" row per remaining group.
+    - "sample": keep the columns and evenly spaced rows.
+    - "auto": "lttb" when there is a date column and a measure, "top_n" when there is a category and a
+      measure, "sample" otherwise. Top-N bucketing is applied to series categories first, and any payload
+      still over `max_rows` is sampled.
+
+    Parameters
+    ----------
+    data : Dict
+        A payload with 'columns' ([{'name': ...}]) and 'rows' ([{'data': [...]}]), as returned by `run_sql_ai`.
+    max_rows : int, optional
+        The row budget. Payloads within it are returned unchanged. Defaults to VISUALIZATION_MAX_ROWS.
+    reduction : str, optional
+        One of REDUCTIONS. Defaults to "auto".
+    top_n : int, optional
+        The number of category values kept by "top_n". Defaults to VISUALIZATION_TOP_N.
+
+    Returns
+    -------
+    Dict
+        A payload of the same shape. The input is not modified.
+
+    Examples
+    --------
+    >>> small = reduce_visualization_data(result.data, max_rows=1000)
+    >>> payload_bytes(result.data), payload_bytes(small)
+    (48213077, 61540)
+    """
+    if reduction not in REDUCTIONS:
+        raise ValueError(f"reduction must be one of {REDUCTIONS}, got {reduction!r}")
+
+    rows = data.get("rows") or []
+
+    if len(rows) <= max_rows:
+        return data
+
+    names = [column["name"] for column in data["columns"]]
+    df = pd.DataFrame([row["data"] for row in rows], columns=range(len(names)), dtype=object)
+    roles = _column_roles(df)
+
+    for measure in roles["measures"]:
+        df[measure] = pd.to_numeric(df[measure])
+
+    if reduction == "auto":
+        if roles["time"] and roles["measures"]:
+            reduction = "lttb"
+        elif roles["categories"] and roles["measures"]:
+            reduction = "top_n"
+        else:
+            reduction = "sample"
+
+    if reduction in ("lttb", "minmax") and roles["time"] and roles["measures"]:
+        series = roles["categories"]
+
+        if series:
+            df = _top_n(df, series[0], roles["measures"], top_n)
+
+        df = _downsample_series(df, roles["time"][0], roles["measures"][0], series, max_rows, reduction)
+    elif reduction == "top_n" and roles["categories"] and roles["measures"]:
+        df = _top_n(df, roles["categories"][0], roles["measures"], top_n)
+
+    if len(df) > max_rows:
+        df = df.iloc[sample_indices(len(df), max_rows)]
+
+    reduced_rows = [{"data": [_json_value(value) for value in row]} for row in df.itertuples(index=False, name=None)]
+
+    return {**data, "rows": reduced_rows}
@@ -0,0 +1,312 @@
+from __future__ import annotations
+
+import itertools
+import re
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from answer_rocket.graphql.schema import GroundedValueResponse, MaxDataset
+
+DEFAULT_MIN_SCORE = 0.3
+DEFAULT_MAX_MATCHES = 5
+
+
+def _normalize(value: str) -> str:
+    return re.sub(r"\s+", " ", str(value).strip()).casefold()
+
+
+def _trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class GroundingIndex:
+    """
+    Offline fuzzy matcher for dimension values, a local stand-in for `Data.get_grounded_value`.
+
+    Every dimension value, and every alias listed in a dimension's value mappings, is broken into character
+    trigrams and stored in an inverted index (trigram -> entries). A lookup gathers the postings of the
+    query's trigrams and scores all candidates at once with numpy using trigram Jaccard similarity, so
+    grounding needs no server round trip.
+
+    Results are returned as `GroundedValueResponse` objects, the same type the server returns. A case- and
+    whitespace-insensitive exact hit is an EXACT match with quality 1.0; anything else scoring at least
+    `min_score` is a FUZZY match. When the hit is an alias from the dimension's value mappings,
+    `matched_value` is the dimension value it maps to, `mapped_indicator` is True and `mapped_value` is the
+    alias. `preferred` is left unset since it depends on server-side configuration.
+
+    Examples
+    --------
+    >>> dataset = max.data.get_dataset(dataset_id, include_dim_values=True)
+    >>> index = GroundingIndex.from_dataset(dataset)
+    >>> index.ground('coca cola', dimension_name='brand').matched_value
+    'Coca-Cola'
+    >>> index.save('brands.npz')
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, str, Optional[str]]]):
+        """
+        Parameters
+        ----------
+        entries : Iterable[Tuple[str, str, str | None]]
+            (dimension value, dimension name, alias) triples. The alias is the searchable text when given,
+            otherwise the dimension value itself is.
+        """
+        values: List[str] = []
+        dimensions: List[str] = []
+        aliases: List[str] = []
+        seen = set()
+
+        for value, dimension_name, alias in entries:
+            key = (value, dimension_name, alias or "")
+
+            if key in seen:
+                continue
+
+            seen.add(key)
+            values.append(value)
+            dimensions.append(dimension_name)
+            aliases.append(alias or "")
+
+        dimension_names = list(dict.fromkeys(dimensions))
+        dimension_ids = {name: i for i, name in enumerate(dimension_names)}
+
+        vocabulary = {}
+        entry_grams: List[List[int]] = []
+
+        for value, alias in zip(values, aliases):
+            grams = _trigrams(_normalize(alias or value))
+            entry_grams.append([vocabulary.setdefault(gram, len(vocabulary)) for gram in sorted(grams)])
+
+        gram_counts = np.fromiter((len(grams) for grams in entry_grams), dtype=np.int32, count=len(entry_grams))
+        gram_ids = np.fromiter((g for grams in entry_grams for g in grams), dtype=np.int32, count=int(gram_counts.sum()))
+        entry_ids = np.repeat(np.arange(len(values), dtype=np.int32), gram_counts)
+        order = np.argsort(gram_ids, kind="stable")
+
+        self._load(
+            values=np.array(values, dtype=str),
+            aliases=np.array(aliases, dtype=str),
+            dimension_names=np.array(dimension_names, dtype=str),
+            entry_dimensions=np.array([dimension_ids[name] for name in dimensions], dtype=np.int32),
+            entry_gram_counts=gram_counts,
+            vocabulary=np.array(sorted(vocabulary, key=vocabulary.get), dtype=str),
+            postings=entry_ids[order],
+            posting_offsets=np.concatenate(([0], np.cumsum(np.bincount(gram_ids, minlength=len(vocabulary))))).astype(np.int64),
+        )
+
+    def _load(self, values, aliases, dimension_names, entry_dimensions, entry_gram_counts, vocabulary, postings, posting_offsets):
+        self._values = values
+        self._aliases = aliases
+        self._dimension_names = dimension_names
+        self._entry_dimensions = entry_dimensions
+        self._entry_gram_counts = entry_gram_counts
+        self._vocabulary_terms = vocabulary
+        self._postings = postings
+        self._posting_offsets = posting_offsets
+
+        self._vocabulary = {gram: i for i, gram in enumerate(vocabulary.tolist())}
+        self._dimension_ids = {}
+
+        for i, name in enumerate(dimension_names.tolist()):
+            self._dimension_ids.setdefault(_normalize(name), i)
+
+        self._exact = {}
+
+        for i, (value, alias) in enumerate(zip(values.tolist(), aliases.tolist())):
+            self._exact.setdefault(_normalize(alias or value), []).append(i)
+
+    @classmethod
+    def from_dataset(cls, dataset: MaxDataset) -> GroundingIndex:
+        """
+        Build an index from a dataset fetched with `include_dim_values=True`.
+
+        Parameters
+        ----------
+        dataset : MaxDataset
+            The dataset whose dimension values and value mappings are indexed.
+
+        Returns
+        -------
+        GroundingIndex
+            The built index.
+        """
+        def domain_attributes():
+            for domain_object in getattr(dataset, "domain_objects", None) or []:
+                yield domain_object
+                yield from getattr(domain_object, "attributes", None) or []
+
+        def entries():
+            for attribute in domain_attributes():
+                dimension_values = getattr(attribute, "dimension_values", None)
+                mappings = getattr(attribute, "dimension_value_mapping_list", None)
+
+                for value in dimension_values or []:
+                    yield value, attribute.name, None
+
+                for mapping in mappings or []:
+                    yield mapping.value, attribute.name, None
+
+                    for alias in mapping.mapped_values or []:
+                        yield mapping.value, attribute.name, alias
+
+        return cls(entries())
+
+    @classmethod
+    def load(cls, path) -> GroundingIndex:
+        """
+        Load an index written by `save`.
+
+        Parameters
+        ----------
+        path : str | os.PathLike
+            The .npz file to read.
+
+        Returns
+        -------
+        GroundingIndex
+            The loaded index.
+        """
+        index = cls.__new__(cls)
+
+        with np.load(path, allow_pickle=False) as arrays:
+            index._load(**{name: arrays[name] for name in arrays.files})
+
+        return index
+
+    def save(self, path):
+        """
+        Write the index to a compressed numpy archive so it can be reloaded without rebuilding.
+
+        Parameters
+        ----------
+        path : str | os.PathLike
+            The .npz file to write.
+        """
+        np.savez_compressed(
+            path,
+            values=self._values,
+            aliases=self._aliases,
+            dimension_names=self._dimension_names,
+            entry_dimensions=self._entry_dimensions,
+            entry_gram_counts=self._entry_gram_counts,
+            vocabulary=self._vocabulary_terms,
+            postings=self._postings,
+            posting_offsets=self._posting_offsets,
+        )
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    @property
+    def dimension_names(self) -> List[str]:
+        """The names of the indexed dimensions."""
+        return self._dimension_names.tolist()
+
+    def ground(self, value: str, dimension_name: Optional[str] = None, min_score: float = DEFAULT_MIN_SCORE,
+               max_matches: int = DEFAULT_MAX_MATCHES) -> GroundedValueResponse:
+        """
+        Ground a value against the indexed dimension values.
+
+        Parameters
+        ----------
+        value : str
+            The value to ground.
+        dimension_name : str, optional
+            The dimension to search within, or None to search all. Defaults to None.
+        min_score : float, optional
+            The lowest trigram similarity (0 to 1) accepted as a fuzzy match. Defaults to DEFAULT_MIN_SCORE.
+        max_matches : int, optional
+            The maximum number of alternatives returned in `other_matches`. Defaults to DEFAULT_MAX_MATCHES.
+
+        Returns
+        -------
+        GroundedValueResponse
+            The best match and its alternatives. `matched_value` is None when nothing scores at least
+            `min_score` or the dimension is not indexed.
+        """
+        dimension_id = None
+
+        if dimension_name is not None:
+            dimension_id = self._dimension_ids.get(_normalize(dimension_name))
+
+            if dimension_id is None:
+                return GroundedValueResponse({"matchedValue": None, "otherMatches": []})
+
+        text = _normalize(value)
+        exact = [i for i in self._exact.get(text, []) if dimension_id is None or self._entry_dimensions[i] == dimension_id]
+        candidates, scores = self._score(text, dimension_id, min_score)
+
+        ranked = itertools.chain(
+            ((i, 1.0, "EXACT") for i in exact),
+            ((i, s, "FUZZY") for i, s in zip(candidates.tolist(), scores.tolist())),
+        )
+
+        matches = []
+        seen = set()
+
+        for entry, score, match_type in ranked:
+            key = (self._values[entry], self._entry_dimensions[entry])
+
+            if key in seen:
+                continue
+
+            seen.add(key)
+            matches.append(self._match(entry, score, match_type))
+
+            if len(matches) > max_matches:
+                break
+
+        if not matches:
+            return GroundedValueResponse({"matchedValue": None, "otherMatches": []})
+
+        best = matches[0]
+
+        return GroundedValueResponse({
+            "matchedValue": best["value"],
+            "matchQuality": best["score"],
+            "matchType": best["matchType"],
+            "mappedIndicator": best["mappedValue"] is not None,
+            "mappedValue": best["mappedValue"],
+            "dimensionName": best["dimensionName"],
+            "otherMatches": matches[1:],
+        })
+
+    def ground_many(self, values: Iterable[str], dimension_name: Optional[str] = None,
+                    min_score: float = DEFAULT_MIN_SCORE, max_matches: int = DEFAULT_MAX_MATCHES) -> List[GroundedValueResponse]:
+        """
+        Ground several values, returning one response per value in input order. See `ground`.
+        """
+        return [self.ground(value, dimension_name, min_score, max_matches) for value in values]
+
+    def _score(self, text: str, dimension_id: Optional[int], min_score: float) -> Tuple[np.ndarray, np.ndarray]:
+        grams = _trigrams(text)
+        gram_ids = [self._vocabulary[gram] for gram in grams if gram in self._vocabulary]
+
+        if not gram_ids:
+            return np.empty(0, dtype=np.int32), np.empty(0)
+
+        offsets = self._posting_offsets
+        postings = np.concatenate([self._postings[offsets[g]:offsets[g + 1]] for g in gram_ids])
+        candidates, shared = np.unique(postings, return_counts=True)
+        scores = shared / (len(grams) + self._entry_gram_counts[candidates] - shared)
+        keep = scores >= min_score
+
+        if dimension_id is not None:
+            keep &= self._entry_dimensions[candidates] == dimension_id
+
+        candidates, scores = candidates[keep], scores[keep]
+        order = np.lexsort((candidates, -scores))
+
+        return candidates[order], scores[order]
+
+    def _match(self, entry: int, score: float, match_type: str) -> dict:
+        alias = str(self._aliases[entry])
+
+        return {
+            "value": str(self._values[entry]),
+            "score": round(score, 4),
+            "matchType": match_type,
+            "dimensionName": str(self._dimension_names[self._entry_dimensions[entry]]),
+            "mappedValue": alias or None,
+        }
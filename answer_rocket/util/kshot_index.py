@@ -0,0 +1,352 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+EMBEDDING_BATCH_SIZE = 64
+DUPLICATE_BLOCK_SIZE = 1024
+
+EmbedTexts = Callable[[List[str]], Sequence[Sequence[float]]]
+
+
+def _kshot_key(kshot) -> Tuple[str, str]:
+    if isinstance(kshot, dict):
+        kshot_id = kshot.get("datasetKShotId") or kshot.get("databaseKShotId") or kshot.get("id")
+        question = kshot.get("question")
+    else:
+        kshot_id = getattr(kshot, "dataset_kshot_id", None) or getattr(kshot, "database_kshot_id", None)
+        question = getattr(kshot, "question", None)
+
+    return str(kshot_id), question or ""
+
+
+class KShotIndex:
+    """
+    Local similarity index over k-shot questions.
+
+    Questions are embedded in batches with an embedding function (usually `Llm.generate_embeddings`, see
+    `using_llm`) and stored as a matrix of unit-length float32 or float16 vectors, so cosine similarity is a
+    single matrix product. Updates are incremental: only k-shots that are new or whose question changed are
+    embedded again. The index can be saved to a directory and memory-mapped back in.
+
+    Examples
+    --------
+    >>> index = KShotIndex.using_llm(max.llm)
+    >>> index.sync(max.data.iter_dataset_kshots(dataset_id))
+    >>> index.query("sales by region last quarter", k=3)
+    [('4f0c...', 'Total sales by region', 0.91), ...]
+    >>> index.near_duplicates(threshold=0.97)
+    """
+
+    def __init__(self, embed_texts: Optional[EmbedTexts] = None, dtype=np.float32, batch_size: int = EMBEDDING_BATCH_SIZE):
+        """
+        Parameters
+        ----------
+        embed_texts : Callable[[List[str]], Sequence[Sequence[float]]], optional
+            Returns one vector per text, in order. Needed to add k-shots or query by text; a loaded index can
+            be queried by vector without it.
+        dtype : numpy dtype, optional
+            The storage type of the vectors, np.float32 or np.float16. Defaults to np.float32.
+        batch_size : int, optional
+            The number of texts embedded per call. Defaults to EMBEDDING_BATCH_SIZE.
+        """
+        self._embed_texts = embed_texts
+        self.dtype = np.dtype(dtype)
+        self.batch_size = max(1, batch_size)
+
+        self._ids: List[str] = []
+        self._questions: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._vectors: Optional[np.ndarray] = None
+
+    @classmethod
+    def using_llm(cls, llm, model_override: Optional[str] = None, **kwargs) -> KShotIndex:
+        """
+        Create an index that embeds with `Llm.generate_embeddings`.
+
+        Parameters
+        ----------
+        llm : Llm
+            The client's llm helper, e.g. `max.llm`.
+        model_override : str, optional
+            The embedding model to use instead of the configured default.
+        **kwargs
+            Passed to the constructor.
+
+        Returns
+        -------
+        KShotIndex
+            An empty index.
+        """
+        def embed_texts(texts: List[str]) -> List[List[float]]:
+            response = llm.generate_embeddings(texts, model_override)
+
+            if not response.success:
+                raise Exception(response.error or "generate_embeddings failed")
+
+            vectors = {embedding.text: embedding.vector for embedding in response.embeddings or []}
+
+            return [vectors[text] for text in texts]
+
+        return cls(embed_texts, **kwargs)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, kshot_id) -> bool:
+        return str(kshot_id) in self._rows
+
+    @property
+    def ids(self) -> List[str]:
+        """The ids of the indexed k-shots, in row order."""
+        return list(self._ids)
+
+    def update(self, kshots: Iterable) -> int:
+        """
+        Add new k-shots and re-embed those whose question changed.
+
+        Parameters
+        ----------
+        kshots : Iterable
+            `DatasetKShot` / `DatabaseKShot` objects or their json dictionaries.
+
+        Returns
+        -------
+        int
+            The number of k-shots embedded.
+        """
+        pending: Dict[str, str] = {}
+
+        for kshot in kshots:
+            kshot_id, question = _kshot_key(kshot)
+            row = self._rows.get(kshot_id)
+
+            if row is None or self._questions[row] != question:
+                pending[kshot_id] = question
+
+        if not pending:
+            return 0
+
+        texts = list(dict.fromkeys(pending.values()))
+        vectors = self._normalize(self._embed(texts))
+        vector_by_text = dict(zip(texts, vectors))
+
+        matrix = self._writable_vectors(vectors.shape[1])
+        new_ids = [kshot_id for kshot_id in pending if kshot_id not in self._rows]
+
+        for kshot_id, question in pending.items():
+            row = self._rows.get(kshot_id)
+
+            if row is not None:
+                matrix[row] = vector_by_text[question]
+                self._questions[row] = question
+
+        if new_ids:
+            appended = np.stack([vector_by_text[pending[kshot_id]] for kshot_id in new_ids]).astype(self.dtype)
+            matrix = np.concatenate([matrix, appended]) if len(matrix) else appended
+
+            for kshot_id in new_ids:
+                self._rows[kshot_id] = len(self._ids)
+                self._ids.append(kshot_id)
+                self._questions.append(pending[kshot_id])
+
+        self._vectors = matrix
+
+        return len(pending)
+
+    def remove(self, kshot_ids: Iterable) -> int:
+        """
+        Remove k-shots from the index.
+
+        Parameters
+        ----------
+        kshot_ids : Iterable
+            The ids of the k-shots to remove. Unknown ids are ignored.
+
+        Returns
+        -------
+        int
+            The number of k-shots removed.
+        """
+        drop = {self._rows[str(kshot_id)] for kshot_id in kshot_ids if str(kshot_id) in self._rows}
+
+        if not drop:
+            return 0
+
+        keep = np.ones(len(self._ids), dtype=bool)
+        keep[list(drop)] = False
+
+        self._vectors = self._vectors[keep]
+        self._ids = [kshot_id for row, kshot_id in enumerate(self._ids) if keep[row]]
+        self._questions = [question for row, question in enumerate(self._questions) if keep[row]]
+        self._rows = {kshot_id: row for row, kshot_id in enumerate(self._ids)}
+
+        return len(drop)
+
+    def sync(self, kshots: Iterable) -> Tuple[int, int]:
+        """
+        Make the index mirror a full set of k-shots: embed new and changed ones and drop those no longer present.
+
+        Parameters
+        ----------
+        kshots : Iterable
+            Every current k-shot, e.g. `Data.iter_dataset_kshots(dataset_id)`.
+
+        Returns
+        -------
+        Tuple[int, int]
+            The number of k-shots embedded and removed.
+        """
+        kshots = list(kshots)
+        current_ids = {_kshot_key(kshot)[0] for kshot in kshots}
+        removed = self.remove([kshot_id for kshot_id in self._ids if kshot_id not in current_ids])
+
+        return self.update(kshots), removed
+
+    def query(self, question: str, k: int = 5) -> List[Tuple[str, str, float]]:
+        """
+        Find the k-shots whose questions are most similar to a question.
+
+        Parameters
+        ----------
+        question : str
+            The question to compare against.
+        k : int, optional
+            The number of results. Defaults to 5.
+
+        Returns
+        -------
+        List[Tuple[str, str, float]]
+            (k-shot id, question, cosine similarity) tuples, most similar first.
+        """
+        return self.query_vector(self._embed([question])[0], k)
+
+    def query_vector(self, vector: Sequence[float], k: int = 5) -> List[Tuple[str, str, float]]:
+        """
+        Find the k-shots most similar to an embedding vector. See `query`.
+        """
+        if not self._ids or k <= 0:
+            return []
+
+        query = self._normalize(np.asarray([vector], dtype=np.float32))[0]
+        scores = self._vectors.astype(np.float32, copy=False) @ query
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        return [(self._ids[row], self._questions[row], float(scores[row])) for row in top]
+
+    def near_duplicates(self, threshold: float = 0.95) -> List[Tuple[str, str, float]]:
+        """
+        Find pairs of k-shots whose questions are at least `threshold` similar.
+
+        Similarities are computed in blocks of DUPLICATE_BLOCK_SIZE rows so memory stays bounded for large indexes.
+
+        Parameters
+        ----------
+        threshold : float, optional
+            The minimum cosine similarity of a reported pair. Defaults to 0.95.
+
+        Returns
+        -------
+        List[Tuple[str, str, float]]
+            (k-shot id, k-shot id, cosine similarity) tuples, most similar first.
+        """
+        if len(self._ids) < 2:
+            return []
+
+        vectors = self._vectors.astype(np.float32, copy=False)
+        pairs = []
+
+        for start in range(0, len(vectors), DUPLICATE_BLOCK_SIZE):
+            block = vectors[start:start + DUPLICATE_BLOCK_SIZE] @ vectors.T
+            rows, columns = np.nonzero(block >= threshold)
+
+            for row, column in zip(rows.tolist(), columns.tolist()):
+                if start + row < column:
+                    pairs.append((self._ids[start + row], self._ids[column], float(block[row, column])))
+
+        pairs.sort(key=lambda pair: -pair[2])
+
+        return pairs
+
+    def save(self, path):
+        """
+        Save the index to a directory as vectors.npy and index.json.
+
+        Parameters
+        ----------
+        path : str | os.PathLike
+            The directory to write; it is created if needed.
+        """
+        os.makedirs(path, exist_ok=True)
+
+        vectors = self._vectors if self._vectors is not None else np.empty((0, 0), dtype=self.dtype)
+        np.save(os.path.join(path, "vectors.npy"), vectors)
+
+        with open(os.path.join(path, "index.json"), "w", encoding="utf-8") as f:
+            json.dump({"dtype": self.dtype.name, "ids": self._ids, "questions": self._questions}, f)
+
+    @classmethod
+    def load(cls, path, embed_texts: Optional[EmbedTexts] = None, mmap: bool = True, **kwargs) -> KShotIndex:
+        """
+        Load an index written by `save`.
+
+        Parameters
+        ----------
+        path : str | os.PathLike
+            The directory to read.
+        embed_texts : Callable[[List[str]], Sequence[Sequence[float]]], optional
+            The embedding function, needed to update the index or query by text.
+        mmap : bool, optional
+            Whether to memory-map the vectors instead of reading them into memory. The first update copies
+            them into memory. Defaults to True.
+        **kwargs
+            Passed to the constructor.
+
+        Returns
+        -------
+        KShotIndex
+            The loaded index.
+        """
+        with open(os.path.join(path, "index.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+
+        index = cls(embed_texts, dtype=meta["dtype"], **kwargs)
+        index._ids = meta["ids"]
+        index._questions = meta["questions"]
+        index._rows = {kshot_id: row for row, kshot_id in enumerate(index._ids)}
+
+        if index._ids:
+            index._vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r" if mmap else None)
+
+        return index
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        if self._embed_texts is None:
+            raise Exception("This index has no embedding function; pass embed_texts to embed new text")
+
+        vectors = []
+
+        for start in range(0, len(texts), self.batch_size):
+            vectors.extend(self._embed_texts(texts[start:start + self.batch_size]))
+
+        return np.asarray(vectors, dtype=np.float32)
+
+    def _normalize(self, vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+
+        return vectors / norms
+
+    def _writable_vectors(self, dimensions: int) -> np.ndarray:
+        if self._vectors is None:
+            return np.empty((0, dimensions), dtype=self.dtype)
+
+        if not self._vectors.flags.writeable:
+            return np.array(self._vectors)
+
+        return self._vectors
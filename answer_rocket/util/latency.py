@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_PERCENTILES = (50, 90, 99)
+
+_NAME_KEYS = ("name", "stage", "step", "label", "key")
+_DURATION_KEYS = ("duration", "elapsed", "time", "seconds", "ms", "duration_ms", "elapsed_ms", "value")
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and not np.isnan(value)
+
+
+def flatten_timings(timings: Any, prefix: str = "") -> List[tuple]:
+    """
+    Flatten a timing dictionary into (stage, value) pairs.
+
+    Nested dictionaries become dotted stage names ('llm.total'). Lists of entries that carry a name and a
+    duration (e.g. {'name': 'llm', 'duration': 1.2}) are keyed by that name; other list items by position.
+    Non-numeric values are skipped.
+    """
+    if _is_number(timings):
+        return [(prefix or "value", float(timings))]
+
+    pairs = []
+
+    if isinstance(timings, dict):
+        for key, value in timings.items():
+            pairs.extend(flatten_timings(value, f"{prefix}.{key}" if prefix else str(key)))
+    elif isinstance(timings, (list, tuple)):
+        for position, item in enumerate(timings):
+            name = next((item[key] for key in _NAME_KEYS if isinstance(item, dict) and isinstance(item.get(key), str)), None)
+            duration = next((item[key] for key in _DURATION_KEYS if isinstance(item, dict) and _is_number(item.get(key))), None)
+            stage = f"{prefix}.{name or position}" if prefix else str(name or position)
+
+            if name is not None and duration is not None:
+                pairs.append((stage, float(duration)))
+            else:
+                pairs.extend(flatten_timings(item, stage))
+
+    return pairs
+
+
+class LatencyReport:
+    """
+    Collects `timing_info` from `run_sql_ai` results and `chat_pipeline_profile` from chat entries into one
+    per-stage table, and summarizes it as percentiles per stage and model.
+
+    The timing payloads are not typed by the API, so they are flattened generically: every numeric leaf is a
+    stage, named by its path. Values are kept in the units the server reports.
+
+    Examples
+    --------
+    >>> report = LatencyReport()
+    >>> for question in questions:
+    ...     report.add_result(max.data.run_sql_ai(dataset_id, question, model_override="gpt-4o"), model="gpt-4o")
+    >>> report.summary()
+                          count   mean    p50    p90    p99
+    model  stage
+    gpt-4o llm.total         50  2.310  2.104  3.870  5.012
+           prompt_render     50  0.120  0.115  0.160  0.201
+    """
+
+    def __init__(self):
+        self._records: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._runs = 0
+
+    def __len__(self) -> int:
+        return self._runs
+
+    def add(self, timings: Any, model: Optional[str] = None, **labels) -> int:
+        """
+        Add one timing payload.
+
+        Parameters
+        ----------
+        timings : Any
+            A `timing_info` or `chat_pipeline_profile` value.
+        model : str, optional
+            The model the run used. Defaults to None.
+        **labels
+            Extra columns recorded with each stage, e.g. question=... or source=....
+
+        Returns
+        -------
+        int
+            The number of stages recorded.
+        """
+        pairs = flatten_timings(timings or {})
+
+        with self._lock:
+            run = self._runs
+            self._runs += 1
+            self._records.extend({"run": run, "model": model, **labels, "stage": stage, "value": value}
+                                 for stage, value in pairs)
+
+        return len(pairs)
+
+    def add_result(self, result, model: Optional[str] = None, include_prior_runs: bool = True, **labels) -> int:
+        """
+        Add the `timing_info` of a `RunSqlAiResult`, and of its prior runs with an `attempt` label.
+        """
+        attempts = [result] + (list(getattr(result, "prior_runs", None) or []) if include_prior_runs else [])
+        count = 0
+
+        for attempt, run in enumerate(attempts):
+            if getattr(run, "timing_info", None):
+                count += self.add(run.timing_info, model=model, source="run_sql_ai", attempt=attempt, **labels)
+
+        return count
+
+    def add_chat_entry(self, entry, model: Optional[str] = None, **labels) -> int:
+        """
+        Add the `answer.chat_pipeline_profile` of a `MaxChatEntry`. Entries without an answer add nothing.
+        """
+        profile = getattr(getattr(entry, "answer", None), "chat_pipeline_profile", None)
+
+        if not profile:
+            return 0
+
+        return self.add(profile, model=model, source="chat", entry_id=str(getattr(entry, "id", "") or ""), **labels)
+
+    def add_batch(self, results: pd.DataFrame) -> int:
+        """
+        Add the runs of a `Data.run_sql_ai_batch` result, labelled with their model override and question.
+        """
+        count = 0
+
+        for row in results.itertuples(index=False):
+            count += self.add(getattr(row, "timing_info", None), model=row.model_override, source="run_sql_ai",
+                              question=row.question)
+
+        return count
+
+    def frame(self) -> pd.DataFrame:
+        """
+        Return every recorded stage as one row: run, model, any labels, stage and value.
+        """
+        with self._lock:
+            records = list(self._records)
+
+        if not records:
+            return pd.DataFrame(columns=["run", "model", "stage", "value"])
+
+        return pd.DataFrame(records)
+
+    def summary(self, by: Sequence[str] = ("model", "stage"), percentiles: Iterable[float] = DEFAULT_PERCENTILES) -> pd.DataFrame:
+        """
+        Summarize stage timings as count, mean and percentiles per group.
+
+        Parameters
+        ----------
+        by : Sequence[str], optional
+            The columns to group by. Defaults to ("model", "stage").
+        percentiles : Iterable[float], optional
+            The percentiles to compute, 0-100. Defaults to DEFAULT_PERCENTILES.
+
+        Returns
+        -------
+        pd.DataFrame
+            Indexed by `by`, with count, mean and a p<N> column per percentile. Within each model the slowest
+            stages by the first percentile come first.
+        """
+        frame = self.frame()
+        by = list(by)
+        percentiles = list(percentiles)
+        columns = ["count", "mean"] + [f"p{p:g}" for p in percentiles]
+
+        if frame.empty:
+            return pd.DataFrame(columns=columns)
+
+        grouped = frame.groupby(by, dropna=False)["value"]
+        summary = grouped.agg(["count", "mean"])
+
+        for p in percentiles:
+            summary[f"p{p:g}"] = grouped.quantile(p / 100)
+
+        order_key = [name for name in by if name != "stage"]
+        summary = summary.reset_index()
+        summary = summary.sort_values(order_key + [f"p{percentiles[0]:g}" if percentiles else "mean"],
+                                      ascending=[True] * len(order_key) + [False], kind="stable")
+
+        return summary.set_index(by)[columns]
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterator
+
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_PREFETCH_PAGES = 4
+
+
+def iter_paged_rows(fetch_page: Callable[[int, int], Any], page_size: int = DEFAULT_PAGE_SIZE,
+                    prefetch_pages: int = DEFAULT_PREFETCH_PAGES) -> Iterator[Any]:
+    """
+    Yield every row of a paged query, fetching upcoming pages in the background.
+
+    The first page is fetched up front. If it reports `total_rows`, the remaining pages are known and up to
+    `prefetch_pages` of them are fetched in parallel while the caller consumes the current one. Otherwise
+    pages are read one ahead until a short or empty page is returned.
+
+    Parameters
+    ----------
+    fetch_page : Callable[[int, int], Any]
+        Called with (page_num, page_size), 1-based, and returns an object with `rows` and optionally
+        `total_rows`, such as `PagedDatabases`.
+    page_size : int, optional
+        The number of rows requested per page. Defaults to DEFAULT_PAGE_SIZE.
+    prefetch_pages : int, optional
+        The maximum number of pages fetched ahead of the consumer. Defaults to DEFAULT_PREFETCH_PAGES.
+
+    Yields
+    ------
+    Any
+        The rows of each page, in page order.
+    """
+    page_size = max(1, page_size)
+    first_page = fetch_page(1, page_size)
+    rows = getattr(first_page, "rows", None) or []
+    total_rows = getattr(first_page, "total_rows", None)
+
+    if total_rows is not None:
+        last_page = max(1, -(-total_rows // page_size))
+        window = max(1, prefetch_pages)
+    else:
+        last_page = None
+        window = 1
+
+    if last_page == 1 or (last_page is None and len(rows) < page_size):
+        yield from rows
+        return
+
+    executor = ThreadPoolExecutor(max_workers=window)
+    pending = deque()
+    next_page = 2
+
+    def schedule():
+        nonlocal next_page
+
+        while len(pending) < window and (last_page is None or next_page <= last_page):
+            pending.append(executor.submit(fetch_page, next_page, page_size))
+            next_page += 1
+
+    try:
+        schedule()
+        yield from rows
+
+        while pending:
+            page = pending.popleft().result()
+            rows = getattr(page, "rows", None) or []
+
+            if last_page is None and len(rows) < page_size:
+                yield from rows
+                return
+
+            schedule()
+            yield from rows
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
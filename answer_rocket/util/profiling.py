@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from typing import Dict, List, NamedTuple, Optional
+
+import pandas as pd
+
+PROFILE_TOP_K = 5
+
+
+class ProfileDialect(NamedTuple):
+    quote: str
+    distinct: str
+    to_string: str
+
+
+# Matched against the database's dbms name; anything else gets ANSI quoting and an exact distinct count.
+_DIALECTS = {
+    "snowflake": ProfileDialect('"{}"', "approx_count_distinct({})", "cast({} as varchar)"),
+    "bigquery": ProfileDialect("`{}`", "approx_count_distinct({})", "cast({} as string)"),
+    "databricks": ProfileDialect("`{}`", "approx_count_distinct({})", "cast({} as string)"),
+    "redshift": ProfileDialect('"{}"', "approximate count(distinct {})", "cast({} as varchar)"),
+    "sqlserver": ProfileDialect('"{}"', "approx_count_distinct({})", "cast({} as nvarchar(max))"),
+    "mssql": ProfileDialect('"{}"', "approx_count_distinct({})", "cast({} as nvarchar(max))"),
+    "mysql": ProfileDialect("`{}`", "count(distinct {})", "cast({} as char)"),
+}
+_DEFAULT_DIALECT = ProfileDialect('"{}"', "count(distinct {})", "cast({} as varchar)")
+
+
+def profile_dialect(dbms: Optional[str]) -> ProfileDialect:
+    """
+    Return the SQL fragments used to profile a table in a database of the given dbms.
+    """
+    name = (dbms or "").lower().replace(" ", "").replace("_", "")
+
+    for key, dialect in _DIALECTS.items():
+        if key in name:
+            return dialect
+
+    return _DEFAULT_DIALECT
+
+
+def _quote(dialect: ProfileDialect, column: str) -> str:
+    closing = dialect.quote[-1]
+
+    return dialect.quote.format(column.replace(closing, closing * 2))
+
+
+def profile_stats_sql(table_name: str, columns: List[str], dialect: ProfileDialect, min_max_as_string: bool = False) -> str:
+    """
+    Build one aggregate query returning the row count and, per column, the non-null count, distinct count and min/max.
+
+    With `min_max_as_string`, min/max compare the values cast to strings, which works for types that have no
+    ordering of their own (boolean, json or uuid on Postgres) at the price of ordering numbers as text.
+    """
+    selections = ["count(*) as row_count"]
+
+    for i, column in enumerate(columns):
+        quoted = _quote(dialect, column)
+        ordered = dialect.to_string.format(quoted) if min_max_as_string else quoted
+        selections += [
+            f"count({quoted}) as c{i}_non_null",
+            f"{dialect.distinct.format(quoted)} as c{i}_distinct",
+            f"min({ordered}) as c{i}_min",
+            f"max({ordered}) as c{i}_max",
+        ]
+
+    return f"select {', '.join(selections)} from {table_name}"
+
+
+def profile_top_values_sql(table_name: str, columns: List[str], top_k: int, dialect: ProfileDialect) -> str:
+    """
+    Build one query returning the `top_k` most frequent non-null values of each column, as (column_index, value, count) rows.
+
+    It is a union of one GROUP BY per column, so the database scans the table once per column.
+    """
+    counts = " union all ".join(
+        f"select {i} as column_index, {dialect.to_string.format(_quote(dialect, column))} as value, count(*) as value_count "
+        f"from {table_name} where {_quote(dialect, column)} is not null group by {_quote(dialect, column)}"
+        for i, column in enumerate(columns)
+    )
+
+    return (
+        "select column_index, value, value_count from ("
+        "select column_index, value, value_count, "
+        "row_number() over (partition by column_index order by value_count desc) as value_rank "
+        f"from ({counts}) value_counts) ranked_values where value_rank <= {int(top_k)} "
+        "order by column_index, value_count desc"
+    )
+
+
+def build_profile(columns: List[str], stats: pd.DataFrame, top_values: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Turn the results of the profile queries into one row per column.
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns: column, rows, nulls, null_fraction, distinct, min, max and top_values, a list of (value, count)
+        tuples, most frequent first.
+    """
+    stats = stats.rename(columns=str.lower)
+    row = stats.iloc[0] if len(stats) else pd.Series(dtype=object)
+    row_count = int(row.get("row_count", 0) or 0)
+    top: Dict[int, list] = {}
+
+    if top_values is not None:
+        top_values = top_values.rename(columns=str.lower)
+
+        for index, value, count in top_values[["column_index", "value", "value_count"]].itertuples(index=False):
+            top.setdefault(int(index), []).append((value, int(count)))
+
+    profile = []
+
+    for i, column in enumerate(columns):
+        non_null = int(row.get(f"c{i}_non_null", 0) or 0)
+        profile.append({
+            "column": column,
+            "rows": row_count,
+            "nulls": row_count - non_null,
+            "null_fraction": (row_count - non_null) / row_count if row_count else 0.0,
+            "distinct": row.get(f"c{i}_distinct"),
+            "min": row.get(f"c{i}_min"),
+            "max": row.get(f"c{i}_max"),
+            "top_values": top.get(i, []),
+        })
+
+    return pd.DataFrame(profile, columns=["column", "rows", "nulls", "null_fraction", "distinct", "min", "max", "top_values"])
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+
+def _is_parquet(path) -> bool:
+    return os.fspath(path).lower().endswith(".parquet")
+
+
+def _clean_value(value):
+    if isinstance(value, float) and math.isnan(value):
+        return None
+
+    return value
+
+
+def read_records(source, json_columns: Iterable[str] = ()) -> List[Dict[str, Any]]:
+    """
+    Read a list of records from a JSONL or Parquet file, a DataFrame, or an iterable of dictionaries.
+
+    Parameters
+    ----------
+    source : str | os.PathLike | pd.DataFrame | Iterable[Dict]
+        A path ending in .parquet is read with `pandas.read_parquet` (which needs pyarrow or fastparquet);
+        any other path is read as JSON lines.
+    json_columns : Iterable[str], optional
+        Columns holding JSON objects. For Parquet files and DataFrames (such as one read from Parquet), string
+        values in these columns are parsed, which undoes the encoding `write_records` applies when writing
+        Parquet. JSON lines and dictionaries hold the values as they are, so nothing is parsed.
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+        The records, with missing values as None.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        if _is_parquet(source):
+            source = pd.read_parquet(source)
+        else:
+            with open(source, encoding="utf-8") as f:
+                source = [json.loads(line) for line in f if line.strip()]
+
+    # only columnar sources hold the JSON strings write_records encodes; elsewhere a string is a real value
+    json_columns = tuple(json_columns) if isinstance(source, pd.DataFrame) else ()
+
+    if isinstance(source, pd.DataFrame):
+        source = source.to_dict("records")
+
+    records = []
+
+    for record in source:
+        record = {key: _clean_value(value) for key, value in dict(record).items()}
+
+        for column in json_columns:
+            if isinstance(record.get(column), str):
+                record[column] = json.loads(record[column])
+
+        records.append(record)
+
+    return records
+
+
+def drop_partial_line(path) -> None:
+    """
+    Truncate a JSON lines file after its last complete line.
+
+    A process killed while appending a record can leave a final line without its newline, which is not valid
+    JSON; dropping it lets the file be read and appended to again.
+    """
+    with open(path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        keep = 0
+
+        while position > 0:
+            start = max(0, position - 65536)
+            f.seek(start)
+            newline = f.read(position - start).rfind(b"\n")
+
+            if newline != -1:
+                keep = start + newline + 1
+                break
+
+            position = start
+
+        if keep < end:
+            f.truncate(keep)
+
+
+def write_records(records: Iterable[Dict[str, Any]], path, json_columns: Iterable[str] = (),
+                  columns: Optional[Iterable[str]] = None) -> int:
+    """
+    Write records to a JSONL or Parquet file.
+
+    JSON lines are written as the records arrive, so exporting from a paged iterator streams to disk. Parquet
+    output is columnar and is written once all records are read; values in `json_columns` are stored as JSON
+    strings so nested objects with varying keys survive the round trip.
+
+    Parameters
+    ----------
+    records : Iterable[Dict[str, Any]]
+        The records to write.
+    path : str | os.PathLike
+        The file to write. A path ending in .parquet is written with `DataFrame.to_parquet`; any other path is
+        written as JSON lines.
+    json_columns : Iterable[str], optional
+        Columns holding JSON objects, encoded as strings in Parquet output.
+    columns : Iterable[str], optional
+        The exact columns of Parquet output, each stored as a nullable string column whether or not any record
+        has a value for it. Use it when several files are read back as one table, so that every file has the same
+        schema. Defaults to None, which infers the columns and their types from the records.
+
+    Returns
+    -------
+    int
+        The number of records written.
+    """
+    if _is_parquet(path):
+        rows = []
+
+        for record in records:
+            record = dict(record)
+
+            for column in json_columns:
+                if record.get(column) is not None:
+                    record[column] = json.dumps(record[column])
+
+            rows.append(record)
+
+        if columns is not None:
+            frame = pd.DataFrame(rows, columns=list(columns)).astype("string")
+        else:
+            frame = pd.DataFrame(rows)
+
+        frame.to_parquet(path, index=False)
+
+        return len(rows)
+
+    count = 0
+
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, default=str))
+            f.write("\n")
+            count += 1
+
+    return count
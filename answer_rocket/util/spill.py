@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+SPILL_CHUNK_SIZE = 100_000
+
+_META_FILE = "result.json"
+
+
+def _column_kind(rows: Sequence, index: int) -> str:
+    kinds = set()
+    has_null = False
+
+    for row in rows:
+        value = row[index]
+
+        if value is None:
+            has_null = True
+        elif isinstance(value, bool):
+            kinds.add("bool")
+        elif isinstance(value, int):
+            kinds.add("int")
+        elif isinstance(value, float):
+            kinds.add("float")
+        else:
+            return "category"
+
+    if kinds == {"bool"}:
+        return "category" if has_null else "bool"
+    if "bool" in kinds:
+        return "category"
+    if kinds == {"int"} and not has_null:
+        return "int"
+
+    return "float"
+
+
+def _unique_names(columns: Sequence[str]) -> List[str]:
+    # duplicate names (e.g. two count columns from a join) are suffixed as pandas.read_csv does: count, count.1
+    names = []
+    seen = set()
+
+    for name in columns:
+        unique = name
+        suffix = 1
+
+        while unique in seen:
+            unique = f"{name}.{suffix}"
+            suffix += 1
+
+        seen.add(unique)
+        names.append(unique)
+
+    return names
+
+
+def _category_value(value) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+
+    return str(value)
+
+
+class SpilledResult:
+    """
+    A query result stored on local disk as one memory-mapped .npy file per column.
+
+    Numeric and boolean columns are stored as-is; every other column is dictionary-encoded as int32 codes
+    (-1 for null) plus its distinct values. Reads map the files instead of loading them, so a result larger than
+    memory can be sliced by column or walked in chunks.
+
+    Examples
+    --------
+    >>> result = max.data.execute_sql_query(database_id, sql, spill_path="/tmp/export")
+    >>> for chunk in result.spilled.iter_chunks(250_000):
+    ...     process(chunk)
+    >>> result.spilled.column("revenue").sum()
+    """
+
+    def __init__(self, path, columns: List[Dict[str, Any]], row_count: int):
+        self.path = os.fspath(path)
+        self._columns = columns
+        self._row_count = row_count
+        self._arrays: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def write(cls, columns: List[str], rows: Sequence[Sequence], path, chunk_size: int = SPILL_CHUNK_SIZE) -> SpilledResult:
+        """
+        Write rows to a new spill directory, one column at a time.
+
+        Parameters
+        ----------
+        columns : List[str]
+            The column names. Repeated names are made unique with a numeric suffix ('count', 'count.1') so every
+            column can be read by name.
+        rows : Sequence[Sequence]
+            The rows, each a sequence of values in column order.
+        path : str | os.PathLike
+            The directory to write. It is created if needed; files from an earlier result are replaced.
+        chunk_size : int, optional
+            The number of rows copied into a column file at a time. Defaults to SPILL_CHUNK_SIZE.
+
+        Returns
+        -------
+        SpilledResult
+            A handle on the written result.
+        """
+        os.makedirs(path, exist_ok=True)
+        chunk_size = max(1, chunk_size)
+        meta = []
+
+        for index, name in enumerate(_unique_names(columns)):
+            kind = _column_kind(rows, index)
+            file_name = f"column_{index}.npy"
+            entry = {"name": name, "kind": kind, "file": file_name}
+
+            if kind == "category":
+                lookup: Dict[str, int] = {}
+                dtype = np.int32
+            else:
+                dtype = {"bool": np.bool_, "int": np.int64, "float": np.float64}[kind]
+
+            array = np.lib.format.open_memmap(os.path.join(path, file_name), mode="w+", dtype=dtype, shape=(len(rows),))
+
+            for start in range(0, len(rows), chunk_size):
+                chunk = rows[start:start + chunk_size]
+
+                if kind == "category":
+                    values = [_category_value(row[index]) for row in chunk]
+                    array[start:start + len(chunk)] = [
+                        -1 if value is None else lookup.setdefault(value, len(lookup)) for value in values
+                    ]
+                else:
+                    array[start:start + len(chunk)] = [np.nan if row[index] is None else row[index] for row in chunk]
+
+            array.flush()
+            del array
+
+            if kind == "category":
+                entry["categories"] = list(lookup)
+
+            meta.append(entry)
+
+        with open(os.path.join(path, _META_FILE), "w", encoding="utf-8") as f:
+            json.dump({"rows": len(rows), "columns": meta}, f)
+
+        return cls(path, meta, len(rows))
+
+    @classmethod
+    def open(cls, path) -> SpilledResult:
+        """
+        Open a spill directory written earlier.
+        """
+        with open(os.path.join(path, _META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+
+        return cls(path, meta["columns"], meta["rows"])
+
+    def __len__(self) -> int:
+        return self._row_count
+
+    @property
+    def columns(self) -> List[str]:
+        return [column["name"] for column in self._columns]
+
+    def column(self, name: str, start: int = 0, stop: Optional[int] = None) -> pd.Series:
+        """
+        Return one column, or a slice of its rows, as a Series backed by the mapped file where possible.
+
+        Parameters
+        ----------
+        name : str
+            The column name.
+        start : int, optional
+            The first row. Defaults to 0.
+        stop : int, optional
+            The row after the last one. Defaults to the end.
+
+        Returns
+        -------
+        pd.Series
+            The column values; dictionary-encoded columns are returned as categoricals.
+        """
+        entry = self._column(name)
+        values = self._array(entry)[start:stop]
+
+        if entry["kind"] == "category":
+            categorical = pd.Categorical.from_codes(np.asarray(values), categories=pd.Index(entry["categories"], dtype=object))
+            return pd.Series(categorical, name=name)
+
+        return pd.Series(values, name=name, copy=False)
+
+    def to_dataframe(self, columns: Optional[List[str]] = None, start: int = 0, stop: Optional[int] = None) -> pd.DataFrame:
+        """
+        Return a DataFrame over some or all columns and rows. Numeric columns stay backed by the mapped files.
+        """
+        names = columns or self.columns
+
+        return pd.DataFrame({name: self.column(name, start, stop) for name in names}, copy=False)
+
+    def iter_chunks(self, chunk_size: int = SPILL_CHUNK_SIZE, columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+        """
+        Yield the result as DataFrames of at most `chunk_size` rows.
+        """
+        chunk_size = max(1, chunk_size)
+
+        for start in range(0, self._row_count, chunk_size):
+            chunk = self.to_dataframe(columns, start, start + chunk_size)
+            chunk.index = pd.RangeIndex(start, start + len(chunk))
+
+            yield chunk
+
+    def delete(self):
+        """
+        Remove the spill directory.
+        """
+        self._arrays.clear()
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def _column(self, name: str) -> Dict[str, Any]:
+        for column in self._columns:
+            if column["name"] == name:
+                return column
+
+        raise KeyError(name)
+
+    def _array(self, entry: Dict[str, Any]) -> np.ndarray:
+        array = self._arrays.get(entry["file"])
+
+        if array is None:
+            array = np.load(os.path.join(self.path, entry["file"]), mmap_mode="r")
+            self._arrays[entry["file"]] = array
+
+        return array
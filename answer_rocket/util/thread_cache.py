@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+_SCHEMA = """
+create table if not exists threads (
+    thread_id text primary key,
+    title text,
+    copilot_id text,
+    entry_count integer,
+    synced_at real
+);
+create table if not exists entries (
+    thread_id text,
+    position integer,
+    entry_id text,
+    finished integer,
+    entry text,
+    primary key (thread_id, position)
+);
+create index if not exists entries_id on entries (entry_id);
+"""
+
+
+def entry_finished(entry: Dict[str, Any]) -> bool:
+    """
+    Whether a chat entry, as returned by `Chat.get_entries`, has a finished answer.
+    """
+    return bool((entry.get("answer") or {}).get("hasFinished"))
+
+
+class ThreadCache:
+    """
+    Chat threads kept locally by `Chat.sync_thread`: each thread's title, copilot and entry count, and its
+    entries in thread order, as returned by `Chat.get_entries`.
+
+    Reads are served from memory. With a path, the cache is also written to SQLite, so other processes using
+    the same file start from what has already been synced instead of fetching whole threads again; a thread is
+    reloaded from the file whenever another process has synced it more recently.
+
+    Examples
+    --------
+    >>> cache = ThreadCache("threads.db")
+    >>> entries = max.chat.sync_thread(thread_id, cache)  # first call fetches every entry
+    >>> entries = max.chat.sync_thread(thread_id, cache)  # later calls fetch only new and unfinished entries
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._threads: Dict[str, Dict[str, Any]] = {}
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+        self._lock = threading.RLock()
+        self._connection = None
+
+        if path is not None:
+            self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            self._connection.execute("pragma journal_mode=wal")
+            self._connection.executescript(_SCHEMA)
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+
+    def __enter__(self) -> ThreadCache:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def thread(self, thread_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Return a cached thread's id, title, copilot_id, entry_count and synced_at, or None if it is not cached.
+        """
+        with self._lock:
+            self._load(str(thread_id))
+            thread = self._threads.get(str(thread_id))
+
+            return dict(thread) if thread else None
+
+    def entries(self, thread_id: str) -> List[Dict[str, Any]]:
+        """
+        Return a cached thread's entries in thread order; empty if it is not cached.
+        """
+        with self._lock:
+            self._load(str(thread_id))
+
+            return list(self._entries.get(str(thread_id), []))
+
+    def entry(self, entry_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Return a cached entry by id, from any cached thread.
+        """
+        entry_id = str(entry_id)
+
+        with self._lock:
+            for entries in self._entries.values():
+                for entry in entries:
+                    if str(entry.get("id")) == entry_id:
+                        return entry
+
+            if self._connection is not None:
+                row = self._connection.execute("select entry from entries where entry_id = ?", (entry_id,)).fetchone()
+
+                if row:
+                    return json.loads(row[0])
+
+        return None
+
+    def resume_position(self, thread_id: str) -> int:
+        """
+        Return the position from which a thread must be fetched again: its first unfinished entry, or the
+        number of cached entries when all have finished.
+        """
+        entries = self.entries(thread_id)
+
+        return next((position for position, entry in enumerate(entries) if not entry_finished(entry)), len(entries))
+
+    def write(self, thread: Dict[str, Any], entries: List[Dict[str, Any]], start: int = 0):
+        """
+        Record a thread's header and replace its entries from position `start` on with `entries`.
+
+        Parameters
+        ----------
+        thread : Dict[str, Any]
+            The thread's id, title, copilot_id and entry_count.
+        entries : List[Dict[str, Any]]
+            The entries fetched from position `start`. Cached entries after them are dropped.
+        start : int, optional
+            The position of the first entry given. Defaults to 0, which replaces every entry.
+        """
+        thread_id = str(thread["id"])
+        header = {**thread, "id": thread_id, "synced_at": time.time()}
+
+        with self._lock:
+            self._load(thread_id)
+            cached = self._entries.get(thread_id, [])[:start]
+            self._threads[thread_id] = header
+            self._entries[thread_id] = cached + list(entries)
+
+            if self._connection is None:
+                return
+
+            with self._connection:
+                self._connection.execute(
+                    "insert or replace into threads values (?, ?, ?, ?, ?)",
+                    (thread_id, header.get("title"), str(header.get("copilot_id") or "") or None,
+                     header.get("entry_count"), header["synced_at"]),
+                )
+                self._connection.execute("delete from entries where thread_id = ? and position >= ?", (thread_id, start))
+                self._connection.executemany(
+                    "insert into entries values (?, ?, ?, ?, ?)",
+                    [(thread_id, start + i, str(entry.get("id")), int(entry_finished(entry)), json.dumps(entry, default=str))
+                     for i, entry in enumerate(entries)],
+                )
+
+    def invalidate(self, thread_id: str):
+        """
+        Drop a thread so the next sync fetches it whole.
+        """
+        thread_id = str(thread_id)
+
+        with self._lock:
+            self._threads.pop(thread_id, None)
+            self._entries.pop(thread_id, None)
+
+            if self._connection is not None:
+                with self._connection:
+                    self._connection.execute("delete from threads where thread_id = ?", (thread_id,))
+                    self._connection.execute("delete from entries where thread_id = ?", (thread_id,))
+
+    def _load(self, thread_id: str):
+        # refresh the in-memory copy when another process has synced the thread since
+        if self._connection is None:
+            return
+
+        row = self._connection.execute(
+            "select title, copilot_id, entry_count, synced_at from threads where thread_id = ?", (thread_id,),
+        ).fetchone()
+
+        if row is None:
+            self._threads.pop(thread_id, None)
+            self._entries.pop(thread_id, None)
+            return
+
+        cached = self._threads.get(thread_id)
+
+        if cached is not None and cached["synced_at"] >= row[3]:
+            return
+
+        self._threads[thread_id] = {"id": thread_id, "title": row[0], "copilot_id": row[1], "entry_count": row[2],
+                                    "synced_at": row[3]}
+        self._entries[thread_id] = [
+            json.loads(entry) for (entry,) in self._connection.execute(
+                "select entry from entries where thread_id = ? order by position", (thread_id,),
+            )
+        ]
@@ -0,0 +1,201 @@
+"""Tests for Data.crawl_catalog and the SQLite catalog snapshot."""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+import time
+from unittest.mock import MagicMock
+
+from answer_rocket.client_config import ClientConfig
+from answer_rocket.data import Data
+from answer_rocket.graphql.sdk_operations import Operations
+from answer_rocket.util.catalog import CatalogSnapshot
+
+_DB_ID = "11111111-1111-1111-1111-111111111111"
+_DS_A = "aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa"
+_DS_B = "bbbbbbbb-bbbb-bbbb-bbbb-bbbbbbbbbbbb"
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+class MaxDimensionEntity:
+    def __init__(self, id, name, attributes=()):
+        self.id = id
+        self.name = name
+        self.output_label = name.title()
+        self.description = None
+        self.attributes = list(attributes)
+
+
+class MaxMetricAttribute:
+    def __init__(self, id, name):
+        self.id = id
+        self.name = name
+        self.output_label = name.title()
+        self.description = None
+
+
+class _Dataset:
+    def __init__(self, dataset_id, domain_objects):
+        self.dataset_id = dataset_id
+        self.domain_objects = domain_objects
+
+    def __to_json_value__(self):
+        return {"datasetId": self.dataset_id, "objects": [o.name for o in self.domain_objects]}
+
+
+def _make_catalog_client(datasets):
+    """Return (data, state) where `state['datasets']` maps dataset id -> (listing name, domain objects)."""
+    config = MagicMock(spec=ClientConfig)
+    config.copilot_id = None
+    config.copilot_skill_id = None
+    state = {"datasets": datasets, "detail_calls": []}
+
+    def submit(op, variables):
+        if op is Operations.query.get_databases:
+            rows = [{"databaseId": _DB_ID, "name": "warehouse", "dbms": "snowflake"}]
+            return op + {"data": {"getDatabases": {"totalRows": 1, "rows": rows}}}
+        if op is Operations.query.get_database_tables:
+            rows = [{"tableName": "orders"}, {"tableName": "customers"}]
+            return op + {"data": {"getDatabaseTables": {"totalRows": 2, "rows": rows}}}
+        if op is Operations.query.get_datasets:
+            rows = [{"datasetId": dataset_id, "databaseId": _DB_ID, "name": name}
+                    for dataset_id, (name, _) in state["datasets"].items()]
+            return op + {"data": {"getDatasets": {"totalRows": len(rows), "rows": rows}}}
+        raise AssertionError(f"unexpected operation {op}")
+
+    gql_client = MagicMock()
+    gql_client.submit.side_effect = submit
+    data = Data(config, gql_client)
+
+    def get_dataset(dataset_id):
+        state["detail_calls"].append(dataset_id)
+        entry = state["datasets"].get(dataset_id)
+        return _Dataset(dataset_id, entry[1]) if entry else None
+
+    data.get_dataset = get_dataset
+
+    return data, state
+
+
+def _objects():
+    region = MaxDimensionEntity("e1", "region", [MaxMetricAttribute("m1", "revenue")])
+    return [region, MaxMetricAttribute("m2", "units")]
+
+
+# ---------------------------------------------------------------------------
+# Crawling
+# ---------------------------------------------------------------------------
+
+def test_crawl_writes_databases_tables_datasets_and_domain_objects(tmp_path):
+    path = tmp_path / "catalog.db"
+    data, state = _make_catalog_client({_DS_A: ("sales", _objects()), _DS_B: ("inventory", [])})
+
+    result = data.crawl_catalog(path, max_workers=2)
+
+    assert result.success, result.errors
+    assert (result.databases, result.tables, result.datasets, result.datasets_fetched) == (1, 2, 2, 2)
+
+    with CatalogSnapshot(path) as catalog:
+        tables = catalog.query("select table_name from tables order by table_name")
+        assert tables["table_name"].tolist() == ["customers", "orders"]
+
+        found = catalog.find_domain_objects("revenue")
+        assert found["dataset_name"].tolist() == ["sales"]
+        assert found["type"].tolist() == ["MaxMetricAttribute"]
+        assert found["entity_id"].tolist() == ["e1"]
+
+
+def test_recrawl_only_fetches_new_or_changed_datasets(tmp_path):
+    path = tmp_path / "catalog.db"
+    data, state = _make_catalog_client({_DS_A: ("sales", _objects())})
+    data.crawl_catalog(path)
+
+    state["detail_calls"].clear()
+    state["datasets"][_DS_B] = ("inventory", [])
+    result = data.crawl_catalog(path)
+
+    assert state["detail_calls"] == [_DS_B]
+    assert result.datasets_fetched == 1
+
+    state["detail_calls"].clear()
+    state["datasets"][_DS_A] = ("sales v2", _objects())
+    data.crawl_catalog(path)
+
+    assert state["detail_calls"] == [_DS_A]
+
+    state["detail_calls"].clear()
+    data.crawl_catalog(path, full=True)
+
+    assert sorted(state["detail_calls"]) == [_DS_A, _DS_B]
+
+
+def test_recrawl_removes_datasets_that_are_no_longer_listed(tmp_path):
+    path = tmp_path / "catalog.db"
+    data, state = _make_catalog_client({_DS_A: ("sales", _objects()), _DS_B: ("inventory", [])})
+    data.crawl_catalog(path)
+
+    del state["datasets"][_DS_A]
+    result = data.crawl_catalog(path)
+
+    assert result.removed == 1
+
+    with CatalogSnapshot(path) as catalog:
+        assert catalog.query("select dataset_id from datasets")["dataset_id"].tolist() == [_DS_B]
+        assert catalog.query("select count(*) as n from domain_objects")["n"].tolist() == [0]
+
+
+def test_failed_detail_fetch_is_reported_and_retried(tmp_path):
+    path = tmp_path / "catalog.db"
+    data, state = _make_catalog_client({_DS_A: ("sales", _objects())})
+    get_dataset = data.get_dataset
+    data.get_dataset = lambda dataset_id: None
+
+    result = data.crawl_catalog(path)
+
+    assert not result.success
+    assert len(result.errors) == 1
+
+    data.get_dataset = get_dataset
+    result = data.crawl_catalog(path)
+
+    assert result.success
+    assert state["detail_calls"] == [_DS_A]
+
+
+def test_crawl_keeps_at_most_max_workers_requests_in_flight(tmp_path):
+    config = MagicMock(spec=ClientConfig)
+    config.copilot_id = None
+    config.copilot_skill_id = None
+    lock = threading.Lock()
+    in_flight = {"now": 0, "peak": 0}
+
+    def submit(op, variables):
+        with lock:
+            in_flight["now"] += 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        time.sleep(0.005)
+        with lock:
+            in_flight["now"] -= 1
+
+        page = variables["paging"]["pageNum"]
+        if op is Operations.query.get_databases:
+            rows = [{"databaseId": f"{page:08d}-1111-1111-1111-111111111111", "name": f"db{page}"}]
+            return op + {"data": {"getDatabases": {"totalRows": 6, "rows": rows}}}
+        if op is Operations.query.get_database_tables:
+            return op + {"data": {"getDatabaseTables": {"totalRows": 4, "rows": [{"tableName": f"t{page}"}]}}}
+        return op + {"data": {"getDatasets": {"totalRows": 4, "rows": []}}}
+
+    gql_client = MagicMock()
+    gql_client.submit.side_effect = submit
+    data = Data(config, gql_client)
+
+    result = data.crawl_catalog(tmp_path / "catalog.db", max_workers=2, page_size=1)
+
+    assert result.success, result.errors
+    assert result.tables == 24
+    assert in_flight["peak"] <= 2
@@ -0,0 +1,519 @@
+"""Tests for the Chat client helpers that do not need a live server."""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import importlib.util
+import json
+import uuid
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pandas as pd
+import pytest
+
+from answer_rocket.chat import Chat, _chat_entries_operation, _projected_operation
+from answer_rocket.client_config import ClientConfig
+from answer_rocket.graphql.schema import MaxChatEntry
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+THREAD_ID = str(uuid.uuid4())
+
+
+def _make_client():
+    config = MagicMock(spec=ClientConfig)
+    gql_client = MagicMock()
+    return gql_client, Chat(gql_client, config)
+
+
+def _status(entry_id, finished=False, message=None, blocks=(), error=None):
+    return {
+        'id': entry_id,
+        'threadId': THREAD_ID,
+        'answer': {
+            '__typename': 'MaxChatResult',
+            'answerId': None,
+            'hasFinished': finished,
+            'error': error,
+            'message': message,
+            'reportResults': [{'title': 'Sales', 'reportName': 'trend',
+                               'contentBlocks': [{'id': block, 'title': f'block {block[:4]}', 'type': 'VISUAL',
+                                                  'layoutJson': '{}'} for block in blocks]}],
+        },
+    }
+
+
+def _serve_statuses(gql_client, timelines):
+    """
+    Answer entry queries from per-entry timelines. Each status poll advances every polled entry by one state;
+    full fetches return the current state.
+    """
+    polls = []
+
+    def submit_partial(prepared, variables):
+        ids = [str(variables[f'id{i}']) for i in range(len(variables))]
+        full = prepared.document.startswith(b'query ChatEntries')
+        polls.append((ids, full))
+        data = {}
+
+        for i, entry_id in enumerate(ids):
+            timeline = timelines.get(entry_id)
+            advance = not full and timeline and len(timeline) > 1
+            data[f'entry{i}'] = timeline.pop(0) if advance else (timeline or [None])[0]
+
+        return prepared.operation + {'data': data}, []
+
+    gql_client.submit_partial.side_effect = submit_partial
+
+    return polls
+
+
+@pytest.fixture(autouse=True)
+def _no_sleep(monkeypatch):
+    monkeypatch.setattr('answer_rocket.chat.time.sleep', lambda seconds: None)
+
+
+# ---------------------------------------------------------------------------
+# Streaming answers
+# ---------------------------------------------------------------------------
+
+def test_ask_question_stream_yields_progress_then_the_full_entry():
+    gql_client, chat = _make_client()
+    entry_id = str(uuid.uuid4())
+    block_a, block_b = str(uuid.uuid4()), str(uuid.uuid4())
+    chat.create_new_thread = MagicMock(return_value=SimpleNamespace(id=THREAD_ID))
+    chat.queue_chat_question = MagicMock(return_value=SimpleNamespace(id=entry_id))
+    final_entry = SimpleNamespace(id=entry_id, answer=SimpleNamespace(message='Sales grew 4%', error=None))
+    chat.get_chat_entry = MagicMock(return_value=final_entry)
+    _serve_statuses(gql_client, {entry_id: [
+        _status(entry_id, message='Choosing a skill'),
+        _status(entry_id, message='Choosing a skill'),
+        _status(entry_id, message='Running trend', blocks=[block_a]),
+        _status(entry_id, message='Running trend', blocks=[block_a, block_b]),
+        _status(entry_id, finished=True, message='Sales grew 4%', blocks=[block_a, block_b]),
+    ]})
+
+    updates = list(chat.ask_question_stream('copilot', 'How are sales?', pipeline_type='RESEARCH'))
+
+    assert [update.type for update in updates] == ['queued', 'loading', 'loading', 'content_block', 'content_block', 'final']
+    assert [update.message for update in updates if update.type == 'loading'] == ['Choosing a skill', 'Running trend']
+    assert [str(update.content_block.id) for update in updates if update.type == 'content_block'] == [block_a, block_b]
+    assert updates[3].report_title == 'Sales'
+    assert updates[-1].entry is final_entry and updates[-1].message == 'Sales grew 4%'
+    assert chat.queue_chat_question.call_args.kwargs['pipeline_type'] == 'RESEARCH'
+    chat.get_chat_entry.assert_called_once_with(entry_id)
+
+
+def test_ask_question_stream_times_out():
+    gql_client, chat = _make_client()
+    entry_id = str(uuid.uuid4())
+    chat.queue_chat_question = MagicMock(return_value=SimpleNamespace(id=entry_id))
+    _serve_statuses(gql_client, {entry_id: [_status(entry_id, message='Working')]})
+
+    with pytest.raises(TimeoutError):
+        list(chat.ask_question_stream('copilot', 'How are sales?', thread_id=THREAD_ID, timeout=0))
+
+
+def test_entries_operations_use_aliases_and_are_shared():
+    completion = _chat_entries_operation(2, 'completion')
+    status = _chat_entries_operation(2)
+    full = _chat_entries_operation(2, 'full')
+
+    assert status is _chat_entries_operation(2)
+    assert b'entry1: chatEntry(id: $id1)' in status.document
+    assert b'chatPipelineProfile' not in status.document
+    assert b'contentBlocks' in status.document
+    assert b'contentBlocks' not in completion.document and b'message' not in completion.document
+    assert b'hasFinished' in completion.document
+    assert b'ChatResultFragment' in full.document
+
+
+# ---------------------------------------------------------------------------
+# Waiting on queued entries
+# ---------------------------------------------------------------------------
+
+def test_wait_for_entries_yields_in_completion_order_with_batched_polls():
+    gql_client, chat = _make_client()
+    slow, fast, gone = (str(uuid.uuid4()) for _ in range(3))
+    polls = _serve_statuses(gql_client, {
+        slow: [_status(slow), _status(slow), _status(slow, finished=True, message='slow')],
+        fast: [_status(fast), _status(fast, finished=True, message='fast')],
+    })
+
+    entries = list(chat.wait_for_entries([slow, fast, gone, fast], batch_size=2))
+
+    assert [entry.answer.message for entry in entries] == ['fast', 'slow']
+    assert polls[0] == ([slow, fast], False)
+    assert polls[1] == ([gone], False)
+    assert ([fast], True) in polls and ([slow], True) in polls
+    assert max(len(ids) for ids, _ in polls) == 2
+
+
+def test_wait_for_entries_times_out_and_cancels_pending():
+    gql_client, chat = _make_client()
+    done, running = str(uuid.uuid4()), str(uuid.uuid4())
+    _serve_statuses(gql_client, {done: [_status(done, finished=True)], running: [_status(running)]})
+    chat.cancel_chat_question = MagicMock()
+
+    entries = chat.wait_for_entries([done, running], timeout=0, cancel_pending=True)
+
+    assert str(next(entries).id) == done
+    with pytest.raises(TimeoutError):
+        next(entries)
+    chat.cancel_chat_question.assert_called_once_with(running)
+
+
+def test_wait_for_entries_cancels_pending_when_caller_stops():
+    gql_client, chat = _make_client()
+    done, running = str(uuid.uuid4()), str(uuid.uuid4())
+    _serve_statuses(gql_client, {done: [_status(done, finished=True)], running: [_status(running)]})
+    chat.cancel_chat_question = MagicMock()
+
+    entries = chat.wait_for_entries([done, running], cancel_pending=True)
+    next(entries)
+    entries.close()
+
+    chat.cancel_chat_question.assert_called_once_with(running)
+
+
+def test_wait_for_entries_does_not_cancel_finished_entries_left_unyielded():
+    gql_client, chat = _make_client()
+    first, second = str(uuid.uuid4()), str(uuid.uuid4())
+    _serve_statuses(gql_client, {first: [_status(first, finished=True)], second: [_status(second, finished=True)]})
+    chat.cancel_chat_question = MagicMock()
+
+    entries = chat.wait_for_entries([first, second], cancel_pending=True)
+    next(entries)
+    entries.close()
+
+    chat.cancel_chat_question.assert_not_called()
+
+
+# ---------------------------------------------------------------------------
+# Batch runs
+# ---------------------------------------------------------------------------
+
+def _make_batch_client(finish_after=1, fail=()):
+    """A client whose queued questions finish after `finish_after` status polls; questions in `fail` error."""
+    gql_client, chat = _make_client()
+    timelines = {}
+    queued = []
+
+    def queue_chat_question(question, thread_id, **kwargs):
+        entry_id = str(uuid.uuid4())
+        error = 'skill failed' if question in fail else None
+        finished = _status(entry_id, finished=True, message=f'answer to {question}', blocks=[str(uuid.uuid4())], error=error)
+        finished['answer'].update({'chatPipelineProfile': {'total': 1.5}, 'copilotSkillId': None,
+                                   'answeredAt': '2025-01-01T00:00:02+00:00'})
+        finished['question'] = {'askedAt': '2025-01-01T00:00:00+00:00', 'nl': question}
+        timelines[entry_id] = [_status(entry_id)] * finish_after + [finished]
+        queued.append((question, kwargs))
+        return SimpleNamespace(id=entry_id)
+
+    chat.create_new_thread = MagicMock(side_effect=lambda copilot_id, thread_type: SimpleNamespace(id=str(uuid.uuid4())))
+    chat.queue_chat_question = MagicMock(side_effect=queue_chat_question)
+    polls = _serve_statuses(gql_client, timelines)
+
+    return chat, queued, polls
+
+
+def test_run_batch_runs_every_question_and_variant_with_bounded_concurrency():
+    chat, queued, polls = _make_batch_client(fail=('q2',))
+    variants = {'base': {}, 'research': {'pipeline_type': 'RESEARCH', 'model_overrides': {'CHAT': 'gpt-4.1'}}}
+
+    results = chat.run_batch('copilot', ['q1', 'q2', 'q3'], concurrency=2, variants=variants)
+
+    assert list(zip(results['question'], results['variant'])) == [
+        ('q1', 'base'), ('q1', 'research'), ('q2', 'base'), ('q2', 'research'), ('q3', 'base'), ('q3', 'research')]
+    assert results['success'].tolist() == [True, True, False, False, True, True]
+    assert results.loc[2, 'error'] == 'skill failed'
+    assert results.loc[0, 'message'] == 'answer to q1'
+    assert results['content_block_count'].tolist() == [1] * 6
+    assert results.loc[0, 'chat_pipeline_profile'] == {'total': 1.5}
+    assert results['latency_seconds'].tolist() == [2.0] * 6
+    assert results['thread_id'].nunique() == 6
+    assert max(len(ids) for ids, full in polls if not full) <= 2
+    assert queued[1] == ('q1', {'skip_cache': False, 'model_overrides': {'CHAT': 'gpt-4.1'}, 'indicated_skills': None,
+                                'pipeline_type': 'RESEARCH'})
+
+
+def test_run_batch_resumes_from_checkpoint(tmp_path):
+    path = tmp_path / 'batch.jsonl'
+    chat, queued, _ = _make_batch_client(fail=('q2',))
+    chat.run_batch('copilot', ['q1', 'q2'], path=path)
+
+    chat, queued, _ = _make_batch_client()
+    results = chat.run_batch('copilot', ['q1', 'q2'], path=path)
+
+    assert [question for question, _ in queued] == ['q2']
+    assert results['success'].tolist() == [True, True]
+    assert len(path.read_text().splitlines()) == 3
+
+
+def test_run_batch_resumes_after_a_partly_written_record(tmp_path):
+    path = tmp_path / 'batch.jsonl'
+    chat, _, _ = _make_batch_client()
+    chat.run_batch('copilot', ['q1'], path=path)
+    with open(path, 'a') as f:
+        f.write('{"question": "q2", "variant": "def')
+
+    chat, queued, _ = _make_batch_client()
+    results = chat.run_batch('copilot', ['q1', 'q2'], path=path)
+
+    assert [question for question, _ in queued] == ['q2']
+    assert results['success'].tolist() == [True, True]
+    assert [json.loads(line)['question'] for line in path.read_text().splitlines()] == ['q1', 'q2']
+
+
+def test_run_batch_cancels_questions_that_time_out():
+    chat, _, _ = _make_batch_client(finish_after=1000)
+    chat.cancel_chat_question = MagicMock()
+
+    results = chat.run_batch('copilot', ['q1'], timeout=0)
+
+    assert not results.loc[0, 'success']
+    assert results.loc[0, 'error'].startswith('timed out')
+    chat.cancel_chat_question.assert_called_once_with(results.loc[0, 'entry_id'])
+
+
+def test_run_batch_records_a_failed_poll_and_keeps_polling_the_others(monkeypatch):
+    monkeypatch.setattr('answer_rocket.chat.CHAT_POLL_BATCH_SIZE', 1)
+    chat, _, _ = _make_batch_client()
+    chat.cancel_chat_question = MagicMock()
+    queue_chat_question = chat.queue_chat_question.side_effect
+    failing = []
+
+    def queue_and_record(question, thread_id, **kwargs):
+        entry = queue_chat_question(question, thread_id, **kwargs)
+        if question == 'q2':
+            failing.append(entry.id)
+        return entry
+
+    def poll_finished(entry_ids, batch_size):
+        if entry_ids == failing:
+            raise ConnectionError('status poll failed')
+        return poll(entry_ids, batch_size)
+
+    poll = chat._poll_finished
+    chat.queue_chat_question.side_effect = queue_and_record
+    chat._poll_finished = poll_finished
+
+    results = chat.run_batch('copilot', ['q1', 'q2', 'q3'], concurrency=3)
+
+    assert results['success'].tolist() == [True, False, True]
+    assert results.loc[1, 'error'] == 'polling failed: status poll failed'
+    chat.cancel_chat_question.assert_called_once_with(failing[0])
+
+
+# ---------------------------------------------------------------------------
+# Field projection
+# ---------------------------------------------------------------------------
+
+def _submitted_document(gql_client):
+    operation = gql_client.submit.call_args[0][0]
+    return bytes(getattr(operation, 'operation', operation))
+
+
+def test_light_profile_uses_the_light_operations():
+    gql_client, chat = _make_client()
+
+    chat.get_chat_entry(str(uuid.uuid4()), profile='light')
+    document = _submitted_document(gql_client)
+    assert b'ChatResultLightFragment' in document
+    assert b'chatPipelineProfile' not in document and b'contentBlocks' not in document
+
+    chat.get_chat_thread(str(uuid.uuid4()), profile='light')
+    assert b'query ChatThreadLight' in _submitted_document(gql_client)
+
+    chat.get_all_chat_entries(profile='light')
+    assert b'query AllChatEntriesLight' in _submitted_document(gql_client)
+
+    chat.get_all_chat_entries()
+    assert b'query AllChatEntries(' in _submitted_document(gql_client)
+
+
+def test_fields_select_only_the_given_paths():
+    gql_client, chat = _make_client()
+
+    chat.get_all_chat_entries(fields=['question.nl', 'answer.message', 'answer.report_results.title'])
+
+    operation = gql_client.submit.call_args[0][0]
+    assert operation is _projected_operation('all_chat_entries', ['answer.report_results.title', 'answer.message', 'question.nl'])
+    document = operation.document.decode()
+    assert 'nl' in document and 'message' in document and 'title' in document
+    assert 'askedAt' not in document and 'reportName' not in document and 'user' not in document
+    result = operation.operation + {'data': {'allChatEntries': [
+        {'id': str(uuid.uuid4()), 'question': {'nl': 'q'}, 'answer': {'message': 'a', 'reportResults': [{'title': 't'}]}}]}}
+    assert result.all_chat_entries[0].answer.report_results[0].title == 't'
+
+
+def test_a_bare_object_field_selects_only_its_scalar_fields():
+    document = _projected_operation('chat_entry', ['answer']).document.decode()
+
+    assert 'hasFinished' in document and 'message' in document
+    assert 'reportResults' not in document and 'contentBlocks' not in document
+
+
+def test_unknown_fields_and_profiles_are_rejected():
+    _, chat = _make_client()
+
+    with pytest.raises(ValueError, match="answer.nope"):
+        chat.get_chat_entry(str(uuid.uuid4()), fields=['answer.nope'])
+    with pytest.raises(ValueError, match="profile"):
+        chat.get_chat_thread(str(uuid.uuid4()), profile='tiny')
+
+
+# ---------------------------------------------------------------------------
+# Paging and export
+# ---------------------------------------------------------------------------
+
+def _entries(count, start=0):
+    return [MaxChatEntry({'id': str(uuid.UUID(int=start + i)), 'threadId': THREAD_ID,
+                          'question': {'askedAt': f'2025-01-01T00:{(start + i) // 60:02d}:{(start + i) % 60:02d}+00:00',
+                                       'nl': f'question {start + i}'}})
+            for i in range(count)]
+
+
+def _serve_all_entries(chat, entries, fail_at_offset=None, newest_first=False):
+    requests = []
+
+    def get_all_chat_entries(offset=0, limit=100, filters=None, profile='full', fields=None):
+        requests.append((offset, limit, filters))
+
+        if fail_at_offset is not None and offset >= fail_at_offset:
+            raise ConnectionError('connection reset')
+
+        after = (filters or {}).get('askedDate', {}).get('dateFrom')
+        matching = [entry for entry in entries
+                    if after is None or entry.question.asked_at.strftime('%Y-%m-%d %H:%M:%S') >= after]
+
+        if newest_first:
+            matching.reverse()
+
+        return matching[offset:offset + limit]
+
+    chat.get_all_chat_entries = get_all_chat_entries
+
+    return requests
+
+
+def _read_ids(path):
+    return [json.loads(line)['id'] for line in path.read_text().splitlines()]
+
+
+def test_iter_all_chat_entries_walks_every_page():
+    _, chat = _make_client()
+    entries = _entries(25)
+    filters = {'status': {'values': ['completed'], 'filterType': 'set'}}
+    requests = _serve_all_entries(chat, entries)
+
+    assert [entry.id for entry in chat.iter_all_chat_entries(filters, page_size=10, offset=3)] == [e.id for e in entries[3:]]
+    assert [offset for offset, _, _ in requests] == [3, 13, 23]
+    assert requests[1][2] == filters and requests[1][2] is not filters
+
+
+def test_export_chat_entries_resumes_after_a_crash(tmp_path):
+    path = tmp_path / 'entries.jsonl'
+    entries = _entries(25)
+    _, chat = _make_client()
+    _serve_all_entries(chat, entries, fail_at_offset=20)
+
+    with pytest.raises(ConnectionError):
+        chat.export_chat_entries(path, format='jsonl', chunk_size=5, page_size=10, prefetch_pages=1)
+
+    exported = _read_ids(path)
+    assert exported == [str(entry.id) for entry in entries[:len(exported)]]
+    with open(path, 'a') as f:
+        f.write('{"id": "partial chunk"')
+
+    requests = _serve_all_entries(chat, entries)
+    written = chat.export_chat_entries(path, format='jsonl', chunk_size=5, page_size=10)
+
+    assert requests[0][0] == len(exported)
+    assert written == 25 - len(exported)
+    assert _read_ids(path) == [str(entry.id) for entry in entries]
+
+
+def test_export_chat_entries_adds_only_newer_entries_from_the_watermark(tmp_path):
+    path = tmp_path / 'entries.jsonl'
+    _, chat = _make_client()
+    _serve_all_entries(chat, _entries(10))
+    chat.export_chat_entries(path, format='jsonl', chunk_size=4)
+
+    requests = _serve_all_entries(chat, _entries(15))
+    written = chat.export_chat_entries(path, format='jsonl', resume='watermark')
+
+    assert written == 5
+    assert requests[0][2]['askedDate'] == {'dateFrom': '2025-01-01 00:00:09', 'dateTo': None, 'filterType': 'date',
+                                           'type': 'askedAfter'}
+    assert _read_ids(path) == [str(entry.id) for entry in _entries(15)]
+
+
+def test_export_chat_entries_rejects_resuming_with_other_filters(tmp_path):
+    path = tmp_path / 'entries.jsonl'
+    _, chat = _make_client()
+    _serve_all_entries(chat, _entries(3))
+    chat.export_chat_entries(path, format='jsonl')
+
+    with pytest.raises(ValueError, match='different filters'):
+        chat.export_chat_entries(path, filters={'copilot': {'values': ['Other'], 'filterType': 'set'}}, format='jsonl')
+
+    assert chat.export_chat_entries(path, format='jsonl', resume=None) == 3
+    assert len(_read_ids(path)) == 3
+
+
+def test_parquet_export_checks_for_an_engine_before_fetching(tmp_path, monkeypatch):
+    _, chat = _make_client()
+    requests = _serve_all_entries(chat, _entries(3))
+    monkeypatch.setattr('answer_rocket.chat.importlib.util.find_spec', lambda name: None)
+
+    with pytest.raises(ImportError, match='pyarrow'):
+        chat.export_chat_entries(tmp_path / 'entries', format='parquet')
+
+    assert requests == []
+    assert chat.export_chat_entries(tmp_path / 'entries.jsonl') == 3
+
+
+@pytest.mark.skipif(not any(importlib.util.find_spec(engine) for engine in ('pyarrow', 'fastparquet')),
+                    reason='needs pyarrow or fastparquet')
+def test_parquet_parts_share_one_schema_when_later_chunks_have_more_fields(tmp_path):
+    path = tmp_path / 'entries'
+    _, chat = _make_client()
+    entries = _entries(5) + [MaxChatEntry({**entry.__to_json_value__(), 'skillMemoryPayload': {'step': 2}})
+                             for entry in _entries(5, start=5)]
+    _serve_all_entries(chat, entries)
+
+    assert chat.export_chat_entries(path, format='parquet', chunk_size=5) == 10
+
+    table = pd.read_parquet(path)
+    assert list(table.columns) == ['id', 'threadId', 'question', 'answer', 'feedback', 'user', 'skillMemoryPayload']
+    assert sorted(table['id']) == sorted(str(entry.id) for entry in entries)
+    assert table['skillMemoryPayload'].notna().sum() == 5
+    assert json.loads(table.loc[table['id'] == str(entries[9].id), 'skillMemoryPayload'].iloc[0]) == {'step': 2}
+
+
+def test_interrupted_watermark_run_is_finished_before_the_watermark_moves(tmp_path):
+    path = tmp_path / 'entries.jsonl'
+    _, chat = _make_client()
+    _serve_all_entries(chat, _entries(10))
+    chat.export_chat_entries(path, chunk_size=4)
+
+    _serve_all_entries(chat, _entries(20), fail_at_offset=4, newest_first=True)
+    with pytest.raises(ConnectionError):
+        chat.export_chat_entries(path, chunk_size=4, page_size=4, prefetch_pages=1, resume='watermark')
+
+    requests = _serve_all_entries(chat, _entries(20), newest_first=True)
+    written = chat.export_chat_entries(path, chunk_size=4, page_size=4, resume='watermark')
+
+    assert requests[0][0] == 4
+    assert requests[0][2]['askedDate']['dateFrom'] == '2025-01-01 00:00:09'
+    assert written == 6
+    assert sorted(_read_ids(path)) == sorted(str(entry.id) for entry in _entries(20))
+
+    requests = _serve_all_entries(chat, _entries(20), newest_first=True)
+    assert chat.export_chat_entries(path, resume='watermark') == 0
+    assert requests[0][2]['askedDate']['dateFrom'] == '2025-01-01 00:00:19'
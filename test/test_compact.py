@@ -0,0 +1,67 @@
+"""Tests for compact_dataframe and compact result DataFrames."""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from answer_rocket.data import create_df_from_data
+from answer_rocket.util.compact import compact_dataframe
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _result_data(count=200):
+    regions = ['north', 'south', 'east', 'west']
+    return {
+        'columns': [{'name': 'region'}, {'name': 'day'}, {'name': 'units'}, {'name': 'price'}, {'name': 'ratio'},
+                    {'name': 'note'}],
+        'rows': [
+            {'data': [regions[i % 4], f'2024-01-{i % 28 + 1:02d}', i, 1.5 + i % 3, 1 / (i + 3), f'note {i}']}
+            for i in range(count)
+        ],
+    }
+
+
+# ---------------------------------------------------------------------------
+# Compaction
+# ---------------------------------------------------------------------------
+
+def test_compact_converts_types_without_changing_values():
+    df = create_df_from_data(_result_data())
+    compact = compact_dataframe(df)
+
+    assert isinstance(compact['region'].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_any_dtype(compact['day'])
+    assert compact['units'].dtype == np.int16
+    assert compact['price'].dtype == np.float32
+    # 1/(i+3) is not exact in float32, so it stays float64
+    assert compact['ratio'].dtype == np.float64
+    # every note is distinct, so it stays a string column
+    assert not isinstance(compact['note'].dtype, pd.CategoricalDtype)
+
+    assert compact['region'].astype(str).tolist() == df['region'].tolist()
+    assert compact['units'].tolist() == df['units'].tolist()
+    assert compact['price'].astype(float).tolist() == df['price'].tolist()
+
+
+def test_compact_reports_memory_and_keeps_attrs():
+    df = create_df_from_data(_result_data())
+    df.attrs['description'] = 'sales'
+
+    compact = compact_dataframe(df)
+    usage = compact.attrs['memory_usage']
+
+    assert compact.attrs['description'] == 'sales'
+    assert usage['before'] == df.memory_usage(deep=True).sum()
+    assert usage['after'] < usage['before']
+    assert 'memory_usage' not in df.attrs
+
+
+def test_create_df_from_data_compact_flag():
+    assert create_df_from_data(_result_data(), compact=True)['region'].dtype == 'category'
+    assert create_df_from_data(_result_data())['region'].dtype != 'category'
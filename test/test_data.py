@@ -0,0 +1,628 @@
+"""Tests for the Data client helpers that do not need a live server."""
+
+import copy
+import pytest
+import re
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from unittest.mock import MagicMock
+
+from answer_rocket.data import Data
+from answer_rocket.client_config import ClientConfig
+from answer_rocket.graphql.client import GraphQlClient, PreparedOperation
+from answer_rocket.graphql.sdk_operations import Operations
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _make_client():
+    config = MagicMock(spec=ClientConfig)
+    config.copilot_id = None
+    config.copilot_skill_id = None
+    gql_client = MagicMock()
+    return config, gql_client, Data(config, gql_client)
+
+
+# ---------------------------------------------------------------------------
+# Prepared domain-object operations
+# ---------------------------------------------------------------------------
+
+def test_domain_object_operation_is_built_once_and_shared():
+    _, _, data_a = _make_client()
+    _, _, data_b = _make_client()
+
+    first = data_a._domain_object_operation('get_domain_object')
+    second = data_b._domain_object_operation('get_domain_object')
+
+    assert isinstance(first, PreparedOperation)
+    assert first is second
+
+
+def test_domain_object_operation_variants_differ_on_dim_values():
+    _, _, data = _make_client()
+
+    with_values = data._domain_object_operation('get_dataset', True)
+    without_values = data._domain_object_operation('get_dataset', False)
+
+    assert with_values is not without_values
+    assert b'dimensionValues' in with_values.document
+    assert b'dimensionValues' not in without_values.document
+
+
+def test_data_and_chat_share_one_operation_cache():
+    from answer_rocket.chat import _thread_header_operation
+    from answer_rocket.graphql.client import prepared_operation
+
+    _, _, data = _make_client()
+
+    assert data._domain_object_operation('get_dataset', True) is prepared_operation(('get_dataset', True), None)
+    assert _thread_header_operation() is prepared_operation(('chat_thread_header',), None)
+
+
+def test_prepared_document_matches_fresh_build():
+    _, _, data = _make_client()
+
+    fresh = data._build_get_domain_object_by_name_operation(False)
+
+    assert bytes(fresh) == data._domain_object_operation('get_domain_object_by_name').document
+
+
+def test_get_dataset_submits_prepared_operation():
+    _, gql_client, data = _make_client()
+    gql_client.submit.return_value = MagicMock(get_dataset="dataset")
+
+    assert data.get_dataset("9a8d3f43-54d4-4b8c-9f55-9a1e1a0a7a11", include_dim_values=True) == "dataset"
+
+    operation, args = gql_client.submit.call_args.args
+    assert operation is data._domain_object_operation('get_dataset', True)
+    assert args['datasetId'] == "9a8d3f43-54d4-4b8c-9f55-9a1e1a0a7a11"
+
+
+def test_graphql_client_sends_prepared_document():
+    _, _, data = _make_client()
+    prepared = data._domain_object_operation('get_domain_object')
+    gql_client = GraphQlClient.__new__(GraphQlClient)
+    gql_client._endpoint = MagicMock(return_value={'data': {'getDomainObject': None}})
+
+    gql_client.submit(prepared, {'datasetId': 'x'})
+
+    gql_client._endpoint.assert_called_once_with(prepared.document, {'datasetId': 'x'})
+
+
+# ---------------------------------------------------------------------------
+# Dataset index
+# ---------------------------------------------------------------------------
+
+def test_get_dataset_index_returns_none_when_dataset_missing():
+    _, gql_client, data = _make_client()
+    gql_client.submit.return_value = MagicMock(get_dataset=None)
+
+    assert data.get_dataset_index("9a8d3f43-54d4-4b8c-9f55-9a1e1a0a7a11") is None
+
+
+# ---------------------------------------------------------------------------
+# Bulk grounding
+# ---------------------------------------------------------------------------
+
+def _check_variables(document, variables):
+    # the server rejects a request whose declared variables are not all passed under their rendered names
+    declared = {name.decode() for name in re.findall(rb'\$(\w+):', bytes(document).split(b')', 1)[0])}
+    assert declared == set(variables), (sorted(declared), sorted(variables))
+
+
+def _grounding_endpoint(document, variables):
+    _check_variables(document, variables)
+    values = {int(k[len('value'):]): v for k, v in variables.items() if re.fullmatch(r'value\d+', k)}
+    return {'data': {f'grounded_{i}': {'matchedValue': value.upper()} for i, value in values.items()}}
+
+
+def test_get_grounded_values_batches_dedupes_and_keeps_order():
+    _, _, data = _make_client()
+    gql_client = GraphQlClient.__new__(GraphQlClient)
+    gql_client._endpoint = MagicMock(side_effect=_grounding_endpoint)
+    data._gql_client = gql_client
+
+    values = ['coke', 'pepsi', 'coke', 'sprite', 'fanta', 'pepsi']
+    results = data.get_grounded_values("9a8d3f43-54d4-4b8c-9f55-9a1e1a0a7a11", values, batch_size=3)
+
+    assert [r.matched_value for r in results] == ['COKE', 'PEPSI', 'COKE', 'SPRITE', 'FANTA', 'PEPSI']
+    assert gql_client._endpoint.call_count == 2
+    document = gql_client._endpoint.call_args_list[0].args[0]
+    assert document.count(b'grounded_') == 3
+
+
+def test_get_grounded_values_falls_back_to_single_requests_when_batch_fails():
+    _, gql_client, data = _make_client()
+
+    def submit(operation, args):
+        if 'value0' in args:
+            raise Exception('batch failed')
+        if args['value'] == 'bad':
+            raise Exception('bad value')
+        return MagicMock(get_grounded_value=args['value'])
+
+    gql_client.submit.side_effect = submit
+
+    results = data.get_grounded_values("9a8d3f43-54d4-4b8c-9f55-9a1e1a0a7a11", ['good', 'bad'])
+
+    assert results == ['good', None]
+
+
+def test_get_grounded_values_empty():
+    _, gql_client, data = _make_client()
+
+    assert data.get_grounded_values("9a8d3f43-54d4-4b8c-9f55-9a1e1a0a7a11", []) == []
+    gql_client.submit.assert_not_called()
+
+
+# ---------------------------------------------------------------------------
+# Paged iterators
+# ---------------------------------------------------------------------------
+
+def test_iter_dataset_kshots_requests_each_page():
+    _, gql_client, data = _make_client()
+
+    def submit(operation, args):
+        page_num = args['paging']['pageNum']
+        rows = [f'kshot-{page_num}-{i}' for i in range(2 if page_num < 3 else 1)]
+        return MagicMock(get_dataset_kshots=MagicMock(total_rows=5, rows=rows))
+
+    gql_client.submit.side_effect = submit
+
+    kshots = list(data.iter_dataset_kshots("9a8d3f43-54d4-4b8c-9f55-9a1e1a0a7a11", page_size=2))
+
+    assert kshots == ['kshot-1-0', 'kshot-1-1', 'kshot-2-0', 'kshot-2-1', 'kshot-3-0']
+    assert sorted(c.args[1]['paging']['pageNum'] for c in gql_client.submit.call_args_list) == [1, 2, 3]
+    assert all(c.args[1]['paging']['pageSize'] == 2 for c in gql_client.submit.call_args_list)
+
+
+def test_iter_datasets_raises_when_a_page_fails():
+    _, gql_client, data = _make_client()
+
+    def submit(operation, args):
+        page_num = args['paging']['pageNum']
+        if page_num == 2:
+            raise ConnectionError("page 2 failed")
+        return MagicMock(get_datasets=MagicMock(total_rows=6, rows=[f'dataset-{page_num}-{i}' for i in range(2)]))
+
+    gql_client.submit.side_effect = submit
+    datasets = data.iter_datasets(page_size=2, prefetch_pages=1)
+
+    assert next(datasets) == 'dataset-1-0'
+    assert next(datasets) == 'dataset-1-1'
+    with pytest.raises(ConnectionError):
+        next(datasets)
+    assert gql_client.submit.call_args_list[0].args[1]['searchInput'] == {'nameContains': None}
+
+
+# ---------------------------------------------------------------------------
+# apply_dataset
+# ---------------------------------------------------------------------------
+
+_DATASET_ID = "0c6f9d0e-7a4f-4cf1-9a53-0f5c1f7f1d10"
+
+
+def _current_dataset():
+    from answer_rocket.graphql.schema import Dataset
+
+    return Dataset({
+        'datasetId': _DATASET_ID, 'name': 'Sales', 'description': 'Distributor sales', 'databaseId': _DATASET_ID,
+        'sourceTable': 'fact_sales', 'sourceSql': None, 'derivedTableAlias': 'sales', 'dataInterval': 'DATE',
+        'datasetMinDate': '2023-01-01T00:00:00+00:00', 'datasetMaxDate': None, 'queryRowLimit': 100,
+        'useDatabaseCasing': False, 'kShotLimit': 3, 'miscInfo': None,
+        'dimensions': [
+            {'id': 'region', 'name': 'region', 'outputLabel': 'Region', 'isActive': True, 'dataType': 'STRING',
+             'sqlExpression': 'region', 'sampleLimit': 10},
+            {'id': 'channel', 'name': 'channel', 'outputLabel': 'Channel', 'isActive': True, 'dataType': 'STRING',
+             'sqlExpression': 'channel', 'sampleLimit': 10},
+        ],
+        'metrics': [],
+    })
+
+
+def _make_apply_client(errors=()):
+    _, _, data = _make_client()
+    gql_client = GraphQlClient.__new__(GraphQlClient)
+
+    def endpoint(document, variables):
+        _check_variables(document, variables)
+        aliases = sorted({re.match(r'change(\d+)', k).group(1) for k in variables})
+        failed = {e['path'][0] for e in errors}
+        response = {f'change_{i}': {'success': True, 'code': None, 'error': None} for i in aliases if f'change_{i}' not in failed}
+        return {'data': response, 'errors': list(errors)} if errors else {'data': response}
+
+    gql_client._endpoint = MagicMock(side_effect=endpoint)
+    data._gql_client = gql_client
+    data.get_dataset2 = MagicMock(return_value=_current_dataset())
+    return gql_client, data
+
+
+def test_apply_dataset_sends_only_changed_settings_in_one_request():
+    gql_client, data = _make_apply_client()
+
+    result = data.apply_dataset({
+        'datasetId': _DATASET_ID,
+        'name': 'Sales',                          # unchanged
+        'dataInterval': 'date',                   # unchanged, different case
+        'datasetMinDate': '2023-01-01',           # unchanged, date only
+        'description': 'Net distributor sales',
+        'queryRowLimit': 500,
+        'sourceSql': 'select * from fact_sales',
+        'dimensions': [
+            {'id': 'region', 'name': 'region', 'outputLabel': 'Sales Region', 'dataType': 'string'},
+            {'id': 'brand', 'name': 'brand', 'outputLabel': 'Brand', 'dataType': 'STRING', 'sqlExpression': 'brand'},
+        ],
+    })
+
+    assert result.success
+    assert [(c.target, c.action, c.object_id) for c in result.changes] == [
+        ('description', 'update', None),
+        ('source', 'update', None),
+        ('query_row_limit', 'update', None),
+        ('dimension', 'update', 'region'),
+        ('dimension', 'create', 'brand'),
+    ]
+    gql_client._endpoint.assert_called_once()
+    document, variables = gql_client._endpoint.call_args.args
+    assert 'change_4: createDimension' in str(document)
+    assert variables['change1SourceTable'] == 'fact_sales'
+    assert variables['change1SourceSql'] == 'select * from fact_sales'
+    # a source change resends the current alias, so the fetched state must include it
+    assert variables['change1DerivedTableAlias'] == 'sales'
+    assert 'derivedTableAlias' in str(Operations.query.get_dataset2)
+    assert variables['change4Dimension']['dataType'] == 'string'
+
+
+def test_apply_dataset_reports_each_failure_and_deletes_when_asked():
+    gql_client, data = _make_apply_client(errors=[{'message': 'in use', 'path': ['change_0']}])
+
+    result = data.apply_dataset({'datasetId': _DATASET_ID, 'kShotLimit': 5,
+                                 'dimensions': [{'id': 'region', 'name': 'region'}]}, delete_missing=True)
+
+    assert not result.success
+    assert [(c.target, c.action, c.object_id, c.success, c.error) for c in result.changes] == [
+        ('kshot_limit', 'update', None, False, 'in use'),
+        ('dimension', 'delete', 'channel', True, None),
+    ]
+
+
+def test_apply_dataset_dry_run_and_no_changes():
+    gql_client, data = _make_apply_client()
+
+    planned = data.apply_dataset({'datasetId': _DATASET_ID, 'useDatabaseCasing': True}, dry_run=True)
+    unchanged = data.apply_dataset({'datasetId': _DATASET_ID, 'name': 'Sales'})
+
+    assert planned.success and [c.target for c in planned.changes] == ['use_database_casing']
+    assert unchanged.success and unchanged.changes == []
+    gql_client._endpoint.assert_not_called()
+
+
+def test_apply_dataset_marks_unconfirmed_changes_when_response_is_nulled():
+    gql_client, data = _make_apply_client()
+    gql_client._endpoint.side_effect = lambda document, variables: {
+        'data': None, 'errors': [{'message': 'boom', 'path': ['change_1']}]}
+
+    result = data.apply_dataset({'datasetId': _DATASET_ID, 'name': 'Orders', 'kShotLimit': 5})
+
+    assert [(c.target, c.success) for c in result.changes] == [('name', False), ('kshot_limit', False)]
+    assert result.changes[0].error.startswith('Outcome unknown')
+    assert result.changes[1].error == 'boom'
+
+
+# ---------------------------------------------------------------------------
+# Bulk dimension and metric mutations
+# ---------------------------------------------------------------------------
+
+def test_create_dimensions_chunks_requests_and_reports_per_item():
+    gql_client, data = _make_apply_client(errors=[{'message': 'duplicate id', 'path': ['change_1']}])
+    dimensions = [{'id': f'dim_{i}', 'name': f'dim_{i}', 'dataType': 'STRING'} for i in range(5)]
+
+    result = data.create_dimensions(_DATASET_ID, dimensions, batch_size=2, max_workers=2)
+
+    assert gql_client._endpoint.call_count == 3
+    assert not result.success
+    assert [(c.object_id, c.success) for c in result.changes] == [
+        ('dim_0', True), ('dim_1', False), ('dim_2', True), ('dim_3', False), ('dim_4', True),
+    ]
+    assert all(args['change0Dimension']['dataType'] == 'string'
+               for args in (call.args[1] for call in gql_client._endpoint.call_args_list))
+    assert dimensions[0]['dataType'] == 'STRING'
+
+
+def test_delete_metrics_in_one_request():
+    gql_client, data = _make_apply_client()
+
+    result = data.delete_metrics(_DATASET_ID, ['sales', 'tax'])
+
+    assert result.success
+    document, variables = gql_client._endpoint.call_args.args
+    assert 'mutation DeleteMetrics' in str(document)
+    assert variables == {'change0DatasetId': _DATASET_ID, 'change0MetricId': 'sales',
+                         'change1DatasetId': _DATASET_ID, 'change1MetricId': 'tax'}
+
+
+def test_bulk_mutation_request_failure_marks_every_item():
+    gql_client, data = _make_apply_client()
+    gql_client._endpoint.side_effect = Exception('connection reset')
+
+    result = data.update_metrics(_DATASET_ID, [{'id': 'sales'}, {'id': 'tax'}])
+
+    assert not result.success
+    assert [(c.action, c.success, c.error) for c in result.changes] == [
+        ('update', False, 'connection reset'), ('update', False, 'connection reset'),
+    ]
+
+
+# ---------------------------------------------------------------------------
+# K-shot import and export
+# ---------------------------------------------------------------------------
+
+def _existing_kshots():
+    from answer_rocket.graphql.schema import DatasetKShot
+
+    return [
+        DatasetKShot({'datasetKShotId': 'a1a1a1a1-0000-0000-0000-000000000001', 'datasetId': _DATASET_ID,
+                      'question': 'Total sales by region', 'sql': 'select 1', 'title': 'Sales',
+                      'visualization': {'type': 'bar'}, 'isActive': True,
+                      'sampleData': {'datasetKShotId': 'a1a1a1a1-0000-0000-0000-000000000001', 'columns': [], 'rows': []}}),
+        DatasetKShot({'datasetKShotId': 'a1a1a1a1-0000-0000-0000-000000000002', 'datasetId': _DATASET_ID,
+                      'question': 'Top products', 'sql': 'select 2', 'isActive': True}),
+    ]
+
+
+def test_import_dataset_kshots_diffs_against_existing():
+    gql_client, data = _make_apply_client()
+    data.iter_dataset_kshots = MagicMock(return_value=_existing_kshots())
+
+    result = data.import_dataset_kshots(_DATASET_ID, [
+        {'datasetKShotId': 'a1a1a1a1-0000-0000-0000-000000000001', 'question': 'Total sales by region',
+         'sql': 'select 1', 'visualization': {'type': 'bar'}},                      # unchanged
+        {'question': 'Top products', 'sql': 'select 3', 'title': 'Products'},      # matched by question
+        {'question': 'Monthly trend', 'sql': 'select 4'},                          # new
+    ])
+
+    assert result.success
+    assert result.unchanged == 1
+    assert [(c.target, c.action, c.object_id) for c in result.changes] == [
+        ('sql', 'update', 'a1a1a1a1-0000-0000-0000-000000000002'),
+        ('title', 'update', 'a1a1a1a1-0000-0000-0000-000000000002'),
+        ('kshot', 'create', None),
+    ]
+    gql_client._endpoint.assert_called_once()
+    variables = gql_client._endpoint.call_args.args[1]
+    assert variables['change2DatasetKShot'] == {'question': 'Monthly trend', 'sql': 'select 4', 'datasetId': _DATASET_ID}
+
+
+def test_export_then_import_round_trip_is_a_no_op(tmp_path):
+    gql_client, data = _make_apply_client()
+    data.iter_dataset_kshots = MagicMock(side_effect=lambda *args, **kwargs: iter(_existing_kshots()))
+    path = tmp_path / 'kshots.jsonl'
+
+    assert data.export_dataset_kshots(_DATASET_ID, path) == 2
+    assert 'sampleData' not in path.read_text()
+
+    result = data.import_dataset_kshots(_DATASET_ID, path)
+
+    assert result.success and result.changes == [] and result.unchanged == 2
+    gql_client._endpoint.assert_not_called()
+
+
+def test_read_records_from_dataframe_parses_json_columns():
+    import pandas as pd
+    from answer_rocket.util.records import read_records
+
+    df = pd.DataFrame([{'question': 'q', 'title': None, 'visualization': '{"type": "line"}'},
+                       {'question': 'r', 'title': float('nan'), 'visualization': None}])
+
+    assert read_records(df, json_columns=('visualization',)) == [
+        {'question': 'q', 'title': None, 'visualization': {'type': 'line'}},
+        {'question': 'r', 'title': None, 'visualization': None},
+    ]
+
+
+def test_read_records_keeps_json_strings_from_json_lines(tmp_path):
+    from answer_rocket.util.records import read_records, write_records
+
+    path = tmp_path / 'kshots.jsonl'
+    write_records([{'question': 'q', 'visualization': '{"type": "line"}'}, {'question': 'r', 'visualization': 'bar'}], path)
+
+    assert [record['visualization'] for record in read_records(path, json_columns=('visualization',))] == [
+        '{"type": "line"}', 'bar']
+
+
+# ---------------------------------------------------------------------------
+# Memoized SQL generation
+# ---------------------------------------------------------------------------
+
+def _make_sql_gen_client():
+    from sgqlc.operation import Operation
+    from answer_rocket.data import ExecuteSqlQueryResult
+    from answer_rocket.graphql.schema import Dataset, Query
+
+    _, gql_client, data = _make_client()
+    state = {'name': 'sales', 'executed': []}
+
+    def submit(operation, variables):
+        return operation + {'data': {'runMaxSqlGen': {
+            'success': True, 'code': None, 'error': None, 'sql': 'select 1', 'rowLimit': 100, 'data': None,
+        }}}
+
+    def execute_sql_query(database_id, sql_query, row_limit=None, copilot_id=None, copilot_skill_id=None):
+        state['executed'].append((database_id, sql_query, row_limit))
+        return ExecuteSqlQueryResult(success=True)
+
+    gql_client.query.side_effect = lambda variables=None: Operation(Query, variables=variables)
+    gql_client.submit.side_effect = submit
+    data.get_dataset2 = lambda dataset_id: Dataset({'datasetId': _DATASET_ID, 'databaseId': 'db-1', 'name': state['name']})
+    data.execute_sql_query = execute_sql_query
+
+    return gql_client, data, state
+
+
+def test_cached_sql_gen_skips_generation_and_executes_directly():
+    gql_client, data, state = _make_sql_gen_client()
+    pre_query = {'metrics': ['sales'], 'filters': {'region': 'west', 'year': 2024}}
+
+    first = data.run_max_sql_gen(_DATASET_ID, pre_query, execute_sql=False, use_cache=True)
+    second = data.run_max_sql_gen(_DATASET_ID, {'filters': {'year': 2024, 'region': 'west'}, 'metrics': ['sales']},
+                                  use_cache=True)
+
+    assert first.sql == second.sql == 'select 1'
+    assert gql_client.submit.call_count == 1
+    assert state['executed'] == [('db-1', 'select 1', 100)]
+
+
+def test_cached_sql_gen_is_dropped_when_the_dataset_changes(monkeypatch):
+    import answer_rocket.data as data_module
+
+    gql_client, data, state = _make_sql_gen_client()
+    monkeypatch.setattr(data_module, 'SQL_GEN_CACHE_REVALIDATE_SECONDS', 0)
+
+    data.run_max_sql_gen(_DATASET_ID, {'metrics': ['sales']}, execute_sql=False, use_cache=True)
+    data.run_max_sql_gen(_DATASET_ID, {'metrics': ['sales']}, execute_sql=False, use_cache=True)
+    assert gql_client.submit.call_count == 1
+
+    state['name'] = 'sales v2'
+    data.run_max_sql_gen(_DATASET_ID, {'metrics': ['sales']}, execute_sql=False, use_cache=True)
+    assert gql_client.submit.call_count == 2
+
+
+# ---------------------------------------------------------------------------
+# Tracked dimension values
+# ---------------------------------------------------------------------------
+
+def _make_tracked_client(total=23):
+    import threading
+    from answer_rocket.graphql.sdk_operations import Operations
+
+    _, gql_client, data = _make_client()
+    calls = []
+    lock = threading.Lock()
+
+    def submit(operation, variables):
+        with lock:
+            calls.append(copy.deepcopy(variables))
+        # simulate a request that consumes its variables
+        variables['filters'].clear()
+        rows = [{
+            'watchSetId': f'00000000-0000-0000-0000-{i:012d}', 'userId': _DATASET_ID, 'datasetId': _DATASET_ID,
+            'tuples': [{'dimensionAttributeId': 'region', 'dimensionName': 'Region', 'value': f'r{i}'}],
+            'tuplesKey': f'r{i}', 'isTracked': True,
+        } for i in range(variables['offset'], min(variables['offset'] + variables['limit'], total))]
+        return operation + {'data': {'getAllTrackedDimensionValues': {'totalCount': total, 'rows': rows}}}
+
+    gql_client.submit.side_effect = submit
+
+    return data, calls
+
+
+def test_iter_all_tracked_dimension_values_walks_every_page_with_the_same_models():
+    data, calls = _make_tracked_client()
+    filters = {'status': {'filterType': 'text', 'type': 'equals', 'filter': 'tracked'}}
+    sort = [{'colId': 'starredUtc', 'sort': 'desc'}]
+
+    rows = list(data.iter_all_tracked_dimension_values(filters=filters, sort=sort, page_size=5))
+
+    assert [row.tuples_key for row in rows] == [f'r{i}' for i in range(23)]
+    assert sorted(call['offset'] for call in calls) == [0, 5, 10, 15, 20]
+    assert all(call['filters'] == filters and call['sort'] == sort for call in calls)
+    assert filters['status']['filter'] == 'tracked'
+
+
+def test_export_tracked_dimension_values_writes_every_row(tmp_path):
+    import json
+
+    data, _ = _make_tracked_client(total=12)
+    path = tmp_path / 'tracked.jsonl'
+
+    count = data.export_tracked_dimension_values(path, filters={}, page_size=5)
+    records = [json.loads(line) for line in open(path)]
+
+    assert count == 12 == len(records)
+    assert records[3]['tuples'][0]['value'] == 'r3'
+
+    df = data.get_all_tracked_dimension_values_df(filters={}, page_size=5)
+    assert len(df) == 12
+    assert df.columns[0] == 'watchSetId'
+
+
+# ---------------------------------------------------------------------------
+# run_sql_ai batches
+# ---------------------------------------------------------------------------
+
+def _make_sql_ai_client(fail_model=None, raise_question=None):
+    import threading
+    from answer_rocket.data import RunSqlAiResult, create_df_from_data
+
+    _, _, data = _make_client()
+    calls = []
+    lock = threading.Lock()
+
+    def run_sql_ai(dataset_id=None, question='', model_override=None, copilot_id=None, dataset_ids=None, database_id=None):
+        with lock:
+            calls.append((question, model_override))
+        if question == raise_question:
+            raise RuntimeError('connection lost')
+        if model_override == fail_model:
+            return RunSqlAiResult(success=False, error='model unavailable')
+        payload = {'columns': [{'name': 'n'}], 'rows': [{'data': [len(question)]}]}
+        result = RunSqlAiResult(success=True, sql=f'select {len(question)}', timing_info={'total': 1.5, 'stages': []})
+        result.data = payload
+        result.df = create_df_from_data(payload)
+        return result
+
+    data.run_sql_ai = run_sql_ai
+
+    return data, calls
+
+
+def test_run_sql_ai_batch_collects_a_tidy_frame_in_input_order():
+    data, calls = _make_sql_ai_client()
+    questions = ['total sales', 'sales by region', 'top products']
+
+    results = data.run_sql_ai_batch(questions, ['model-a', 'model-b'], dataset_id=_DATASET_ID, max_workers=4)
+
+    assert len(calls) == 6
+    assert list(zip(results['question'], results['model_override'])) == [
+        (q, m) for q in questions for m in ['model-a', 'model-b']]
+    assert results['success'].all()
+    assert results['timing_total'].tolist() == [1.5] * 6
+    assert results['df'][0]['n'].tolist() == [len('total sales')]
+    assert 'timing_stages' not in results.columns
+
+
+def test_run_sql_ai_batch_runs_each_distinct_question_once():
+    data, calls = _make_sql_ai_client()
+
+    results = data.run_sql_ai_batch(['q1', 'q2', 'q1'], ['model-a', 'model-a'])
+
+    assert sorted(calls) == [('q1', 'model-a'), ('q2', 'model-a')]
+    assert results['question'].tolist() == ['q1', 'q2']
+
+
+def test_run_sql_ai_batch_stops_queued_runs_when_one_raises():
+    data, calls = _make_sql_ai_client(raise_question='q0')
+
+    with pytest.raises(RuntimeError):
+        data.run_sql_ai_batch([f'q{i}' for i in range(20)], max_workers=1)
+
+    assert len(calls) <= 2
+
+
+def test_run_sql_ai_batch_resumes_from_its_file_and_retries_failures(tmp_path):
+    path = tmp_path / 'sweep.jsonl'
+    data, calls = _make_sql_ai_client(fail_model='model-b')
+
+    first = data.run_sql_ai_batch(['q1', 'q2'], ['model-a', 'model-b'], path=path)
+    assert first['success'].tolist() == [True, False, True, False]
+
+    data, calls = _make_sql_ai_client()
+    second = data.run_sql_ai_batch(['q1', 'q2'], ['model-a', 'model-b'], path=path)
+
+    assert sorted(calls) == [('q1', 'model-b'), ('q2', 'model-b')]
+    assert second['success'].all()
+    assert second['df'][0]['n'].tolist() == [2]
@@ -0,0 +1,104 @@
+"""Tests for the local DatasetIndex over MaxDataset domain objects."""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from answer_rocket.graphql.schema import MaxDataset
+from answer_rocket.util import DatasetIndex
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _attribute(typename, entity, name, label, synonyms=()):
+    return {
+        '__typename': typename, 'type': typename, 'id': f'{entity}__{name}', 'name': name,
+        'outputLabel': label, 'synonyms': list(synonyms),
+    }
+
+
+_DATASET_JSON = {
+    'datasetId': '0c6f9d0e-7a4f-4cf1-9a53-0f5c1f7f1d10',
+    'name': 'Distributor Sales',
+    'domainObjects': [
+        {
+            '__typename': 'MaxFactEntity', 'type': 'MaxFactEntity', 'id': 'transactions', 'name': 'transactions',
+            'outputLabel': 'Transactions', 'synonyms': ['txns'],
+            'attributes': [
+                _attribute('MaxMetricAttribute', 'transactions', 'sales', 'Sales', ['Revenue']),
+                _attribute('MaxNormalAttribute', 'transactions', 'region', 'Sales Region'),
+            ],
+        },
+        {
+            '__typename': 'MaxDimensionEntity', 'type': 'MaxDimensionEntity', 'id': 'product', 'name': 'product',
+            'outputLabel': 'Product', 'synonyms': [],
+            'attributes': [
+                _attribute('MaxPrimaryAttribute', 'product', 'name', 'Product Name', ['sku name']),
+                _attribute('MaxNormalAttribute', 'product', 'region', 'Origin Region'),
+            ],
+        },
+        {
+            '__typename': 'MaxCalculatedMetric', 'type': 'MaxCalculatedMetric', 'id': 'net_sales', 'name': 'net_sales',
+            'outputLabel': 'Net Sales', 'synonyms': ['revenue'],
+        },
+    ],
+}
+
+
+def _make_index():
+    return DatasetIndex(MaxDataset(_DATASET_JSON))
+
+
+# ---------------------------------------------------------------------------
+# Lookups
+# ---------------------------------------------------------------------------
+
+def test_lookup_by_id_and_rql_name():
+    index = _make_index()
+
+    assert index.get_by_id('transactions__sales').name == 'sales'
+    assert index.get_by_rql_name('transactions.sales').id == 'transactions__sales'
+    assert index.get_by_rql_name('transactions').id == 'transactions'
+    assert index.get_by_rql_name('net_sales').id == 'net_sales'
+    assert len(index) == 7
+
+
+def test_lookup_is_case_and_whitespace_insensitive():
+    index = _make_index()
+
+    assert index.get('  Transactions.SALES ').id == 'transactions__sales'
+    assert index.get('sales   region').id == 'transactions__region'
+    assert index.get('SKU Name').id == 'product__name'
+
+
+def test_ambiguous_names_return_all_candidates_in_priority_order():
+    index = _make_index()
+
+    assert [o.id for o in index.find_all('region')] == ['transactions__region', 'product__region']
+    # 'revenue' is a synonym of both; an exact id or rql name always wins over synonyms
+    assert [o.id for o in index.find_all('revenue')] == ['transactions__sales', 'net_sales']
+    assert index.get('net_sales').id == 'net_sales'
+
+
+def test_missing_reference():
+    index = _make_index()
+
+    assert index.get('nope') is None
+    assert 'nope' not in index
+    assert 'txns' in index
+
+
+# ---------------------------------------------------------------------------
+# Adjacency
+# ---------------------------------------------------------------------------
+
+def test_entity_attribute_adjacency():
+    index = _make_index()
+
+    assert [a.id for a in index.attributes_of('transactions')] == ['transactions__sales', 'transactions__region']
+    assert index.entity_of('transactions.sales').id == 'transactions'
+    assert index.entity_of('net_sales') is None
+    assert index.attributes_of('net_sales') == []
+    assert index.rql_name_of(index.get_by_id('product__name')) == 'product.name'
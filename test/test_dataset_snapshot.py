@@ -0,0 +1,106 @@
+"""Tests for dataset snapshot export and warm-start loading."""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gzip
+import json
+from unittest.mock import MagicMock
+
+from answer_rocket.client_config import ClientConfig
+from answer_rocket.data import Data
+from answer_rocket.graphql.schema import Dataset, MaxDataset
+from answer_rocket.util import DatasetSnapshot
+
+_DATASET_ID = '0c6f9d0e-7a4f-4cf1-9a53-0f5c1f7f1d10'
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _dataset_json(name='Distributor Sales'):
+    return {
+        'datasetId': _DATASET_ID,
+        'name': name,
+        'domainObjects': [
+            {
+                '__typename': 'MaxFactEntity', 'type': 'MaxFactEntity', 'id': 'transactions', 'name': 'transactions',
+                'attributes': [
+                    {'__typename': 'MaxMetricAttribute', 'type': 'MaxMetricAttribute', 'id': 'transactions__sales',
+                     'name': 'sales'},
+                ],
+            },
+            {'__typename': 'MaxCalculatedMetric', 'type': 'MaxCalculatedMetric', 'id': 'net_sales', 'name': 'net_sales'},
+        ],
+    }
+
+
+def _make_client(name='Distributor Sales'):
+    config = MagicMock(spec=ClientConfig)
+    config.copilot_id = None
+    config.copilot_skill_id = None
+    data = Data(config, MagicMock())
+    state = {'name': name, 'full_fetches': 0}
+
+    def get_dataset(dataset_id, copilot_id=None, include_dim_values=False):
+        state['full_fetches'] += 1
+        return MaxDataset(_dataset_json(state['name']))
+
+    data.get_dataset = get_dataset
+    data.get_dataset2 = lambda dataset_id: Dataset({'datasetId': _DATASET_ID, 'name': state['name']})
+
+    return data, state
+
+
+# ---------------------------------------------------------------------------
+# Snapshots
+# ---------------------------------------------------------------------------
+
+def test_snapshot_round_trip_keeps_domain_object_classes(tmp_path):
+    path = tmp_path / 'sales.snapshot'
+    data, _ = _make_client()
+
+    written = data.export_dataset_snapshot(_DATASET_ID, path)
+    loaded = DatasetSnapshot.load(path)
+
+    assert loaded.stamp == written.stamp == data.get_dataset_stamp(_DATASET_ID)
+    assert loaded.dataset_id == _DATASET_ID
+    entity, metric = loaded.dataset.domain_objects
+    assert type(entity).__name__ == 'MaxFactEntity'
+    assert type(entity.attributes[0]).__name__ == 'MaxMetricAttribute'
+    assert type(metric).__name__ == 'MaxCalculatedMetric'
+
+
+def test_other_format_versions_are_treated_as_missing(tmp_path):
+    path = tmp_path / 'sales.snapshot'
+
+    with gzip.open(path, 'wb') as f:
+        f.write(json.dumps({'format': 'answer-rocket-dataset-snapshot', 'version': 0, 'dataset': {}}).encode())
+
+    assert DatasetSnapshot.load(path) is None
+    assert DatasetSnapshot.load(tmp_path / 'missing.snapshot') is None
+
+
+def test_load_only_refetches_when_the_stamp_changes(tmp_path):
+    path = tmp_path / 'sales.snapshot'
+    data, state = _make_client()
+    data.export_dataset_snapshot(_DATASET_ID, path)
+
+    assert data.load_dataset_snapshot(path, revalidate=True).name == 'Distributor Sales'
+    assert state['full_fetches'] == 1
+
+    state['name'] = 'Distributor Sales v2'
+    assert data.load_dataset_snapshot(path, revalidate=True).name == 'Distributor Sales v2'
+    assert state['full_fetches'] == 2
+    assert DatasetSnapshot.load(path).dataset.name == 'Distributor Sales v2'
+
+
+def test_missing_snapshot_is_exported_when_the_dataset_id_is_given(tmp_path):
+    path = tmp_path / 'sales.snapshot'
+    data, state = _make_client()
+
+    assert data.load_dataset_snapshot(path) is None
+    assert data.load_dataset_snapshot(path, dataset_id=_DATASET_ID).name == 'Distributor Sales'
+    assert os.path.exists(path)
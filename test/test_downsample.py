@@ -0,0 +1,113 @@
+"""Tests for chart-aware downsampling of visualization payloads."""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import math
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from answer_rocket.client_config import ClientConfig
+from answer_rocket.data import Data
+from answer_rocket.util.downsample import lttb_indices, minmax_indices, payload_bytes, reduce_visualization_data
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+_START = datetime(2024, 1, 1)
+
+
+def _time_series(count=20000, regions=('north', 'south', 'east')):
+    rows = []
+
+    for i in range(count):
+        spike = 100.0 if i == 7777 else 0.0
+        rows.append({'data': [(_START + timedelta(minutes=i)).isoformat(), regions[i % len(regions)],
+                              math.sin(i / 300) + spike, i]})
+
+    return {'columns': [{'name': 'ts'}, {'name': 'region'}, {'name': 'sales'}, {'name': 'units'}], 'rows': rows}
+
+
+def _categories(count=500):
+    return {
+        'columns': [{'name': 'product'}, {'name': 'sales'}],
+        'rows': [{'data': [f'product {i}', float(i)]} for i in range(count)],
+    }
+
+
+# ---------------------------------------------------------------------------
+# Point selection
+# ---------------------------------------------------------------------------
+
+def test_lttb_keeps_endpoints_and_spikes():
+    x = np.arange(10000, dtype=float)
+    y = np.sin(x / 100)
+    y[4321] = 50
+
+    indices = lttb_indices(x, y, 200)
+
+    assert len(indices) == 200
+    assert indices[0] == 0 and indices[-1] == 9999
+    assert 4321 in indices
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_minmax_keeps_extremes_of_each_bucket():
+    y = np.zeros(1000)
+    y[10], y[990] = -5, 5
+
+    indices = minmax_indices(y, 20)
+
+    assert 10 in indices and 990 in indices
+    assert len(indices) <= 20
+
+
+# ---------------------------------------------------------------------------
+# Payload reduction
+# ---------------------------------------------------------------------------
+
+def test_time_series_is_downsampled_per_series_and_shrinks_payload():
+    data = _time_series()
+
+    reduced = reduce_visualization_data(data, max_rows=600)
+
+    assert len(reduced['rows']) <= 600
+    assert reduced['columns'] == data['columns']
+    assert {row['data'][1] for row in reduced['rows']} == {'north', 'south', 'east'}
+    assert 100 < max(row['data'][2] for row in reduced['rows'])
+    assert all(isinstance(row['data'][3], int) for row in reduced['rows'])
+    assert payload_bytes(reduced) * 20 < payload_bytes(data)
+    assert len(data['rows']) == 20000
+
+
+def test_categories_beyond_top_n_are_bucketed_into_other():
+    reduced = reduce_visualization_data(_categories(), max_rows=100, top_n=5)
+    products = [row['data'][0] for row in reduced['rows']]
+
+    assert set(products[:5]) == {f'product {i}' for i in range(495, 500)}
+    assert products[-1] == 'Other'
+    assert reduced['rows'][-1]['data'][1] == sum(range(495))
+
+
+def test_sample_mode_and_small_payloads():
+    data = _categories()
+
+    assert reduce_visualization_data(data, max_rows=1000) is data
+    assert len(reduce_visualization_data(data, max_rows=50, reduction='sample')['rows']) == 50
+
+
+def test_generate_visualization_uploads_reduced_data():
+    config = MagicMock(spec=ClientConfig)
+    config.copilot_id = None
+    config.copilot_skill_id = None
+    gql_client = MagicMock()
+    data = Data(config, gql_client)
+
+    data.generate_visualization(_categories(), {}, max_rows=20, reduction='top_n')
+
+    uploaded = gql_client.submit.call_args[0][1]['data']
+    assert len(uploaded['rows']) == 11
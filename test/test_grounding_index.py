@@ -0,0 +1,110 @@
+"""Tests for the offline GroundingIndex over dimension values."""
+
+import copy
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from answer_rocket.graphql.schema import GroundedValueResponse, MaxDataset
+from answer_rocket.util import GroundingIndex
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _dimension(entity, name, values, mappings=()):
+    return {
+        '__typename': 'MaxNormalAttribute', 'type': 'MaxNormalAttribute', 'id': f'{entity}__{name}', 'name': name,
+        'dimensionValues': list(values),
+        'dimensionValueMappingList': [{'value': v, 'mappedValues': list(m)} for v, m in mappings],
+    }
+
+
+_DATASET_JSON = {
+    'datasetId': '0c6f9d0e-7a4f-4cf1-9a53-0f5c1f7f1d10',
+    'name': 'Distributor Sales',
+    'domainObjects': [
+        {
+            '__typename': 'MaxDimensionEntity', 'type': 'MaxDimensionEntity', 'id': 'product', 'name': 'product',
+            'attributes': [
+                _dimension('product', 'brand', ['Coca-Cola', 'Pepsi', 'Sprite', 'Dr Pepper'], [('Coca-Cola', ['coke'])]),
+                _dimension('product', 'region', ['North East', 'South West', 'Pepsi Country']),
+            ],
+        },
+    ],
+}
+
+
+def _make_index():
+    return GroundingIndex.from_dataset(MaxDataset(copy.deepcopy(_DATASET_JSON)))
+
+
+# ---------------------------------------------------------------------------
+# Grounding
+# ---------------------------------------------------------------------------
+
+def test_exact_match_is_case_and_whitespace_insensitive():
+    result = _make_index().ground('  dr   PEPPER ')
+
+    assert isinstance(result, GroundedValueResponse)
+    assert result.matched_value == 'Dr Pepper'
+    assert result.match_type == 'EXACT'
+    assert result.match_quality == 1.0
+    assert result.dimension_name == 'brand'
+    assert result.mapped_indicator is False
+
+
+def test_fuzzy_match_ranks_alternatives():
+    result = _make_index().ground('coca cola')
+
+    assert result.matched_value == 'Coca-Cola'
+    assert result.match_type == 'FUZZY'
+    assert 0.3 <= result.match_quality < 1.0
+
+
+def test_mapped_alias_resolves_to_dimension_value():
+    result = _make_index().ground('Coke')
+
+    assert result.matched_value == 'Coca-Cola'
+    assert result.mapped_indicator is True
+    assert result.mapped_value == 'coke'
+
+
+def test_dimension_filter():
+    index = _make_index()
+
+    assert index.ground('pepsi').dimension_name == 'brand'
+    assert [m.value for m in index.ground('pepsi').other_matches] == ['Pepsi Country']
+    assert index.ground('pepsi', dimension_name='Region').matched_value == 'Pepsi Country'
+    assert index.ground('pepsi', dimension_name='nope').matched_value is None
+
+
+def test_no_match_below_threshold():
+    result = _make_index().ground('zzzz')
+
+    assert result.matched_value is None
+    assert result.other_matches == []
+
+
+def test_ground_many_keeps_order():
+    results = _make_index().ground_many(['sprite', 'north east', 'sprite'])
+
+    assert [r.matched_value for r in results] == ['Sprite', 'North East', 'Sprite']
+
+
+# ---------------------------------------------------------------------------
+# Persistence
+# ---------------------------------------------------------------------------
+
+def test_save_and_load_round_trip(tmp_path):
+    index = _make_index()
+    path = tmp_path / 'grounding.npz'
+
+    index.save(path)
+    loaded = GroundingIndex.load(path)
+
+    assert len(loaded) == len(index)
+    assert loaded.dimension_names == ['brand', 'region']
+    assert loaded.ground('cocacola').matched_value == 'Coca-Cola'
+    assert loaded.ground('coke').mapped_value == 'coke'
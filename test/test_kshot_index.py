@@ -0,0 +1,113 @@
+"""Tests for the local k-shot similarity index."""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from answer_rocket.graphql.schema import DatasetKShot, GenerateEmbeddingsResponse
+from answer_rocket.util import KShotIndex
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _embed(texts):
+    """Deterministic bag-of-letters embedding: similar wording gives similar vectors."""
+    vectors = []
+    for text in texts:
+        vector = [0.0] * 26
+        for char in text.lower():
+            if 'a' <= char <= 'z':
+                vector[ord(char) - ord('a')] += 1
+        vectors.append(vector)
+    return vectors
+
+
+def _kshot(kshot_id, question):
+    return DatasetKShot({'datasetKShotId': kshot_id, 'question': question})
+
+
+_KSHOTS = [
+    _kshot('00000000-0000-0000-0000-000000000001', 'Total sales by region'),
+    _kshot('00000000-0000-0000-0000-000000000002', 'Sales total by region'),
+    _kshot('00000000-0000-0000-0000-000000000003', 'Top ten products this quarter'),
+]
+
+
+# ---------------------------------------------------------------------------
+# Indexing and queries
+# ---------------------------------------------------------------------------
+
+def test_query_and_near_duplicates():
+    index = KShotIndex(_embed)
+    index.update(_KSHOTS)
+
+    top = index.query('products in the top ten', k=1)
+    assert top[0][0] == '00000000-0000-0000-0000-000000000003'
+
+    duplicates = index.near_duplicates(threshold=0.99)
+    assert [(a, b) for a, b, _ in duplicates] == [
+        ('00000000-0000-0000-0000-000000000001', '00000000-0000-0000-0000-000000000002'),
+    ]
+
+
+def test_update_only_embeds_new_or_changed_questions():
+    embed = MagicMock(side_effect=_embed)
+    index = KShotIndex(embed, batch_size=2)
+
+    assert index.update(_KSHOTS) == 3
+    assert embed.call_count == 2  # two batches
+
+    embed.reset_mock()
+    changed = [_KSHOTS[0], _kshot('00000000-0000-0000-0000-000000000002', 'Monthly revenue trend')]
+
+    assert index.update(changed) == 1
+    embed.assert_called_once_with(['Monthly revenue trend'])
+    assert index.query('revenue by month', k=1)[0][0] == '00000000-0000-0000-0000-000000000002'
+
+
+def test_sync_removes_missing_kshots():
+    index = KShotIndex(_embed)
+    index.update(_KSHOTS)
+
+    assert index.sync(_KSHOTS[1:]) == (0, 1)
+    assert index.ids == ['00000000-0000-0000-0000-000000000002', '00000000-0000-0000-0000-000000000003']
+    assert '00000000-0000-0000-0000-000000000001' not in index
+
+
+def test_using_llm_maps_embeddings_by_text():
+    llm = MagicMock()
+    llm.generate_embeddings.side_effect = lambda texts, model: GenerateEmbeddingsResponse({
+        'success': True,
+        'embeddings': [{'text': t, 'vector': v} for t, v in reversed(list(zip(texts, _embed(texts))))],
+    })
+
+    index = KShotIndex.using_llm(llm, model_override='text-embedding-3-small')
+    index.update(_KSHOTS)
+
+    assert index.query('Top ten products this quarter', k=1)[0][2] > 0.999
+    assert llm.generate_embeddings.call_args.args[1] == 'text-embedding-3-small'
+
+
+# ---------------------------------------------------------------------------
+# Persistence
+# ---------------------------------------------------------------------------
+
+def test_save_and_memory_mapped_load(tmp_path):
+    index = KShotIndex(_embed, dtype=np.float16)
+    index.update(_KSHOTS)
+    index.save(tmp_path / 'kshots')
+
+    loaded = KShotIndex.load(tmp_path / 'kshots', _embed)
+
+    assert isinstance(loaded._vectors, np.memmap)
+    assert loaded._vectors.dtype == np.float16
+    assert loaded.query('top products', k=1)[0][0] == '00000000-0000-0000-0000-000000000003'
+
+    loaded.update([_kshot('00000000-0000-0000-0000-000000000004', 'Average order value')])
+    assert len(loaded) == 4
@@ -0,0 +1,69 @@
+"""Tests for the run_sql_ai / chat pipeline latency report."""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from answer_rocket.data import RunSqlAiResult
+from answer_rocket.graphql.schema import MaxChatEntry
+from answer_rocket.util import LatencyReport
+from answer_rocket.util.latency import flatten_timings
+
+# ---------------------------------------------------------------------------
+# Flattening
+# ---------------------------------------------------------------------------
+
+
+def test_flatten_timings_handles_nested_dicts_and_named_lists():
+    timings = {
+        'prompt_render': 0.1,
+        'llm': {'total': 2.0, 'ttft': 0.4},
+        'steps': [{'name': 'sql_execution', 'duration': 0.7}, {'other': 3}],
+        'note': 'ignored',
+    }
+
+    assert flatten_timings(timings) == [
+        ('prompt_render', 0.1), ('llm.total', 2.0), ('llm.ttft', 0.4),
+        ('steps.sql_execution', 0.7), ('steps.1.other', 3.0),
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Reports
+# ---------------------------------------------------------------------------
+
+def test_summary_gives_percentiles_per_model_and_stage_slowest_first():
+    report = LatencyReport()
+
+    for i in range(100):
+        report.add_result(RunSqlAiResult(success=True, timing_info={'llm': 1.0 + i / 100, 'sql': 0.1}), model='a')
+        report.add_result(RunSqlAiResult(success=True, timing_info={'llm': 3.0, 'sql': 0.2 + i / 1000}), model='b')
+
+    summary = report.summary()
+
+    assert len(report) == 200
+    assert list(summary.loc['a'].index) == ['llm', 'sql']
+    assert summary.loc[('a', 'llm'), 'count'] == 100
+    assert abs(summary.loc[('a', 'llm'), 'p50'] - 1.495) < 1e-9
+    assert summary.loc[('b', 'llm'), 'p99'] == 3.0
+    assert list(summary.columns) == ['count', 'mean', 'p50', 'p90', 'p99']
+
+
+def test_prior_runs_chat_entries_and_batches_are_collected():
+    report = LatencyReport()
+    prior = RunSqlAiResult(timing_info={'llm': 5.0})
+    report.add_result(RunSqlAiResult(success=True, timing_info={'llm': 1.0}, prior_runs=[prior]), model='a')
+    entry = MaxChatEntry({'id': '9a8d3f43-54d4-4b8c-9f55-9a1e1a0a7a11',
+                          'answer': {'hasFinished': True, 'chatPipelineProfile': {'skill': {'total': 4.0}}}})
+    report.add_chat_entry(entry, model='a')
+    report.add_chat_entry(MaxChatEntry({'id': '9a8d3f43-54d4-4b8c-9f55-9a1e1a0a7a12', 'answer': None}), model='a')
+    report.add_batch(pd.DataFrame([{'question': 'q', 'model_override': 'b', 'timing_info': {'llm': 2.0}}]))
+
+    frame = report.frame()
+
+    assert frame['attempt'].dropna().tolist() == [0, 1]
+    assert frame.loc[frame['source'] == 'chat', 'stage'].tolist() == ['skill.total']
+    assert frame.loc[frame['model'] == 'b', 'question'].tolist() == ['q']
+    assert LatencyReport().summary().empty
@@ -0,0 +1,79 @@
+"""Tests for the prefetching page iterator."""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+from types import SimpleNamespace
+
+from answer_rocket.util.paging import iter_paged_rows
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _make_fetcher(total, report_total=True):
+    calls = []
+    lock = threading.Lock()
+
+    def fetch_page(page_num, page_size):
+        with lock:
+            calls.append(page_num)
+        start = (page_num - 1) * page_size
+        rows = list(range(start, min(start + page_size, total)))
+        return SimpleNamespace(total_rows=total if report_total else None, rows=rows)
+
+    return fetch_page, calls
+
+
+# ---------------------------------------------------------------------------
+# Iteration
+# ---------------------------------------------------------------------------
+
+def test_known_total_yields_all_rows_in_order():
+    fetch_page, calls = _make_fetcher(23)
+
+    assert list(iter_paged_rows(fetch_page, page_size=5, prefetch_pages=3)) == list(range(23))
+    assert sorted(calls) == [1, 2, 3, 4, 5]
+
+
+def test_unknown_total_stops_at_short_page():
+    fetch_page, calls = _make_fetcher(12, report_total=False)
+
+    assert list(iter_paged_rows(fetch_page, page_size=5)) == list(range(12))
+    assert calls == [1, 2, 3]
+
+
+def test_unknown_total_with_exact_multiple_stops_at_empty_page():
+    fetch_page, calls = _make_fetcher(10, report_total=False)
+
+    assert list(iter_paged_rows(fetch_page, page_size=5)) == list(range(10))
+    assert calls == [1, 2, 3]
+
+
+def test_single_page_does_not_prefetch():
+    fetch_page, calls = _make_fetcher(3)
+
+    assert list(iter_paged_rows(fetch_page, page_size=5)) == [0, 1, 2]
+    assert calls == [1]
+
+
+def test_prefetch_is_bounded_when_consumer_stops_early():
+    fetch_page, calls = _make_fetcher(1000)
+    rows = iter_paged_rows(fetch_page, page_size=10, prefetch_pages=2)
+
+    assert [next(rows) for _ in range(3)] == [0, 1, 2]
+    rows.close()
+
+    assert max(calls) <= 3
+
+
+def test_error_page_without_rows_is_skipped():
+    def fetch_page(page_num, page_size):
+        if page_num == 2:
+            return SimpleNamespace()
+        return SimpleNamespace(total_rows=6, rows=[page_num] * 2)
+
+    assert list(iter_paged_rows(fetch_page, page_size=2)) == [1, 1, 3, 3]
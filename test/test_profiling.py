@@ -0,0 +1,113 @@
+"""Tests for pushdown table profiling."""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sqlite3
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+from answer_rocket.client_config import ClientConfig
+from answer_rocket.data import Data, ExecuteSqlQueryResult
+from answer_rocket.util.profiling import profile_dialect
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _make_connection():
+    connection = sqlite3.connect(':memory:')
+    connection.execute('create table orders (region text, units integer, "unit price" real)')
+    connection.executemany('insert into orders values (?, ?, ?)', [
+        ('west', 1, 2.5), ('west', 2, None), ('east', 3, 1.0), (None, 4, 1.0), ('west', 5, 9.0),
+    ])
+    return connection
+
+
+def _make_client(connection):
+    config = MagicMock(spec=ClientConfig)
+    config.copilot_id = None
+    config.copilot_skill_id = None
+    data = Data(config, MagicMock())
+    data.get_database = MagicMock(return_value=None)
+    queries = []
+
+    def execute_sql_query(database_id, sql_query, row_limit=None, copilot_id=None, copilot_skill_id=None):
+        queries.append(sql_query)
+        return ExecuteSqlQueryResult(success=True, df=pd.read_sql_query(sql_query, connection))
+
+    data.execute_sql_query = execute_sql_query
+
+    return data, queries
+
+
+# ---------------------------------------------------------------------------
+# Profiling
+# ---------------------------------------------------------------------------
+
+def test_profile_table_computes_column_stats_in_the_database():
+    data, queries = _make_client(_make_connection())
+
+    result = data.profile_table('db', 'orders', top_k=2)
+
+    assert result.success, result.error
+    assert len(queries) == 3
+    assert result.sql == queries
+
+    profile = result.df.set_index('column')
+    assert profile.index.tolist() == ['region', 'units', 'unit price']
+    assert profile.loc['region', 'rows'] == 5
+    assert profile.loc['region', 'nulls'] == 1
+    assert profile.loc['region', 'distinct'] == 2
+    assert profile.loc['units', 'min'] == 1 and profile.loc['units', 'max'] == 5
+    assert profile.loc['unit price', 'null_fraction'] == 0.2
+    assert profile.loc['region', 'top_values'] == [('west', 3), ('east', 1)]
+    assert len(profile.loc['units', 'top_values']) == 2
+
+
+def test_profile_table_with_given_columns_skips_discovery_and_top_values():
+    data, queries = _make_client(_make_connection())
+
+    result = data.profile_table('db', 'orders', columns=['units'], top_k=0, dbms='postgres')
+
+    assert result.success
+    assert len(queries) == 1
+    assert result.df['column'].tolist() == ['units']
+
+
+def test_profile_table_compares_min_max_as_strings_when_the_type_has_no_order():
+    data, queries = _make_client(_make_connection())
+    execute_sql_query = data.execute_sql_query
+
+    def execute_unorderable(database_id, sql_query, **kwargs):
+        if 'min("region")' in sql_query:
+            queries.append(sql_query)
+            return ExecuteSqlQueryResult(success=False, error='function min(boolean) does not exist', code=1)
+        return execute_sql_query(database_id, sql_query, **kwargs)
+
+    data.execute_sql_query = execute_unorderable
+
+    result = data.profile_table('db', 'orders', top_k=0)
+
+    assert result.success and result.error is None
+    assert 'min(cast("region" as varchar))' in queries[-1]
+    assert result.df.set_index('column').loc['region', 'min'] == 'east'
+
+
+def test_profile_table_reports_query_errors():
+    data, _ = _make_client(_make_connection())
+    data.execute_sql_query = MagicMock(return_value=ExecuteSqlQueryResult(success=False, error='no such table', code=1))
+
+    result = data.profile_table('db', 'missing')
+
+    assert not result.success
+    assert result.error == 'no such table'
+
+
+def test_dialect_is_chosen_from_dbms_name():
+    assert profile_dialect('Snowflake').distinct == 'approx_count_distinct({})'
+    assert profile_dialect('big_query').quote == '`{}`'
+    assert profile_dialect(None).distinct == 'count(distinct {})'
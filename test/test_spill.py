@@ -0,0 +1,99 @@
+"""Tests for spilling query results to memory-mapped column files."""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+
+from answer_rocket.client_config import ClientConfig
+from answer_rocket.data import Data
+from answer_rocket.util import SpilledResult
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+_COLUMNS = ['region', 'units', 'price', 'active', 'extra']
+
+
+def _rows(count=25):
+    regions = ['north', 'south', None]
+    return [[regions[i % 3], i, None if i % 5 == 0 else i / 2, i % 2 == 0, {'i': i}] for i in range(count)]
+
+
+# ---------------------------------------------------------------------------
+# Spilled results
+# ---------------------------------------------------------------------------
+
+def test_spilled_result_round_trips_values(tmp_path):
+    rows = _rows()
+    spilled = SpilledResult.write(_COLUMNS, rows, tmp_path / 'result', chunk_size=4)
+
+    df = SpilledResult.open(tmp_path / 'result').to_dataframe()
+    expected = pd.DataFrame(rows, columns=_COLUMNS)
+
+    assert len(spilled) == 25
+    assert df['units'].dtype == np.int64
+    assert isinstance(df['region'].dtype, pd.CategoricalDtype)
+    assert df['region'].isna().tolist() == [row[0] is None for row in rows]
+    assert df['region'].dropna().tolist() == [row[0] for row in rows if row[0] is not None]
+    assert df['units'].tolist() == expected['units'].tolist()
+    np.testing.assert_array_equal(df['price'].to_numpy(), expected['price'].to_numpy(dtype=float))
+    assert df['active'].tolist() == expected['active'].tolist()
+    assert df['extra'].iloc[3] == '{"i": 3}'
+
+
+def test_columns_are_memory_mapped_and_chunks_cover_every_row(tmp_path):
+    spilled = SpilledResult.write(_COLUMNS, _rows(), tmp_path / 'result')
+
+    assert isinstance(spilled._array(spilled._column('units')), np.memmap)
+
+    chunks = list(spilled.iter_chunks(10, columns=['units']))
+
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+    assert chunks[2].index[0] == 20
+    assert pd.concat(chunks)['units'].tolist() == list(range(25))
+    assert spilled.column('units', 5, 8).tolist() == [5, 6, 7]
+
+
+def test_duplicate_column_names_are_kept_apart(tmp_path):
+    spilled = SpilledResult.write(['region', 'count', 'count'], [['north', 1, 10], ['south', 2, 20]], tmp_path / 'result')
+
+    assert spilled.columns == ['region', 'count', 'count.1']
+    assert spilled.to_dataframe()['count.1'].tolist() == [10, 20]
+
+
+def _execute(tmp_path, columns, rows, spill):
+    config = MagicMock(spec=ClientConfig)
+    config.copilot_id = None
+    config.copilot_skill_id = None
+    gql_client = MagicMock()
+    response = gql_client.submit.return_value.execute_sql_query
+    response.success = True
+    response.data = {'columns': [{'name': name} for name in columns], 'rows': [{'data': row} for row in rows]}
+
+    return Data(config, gql_client).execute_sql_query('db', 'select 1', spill_path=tmp_path / 'result' if spill else None)
+
+
+def test_execute_sql_query_spills_instead_of_building_a_dataframe(tmp_path):
+    result = _execute(tmp_path, _COLUMNS, _rows(), spill=True)
+
+    assert result.success
+    assert result.df is None and result.data is None
+    assert result.spilled.columns == _COLUMNS
+    assert len(result.spilled) == 25
+
+    result.spilled.delete()
+    assert not os.path.exists(tmp_path / 'result')
+
+
+def test_a_single_null_row_spills_as_an_empty_result(tmp_path):
+    spilled = _execute(tmp_path, ['region', 'units'], [[None, None]], spill=True).spilled
+
+    assert len(spilled) == 0
+    assert len(_execute(tmp_path, ['region', 'units'], [[None, None]], spill=False).df) == 0
+    assert spilled.to_dataframe().columns.tolist() == ['region', 'units']
@@ -0,0 +1,127 @@
+"""Tests for the incremental chat thread cache."""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import uuid
+from unittest.mock import MagicMock
+
+from answer_rocket.chat import Chat
+from answer_rocket.client_config import ClientConfig
+from answer_rocket.util.thread_cache import ThreadCache
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+THREAD_ID = str(uuid.uuid4())
+COPILOT_ID = str(uuid.uuid4())
+
+
+def _entry(position, finished=True):
+    return {'id': str(uuid.UUID(int=position)), 'question': {'nl': f'question {position}'},
+            'answer': {'hasFinished': finished, 'message': f'answer {position}' if finished else None}}
+
+
+def _make_client(thread):
+    """A client serving `thread` (a list of entries, or None for a missing thread), recording get_entries calls."""
+    gql_client = MagicMock()
+    chat = Chat(gql_client, MagicMock(spec=ClientConfig))
+    requests = []
+
+    def submit(prepared, variables):
+        data = None if thread is None else {'id': THREAD_ID, 'entryCount': len(thread), 'title': 'Sales',
+                                            'copilotId': COPILOT_ID}
+        return prepared.operation + {'data': {'chatThread': data}}
+
+    def get_entries(thread_id, offset=None, limit=None):
+        requests.append((offset, limit))
+        return [dict(entry) for entry in thread[offset:offset + limit]]
+
+    gql_client.submit.side_effect = submit
+    chat.get_entries = get_entries
+
+    return chat, requests
+
+
+# ---------------------------------------------------------------------------
+# Syncing
+# ---------------------------------------------------------------------------
+
+def test_sync_fetches_only_new_and_unfinished_entries():
+    thread = [_entry(0), _entry(1), _entry(2, finished=False)]
+    chat, requests = _make_client(thread)
+    cache = ThreadCache()
+
+    assert chat.sync_thread(THREAD_ID, cache) == thread
+    assert requests == [(0, 3)]
+
+    thread[2] = _entry(2)
+    thread.append(_entry(3))
+    entries = chat.sync_thread(THREAD_ID, cache)
+
+    assert requests[1] == (2, 2)
+    assert entries == thread
+    assert cache.thread(THREAD_ID)['entry_count'] == 4
+    assert cache.entry(thread[3]['id'])['answer']['message'] == 'answer 3'
+
+    chat.sync_thread(THREAD_ID, cache)
+    assert len(requests) == 2
+
+
+def test_sync_refetches_a_thread_that_lost_entries():
+    thread = [_entry(0), _entry(1), _entry(2)]
+    chat, requests = _make_client(thread)
+    cache = ThreadCache()
+    chat.sync_thread(THREAD_ID, cache)
+
+    del thread[1]
+    entries = chat.sync_thread(THREAD_ID, cache)
+
+    assert requests[-1] == (0, 2)
+    assert entries == thread
+
+
+def test_sync_of_a_missing_thread_drops_it():
+    chat, _ = _make_client([_entry(0)])
+    cache = ThreadCache()
+    chat.sync_thread(THREAD_ID, cache)
+
+    chat, requests = _make_client(None)
+
+    assert chat.sync_thread(THREAD_ID, cache) == []
+    assert cache.thread(THREAD_ID) is None
+    assert requests == []
+
+
+def test_sqlite_cache_is_shared_across_instances(tmp_path):
+    path = tmp_path / 'threads.db'
+    thread = [_entry(0), _entry(1)]
+    chat, requests = _make_client(thread)
+
+    with ThreadCache(path) as first:
+        chat.sync_thread(THREAD_ID, first)
+
+        thread.append(_entry(2))
+
+        with ThreadCache(path) as second:
+            assert second.entries(THREAD_ID) == thread[:2]
+            assert chat.sync_thread(THREAD_ID, second) == thread
+            assert requests[-1] == (2, 1)
+
+        assert first.entries(THREAD_ID) == thread
+        assert first.thread(THREAD_ID)['copilot_id'] == COPILOT_ID
+
+
+def test_thread_without_a_copilot_is_cached_with_none(tmp_path):
+    chat, _ = _make_client([_entry(0)])
+    header = MagicMock(id=THREAD_ID, entry_count=1, title='Sales', copilot_id=None)
+    chat.gql_client.submit.side_effect = lambda prepared, variables: MagicMock(chat_thread=header)
+
+    with ThreadCache(tmp_path / 'threads.db') as cache:
+        chat.sync_thread(THREAD_ID, cache)
+        assert cache.thread(THREAD_ID)['copilot_id'] is None
+
+    with ThreadCache(tmp_path / 'threads.db') as cache:
+        assert cache.thread(THREAD_ID)['copilot_id'] is None